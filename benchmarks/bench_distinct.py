@@ -0,0 +1,88 @@
+"""
+Distinct-count benchmark: exact counting vs HyperLogLog sketches (counting
+raw values, and merging stored per-day sketches for a date range)
+
+    python benchmarks/bench_distinct.py --precision 12 --repeat 5
+
+Timing only; the error bound documented in src/hll.py is tested by
+tests/test_hll.py.
+"""
+
+import argparse
+import json
+import statistics
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'src'))
+import hll
+
+SIZES = [10_000, 100_000, 1_000_000]
+
+
+def timed(fn, repeat):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = fn()
+        timings.append(time.perf_counter() - started)
+    return result, round(statistics.median(timings) * 1000, 2)
+
+
+def count_speed(p, n, repeat, seed=2):
+    """Exact (np.unique) vs sketch counting of n values"""
+    values = np.random.default_rng(seed).integers(0, n // 5 + 1, size=n)
+    exact, exact_ms = timed(lambda: len(np.unique(values)), repeat)
+    estimate, sketch_ms = timed(lambda: hll.count(values, p), repeat)
+    return {
+        'values': n, 'exact': exact, 'estimate': round(estimate),
+        'exact_ms': exact_ms, 'sketch_ms': sketch_ms
+    }
+
+
+def merge_speed(p, days, repeat, seed=1):
+    """Distinct count over a date range: exact over all rows vs merging per-day sketches"""
+    rng = np.random.default_rng(seed)
+    daily = [rng.integers(0, 50_000, size=rng.integers(500, 5000)) for _ in range(days)]
+    sketches = [hll.registers(values, p) for values in daily]
+    exact, exact_ms = timed(lambda: len(np.unique(np.concatenate(daily))), repeat)
+
+    def merged_count():
+        merged = np.maximum.reduce([hll.dense(index, rank, p) for index, rank in sketches])
+        filled = merged[merged > 0]
+        return float(hll.estimate(len(filled), np.ldexp(1.0, -filled.astype(int)).sum(), p))
+
+    estimate, merge_ms = timed(merged_count, repeat)
+    return {
+        'days': days, 'rows': sum(len(values) for values in daily), 'exact': exact,
+        'estimate': round(estimate), 'exact_ms': exact_ms, 'merge_ms': merge_ms
+    }
+
+
+def run(p=12, repeat=5, days=365):
+    hll.check_precision(p)
+    return {
+        'benchmark': 'distinct',
+        'precision': p,
+        'standard_error_pct': round(float(hll.standard_error(p)) * 100, 3),
+        'repeat': repeat,
+        'count': [count_speed(p, n, repeat) for n in SIZES],
+        'merge': merge_speed(p, days, repeat)
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Exact vs HyperLogLog distinct counting speed')
+    parser.add_argument('--precision', type=int, default=12)
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--days', type=int, default=365, help='Per-day sketches merged for one range')
+    args = parser.parse_args()
+
+    print(json.dumps(run(args.precision, args.repeat, args.days), indent=2))
+
+
+if __name__ == '__main__':
+    main()
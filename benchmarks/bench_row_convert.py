@@ -0,0 +1,114 @@
+"""
+Micro-benchmark: per-row dict conversion (old execute_query path)
+vs. row_convert's per-column converters
+
+    python benchmarks/bench_row_convert.py --rows 200000
+"""
+
+import argparse
+import json
+import random
+import sys
+import time
+from collections import namedtuple
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'src'))
+import row_convert
+
+Column = namedtuple('Column', ['name', 'type_code'])
+
+# Shape of a typical total query result (order_analysis-like)
+DESCRIPTION = [
+    Column('vendor_id', row_convert.INT4_OID),
+    Column('po_id', row_convert.INT4_OID),
+    Column('order_value', row_convert.NUMERIC_OID),
+    Column('quantity', row_convert.NUMERIC_OID),
+    Column('sales_channel', row_convert.TEXT_OID),
+    Column('order_date', row_convert.DATE_OID),
+    Column('created_at', row_convert.TIMESTAMP_OID),
+    Column('avg_price_per_unit', row_convert.NUMERIC_OID),
+]
+
+
+def make_rows(n, seed=42):
+    rng = random.Random(seed)
+    start = datetime(2025, 1, 1)
+    rows = []
+    for i in range(n):
+        ts = start + timedelta(minutes=rng.randint(0, 500000))
+        rows.append((
+            rng.randint(1, 5000),
+            i,
+            Decimal(f"{rng.uniform(10, 1e6):.2f}"),
+            Decimal(f"{rng.uniform(1, 500):.2f}"),
+            rng.choice(['web', 'app', 'Unknown']),
+            ts.date(),
+            ts,
+            Decimal(f"{rng.uniform(1, 5000):.2f}") if rng.random() > 0.05 else None,
+        ))
+    return rows
+
+
+def legacy_convert(description, rows):
+    """The per-row, per-cell path both executors used before row_convert"""
+    columns = [d[0] for d in description]
+    results_list = []
+    for row in rows:
+        row_dict = dict(zip(columns, row))
+        for key, value in row_dict.items():
+            if hasattr(value, 'isoformat'):
+                row_dict[key] = value.isoformat()
+            elif isinstance(value, (int, float, str, bool, type(None))):
+                pass
+            else:
+                row_dict[key] = str(value)
+        results_list.append(row_dict)
+    return results_list
+
+
+def best_of(fn, repeat):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - started)
+    return min(timings)
+
+
+def run(rows_count=200000, repeat=3):
+    rows = make_rows(rows_count)
+    cases = {
+        'legacy_dict_per_row': lambda: legacy_convert(DESCRIPTION, rows),
+        'convert_rows_tuples': lambda: row_convert.convert_rows(DESCRIPTION, rows),
+        'convert_columns': lambda: row_convert.convert_columns(DESCRIPTION, rows),
+    }
+
+    results = {}
+    for name, fn in cases.items():
+        seconds = best_of(fn, repeat)
+        results[name] = {
+            'seconds': round(seconds, 4),
+            'rows_per_second': round(rows_count / seconds) if seconds else None
+        }
+
+    baseline = results['legacy_dict_per_row']['seconds']
+    for result in results.values():
+        result['speedup_vs_legacy'] = round(baseline / result['seconds'], 2) if result['seconds'] else None
+
+    return {'benchmark': 'row_convert', 'rows': rows_count, 'repeat': repeat, 'results': results}
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Row conversion micro-benchmark')
+    parser.add_argument('--rows', type=int, default=200000)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    print(json.dumps(run(args.rows, args.repeat), indent=2))
+
+
+if __name__ == '__main__':
+    main()
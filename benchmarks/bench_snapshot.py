@@ -0,0 +1,97 @@
+"""
+Snapshot benchmark: a fresh process's first entity reads (history, profile,
+aggregates) from DuckDB vs the memory-mapped entity snapshot, including
+imports and opening the files - the cost of a cold worker after a deploy
+
+    python src/entity_snapshot.py build        # if the sync hasn't written one yet
+    python benchmarks/bench_snapshot.py --repeat 5 --entities 20
+
+Reads the live analytics DB and snapshot from config (or --db / --snapshot).
+"""
+
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+SRC_DIR = Path(__file__).resolve().parent.parent / 'src'
+
+PROBE = """
+import sys, time, json
+sys.path.insert(0, {src!r})
+started = time.perf_counter()
+import config
+if {db!r}:
+    config.ANALYTICS_DB_PATH = {db!r}
+if {snapshot!r}:
+    config.ENTITY_SNAPSHOT_CONFIG['dir'] = {snapshot!r}
+config.ENTITY_SNAPSHOT_CONFIG['enabled'] = {use_snapshot!r}
+from insights_generator import BenchmarkingInsightsGenerator
+generator = BenchmarkingInsightsGenerator(api_key='unused')
+import contextlib, io
+with contextlib.redirect_stdout(io.StringIO()):
+    first = None
+    for entity_id in {entity_ids!r}:
+        generator.load_entity_from_duckdb({entity_type!r}, entity_id)
+        generator.load_entity_profile({entity_type!r}, entity_id)
+        generator.load_aggregates_from_duckdb({entity_type!r})
+        if first is None:
+            first = time.perf_counter() - started
+print(repr((first, time.perf_counter() - started)))
+"""
+
+
+def sample_ids(entity_type, count, db=None):
+    sys.path.insert(0, str(SRC_DIR))
+    import duckdb
+    import config
+
+    conn = duckdb.connect(db or config.ANALYTICS_DB_PATH, read_only=True)
+    try:
+        rows = conn.execute("""
+        SELECT entity_id FROM entities WHERE entity_type = ? ORDER BY hash(entity_id) LIMIT ?
+        """, [entity_type, count]).fetchall()
+    finally:
+        conn.close()
+    return [row[0] for row in rows]
+
+
+def probe(entity_type, entity_ids, use_snapshot, db=None, snapshot=None):
+    """(seconds to first entity, seconds for all) in a fresh interpreter"""
+    code = PROBE.format(src=str(SRC_DIR), db=db, snapshot=snapshot, use_snapshot=use_snapshot,
+                        entity_type=entity_type, entity_ids=entity_ids)
+    result = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, cwd=SRC_DIR)
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip().splitlines()[-1])
+    return eval(result.stdout.strip().splitlines()[-1])
+
+
+def run(entity_type='buyer', entities=20, repeat=5, db=None, snapshot=None):
+    entity_ids = sample_ids(entity_type, entities, db)
+    results = {}
+    for source, use_snapshot in (('duckdb', False), ('snapshot', True)):
+        timings = [probe(entity_type, entity_ids, use_snapshot, db, snapshot) for _ in range(repeat)]
+        results[source] = {
+            'first_entity_ms_median': round(statistics.median(t[0] for t in timings) * 1000, 1),
+            'all_entities_ms_median': round(statistics.median(t[1] for t in timings) * 1000, 1)
+        }
+    return {'benchmark': 'snapshot', 'entity_type': entity_type, 'entities': len(entity_ids),
+            'repeat': repeat, 'results': results}
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Cold entity reads: DuckDB vs memory-mapped snapshot')
+    parser.add_argument('--entity', choices=['buyer', 'seller'], default='buyer')
+    parser.add_argument('--entities', type=int, default=20, help='Entities read per process')
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--db', help='Analytics DB (default: config ANALYTICS_DB_PATH)')
+    parser.add_argument('--snapshot', help='Snapshot directory (default: config ENTITY_SNAPSHOT_CONFIG dir)')
+    args = parser.parse_args()
+
+    print(json.dumps(run(args.entity, args.entities, args.repeat, args.db, args.snapshot), indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,79 @@
+"""
+Startup benchmark: cold import time of each entry point, measured in fresh
+interpreters, plus which heavy dependencies each one pulls in at import
+
+    python benchmarks/bench_startup.py --repeat 10
+"""
+
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+SRC_DIR = Path(__file__).resolve().parent.parent / 'src'
+
+ENTRY_POINTS = ['config', 'run_all', 'dashboard_executor', 'insights_generator', 'sync_to_duckdb', 'app']
+HEAVY_MODULES = ['openai', 'duckdb', 'numpy', 'psycopg2', 'fastapi', 'dotenv']
+
+PROBE = """
+import sys, time
+sys.path.insert(0, {src!r})
+started = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - started
+loaded = [m for m in {heavy!r} if m in sys.modules]
+print(repr((elapsed, loaded)))
+"""
+
+
+def probe(module):
+    """(seconds to import module, heavy modules loaded) in a fresh interpreter"""
+    code = PROBE.format(src=str(SRC_DIR), module=module, heavy=HEAVY_MODULES)
+    result = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, cwd=SRC_DIR)
+    if result.returncode != 0:
+        return None, result.stderr.strip().splitlines()[-1:]
+    return eval(result.stdout.strip().splitlines()[-1])
+
+
+def run(repeat=5, modules=None):
+    results = {}
+    for module in modules or ENTRY_POINTS:
+        timings = []
+        loaded = []
+        for _ in range(repeat):
+            seconds, loaded = probe(module)
+            if seconds is None:
+                break
+            timings.append(seconds)
+
+        if not timings:
+            results[module] = {'error': loaded}
+            continue
+        results[module] = {
+            'import_ms_min': round(min(timings) * 1000, 1),
+            'import_ms_median': round(statistics.median(timings) * 1000, 1),
+            'heavy_modules_loaded': loaded
+        }
+
+    # Interpreter start alone, for reference
+    started = time.perf_counter()
+    subprocess.run([sys.executable, '-c', 'pass'], check=True)
+    interpreter_ms = round((time.perf_counter() - started) * 1000, 1)
+
+    return {'benchmark': 'startup', 'repeat': repeat, 'interpreter_ms': interpreter_ms, 'results': results}
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Cold import time of CLI entry points and the API')
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--module', action='append', help=f"Entry point(s) to measure (default: {', '.join(ENTRY_POINTS)})")
+    args = parser.parse_args()
+
+    print(json.dumps(run(args.repeat, args.module), indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,110 @@
+"""
+Stub OpenAI-compatible LLM server for offline benchmarks
+
+Answers POST .../chat/completions with a fixed, valid insights document
+after a configurable delay, and reports token usage estimated from the
+prompt size (~4 characters per token), so generate_insights and the API
+can be benchmarked without network access or API spend.
+
+    python benchmarks/llm_stub.py --port 8765 --latency-ms 800
+    # then point the generator at it: config.OPENROUTER_BASE_URL = 'http://127.0.0.1:8765/v1'
+"""
+
+import argparse
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+PRIORITIES = ['high', 'medium', 'low']
+COMPARISONS = ['self', 'benchmark', 'both']
+
+
+def canned_insights(count=6):
+    return {
+        'insights': [
+            {
+                'title': f"Benchmark stub insight number {i + 1}",
+                'observation': "Synthetic observation produced by the benchmark LLM stub server.",
+                'recommendation': "Synthetic recommendation produced by the benchmark LLM stub server.",
+                'priority': PRIORITIES[i % len(PRIORITIES)],
+                'comparison_type': COMPARISONS[i % len(COMPARISONS)],
+                'metrics': ['total_sales']
+            }
+            for i in range(count)
+        ]
+    }
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    latency_s = 0.0
+    insights_count = 6
+
+    def do_POST(self):
+        if not self.path.rstrip('/').endswith('/chat/completions'):
+            self.send_error(404)
+            return
+
+        body = json.loads(self.rfile.read(int(self.headers.get('Content-Length', 0))) or b'{}')
+        prompt_chars = sum(len(m.get('content') or '') for m in body.get('messages', []))
+        content = json.dumps(canned_insights(self.insights_count))
+
+        if self.latency_s:
+            time.sleep(self.latency_s)
+
+        payload = json.dumps({
+            'id': 'chatcmpl-benchmark-stub',
+            'object': 'chat.completion',
+            'created': int(time.time()),
+            'model': body.get('model', 'stub'),
+            'choices': [{
+                'index': 0,
+                'message': {'role': 'assistant', 'content': content},
+                'finish_reason': 'stop'
+            }],
+            'usage': {
+                'prompt_tokens': prompt_chars // 4,
+                'completion_tokens': len(content) // 4,
+                'total_tokens': prompt_chars // 4 + len(content) // 4
+            }
+        }).encode('utf-8')
+
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_stub(port=0, latency_ms=0, insights_count=6):
+    """Run the stub in a background thread; returns (server, base_url)"""
+    handler = type('ConfiguredStubHandler', (StubHandler,), {
+        'latency_s': latency_ms / 1000.0,
+        'insights_count': insights_count
+    })
+    server = ThreadingHTTPServer(('127.0.0.1', port), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}/v1"
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Stub OpenAI-compatible LLM server for benchmarks')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--latency-ms', type=float, default=0, help='Simulated model latency per request')
+    parser.add_argument('--insights', type=int, default=6, help='Insights per response')
+    args = parser.parse_args()
+
+    server, base_url = start_stub(args.port, args.latency_ms, args.insights)
+    print(f"LLM stub listening on {base_url} (latency {args.latency_ms:.0f}ms) - Ctrl+C to stop")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
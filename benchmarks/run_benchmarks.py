@@ -0,0 +1,399 @@
+"""
+Pipeline benchmark suite
+
+Runs offline against a local PostgreSQL loaded by synthetic_data.py and a
+stub LLM (llm_stub.py), with all DuckDB / SQLite / JSON output going to a
+temporary directory. Results are JSON, so runs can be compared:
+
+    python benchmarks/synthetic_data.py --dsn postgresql://postgres@localhost/bench --scale small --reset
+    python benchmarks/run_benchmarks.py --dsn postgresql://postgres@localhost/bench --output baseline.json
+    # ... change code ...
+    python benchmarks/run_benchmarks.py --dsn ... --output current.json --compare baseline.json
+
+Groups: parse, execute, sync, generate, api, row_convert (--only parse,sync)
+"""
+
+import argparse
+import contextlib
+import io
+import itertools
+import json
+import logging
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+BENCH_DIR = Path(__file__).resolve().parent
+ROOT_DIR = BENCH_DIR.parent
+sys.path.insert(0, str(ROOT_DIR / 'src'))
+sys.path.insert(0, str(BENCH_DIR))
+
+import config
+from synthetic_data import db_config_from_dsn
+from llm_stub import start_stub
+
+GROUPS = ['parse', 'execute', 'sync', 'generate', 'api', 'row_convert']
+
+
+# ============================================================
+# HARNESS
+# ============================================================
+
+def summarize(timings):
+    ordered = sorted(timings)
+    return {
+        'runs': len(ordered),
+        'min_s': round(ordered[0], 6),
+        'median_s': round(statistics.median(ordered), 6),
+        'mean_s': round(statistics.fmean(ordered), 6),
+        'p95_s': round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))], 6),
+        'max_s': round(ordered[-1], 6)
+    }
+
+
+def measure(fn, repeat=5, warmup=1, quiet=True):
+    """Time fn() `repeat` times after `warmup` untimed calls"""
+    sink = io.StringIO()
+    timings = []
+    with contextlib.redirect_stdout(sink) if quiet else contextlib.nullcontext():
+        for _ in range(warmup):
+            fn()
+        for _ in range(repeat):
+            sink.seek(0)
+            sink.truncate()
+            started = time.perf_counter()
+            fn()
+            timings.append(time.perf_counter() - started)
+    return summarize(timings)
+
+
+def configure_workdir(workdir, dsn, llm_base_url):
+    """Point every output path at the temporary workdir and the DB at the DSN"""
+    config.DB_CONFIG = db_config_from_dsn(dsn)
+    config.OPENROUTER_BASE_URL = llm_base_url
+    config.OPENROUTER_API_KEY = 'benchmark-stub'
+
+    config.ANALYTICS_DIR = os.path.join(workdir, 'analytics')
+    config.ANALYTICS_DB_PATH = os.path.join(config.ANALYTICS_DIR, 'vipani_analytics.db')
+    config.ANALYTICS_STAGING_PATH = os.path.join(config.ANALYTICS_DIR, 'vipani_analytics.staging.db')
+    config.DASHBOARD_DATA_DIR = os.path.join(workdir, 'dashboard_data')
+    config.DASHBOARD_RAW_DIR = os.path.join(config.DASHBOARD_DATA_DIR, 'raw')
+    config.DASHBOARD_PROCESSED_DIR = os.path.join(config.DASHBOARD_DATA_DIR, 'processed')
+    config.INSIGHTS_STORE_PATH = os.path.join(config.DASHBOARD_DATA_DIR, 'insights_store.db')
+    config.SYNC_CONFIG['log_path'] = os.path.join(workdir, 'sync.log')
+    config.METRICS_CONFIG['log_path'] = os.path.join(workdir, 'metrics.jsonl')
+
+    for directory in (config.ANALYTICS_DIR, config.DASHBOARD_RAW_DIR, config.DASHBOARD_PROCESSED_DIR):
+        os.makedirs(directory, exist_ok=True)
+
+
+def bench_params(entity_type):
+    params = config.default_params(entity_type)
+    # Seller dashboard queries also take time_resolution (not in DEFAULT_WINDOWS)
+    params.setdefault('time_resolution', config.total_data_params(entity_type).get('time_resolution', 'month'))
+    return params
+
+
+def dataset_info(dsn):
+    import psycopg2
+    conn = psycopg2.connect(dsn)
+    cursor = conn.cursor()
+    info = {}
+    for table in ('po_details', 'po_items', 'vendor_products'):
+        cursor.execute(f"SELECT COUNT(*) FROM {table}")
+        info[table] = cursor.fetchone()[0]
+    cursor.close()
+    conn.close()
+    return info
+
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT_DIR,
+            capture_output=True, text=True, timeout=10
+        ).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+# ============================================================
+# BENCHMARKS
+# ============================================================
+
+def bench_parse(results, args):
+    from query_parser import QueryParser
+    from query_catalog import QueryCatalog
+
+    parser = QueryParser()
+    catalog = QueryCatalog()
+    for entity_type in ('buyer', 'seller'):
+        for kind, path in (('dashboard', catalog.dashboard_query_path(entity_type)),
+                           ('total', catalog.total_query_path(entity_type))):
+            results[f"parse_file.{kind}.{entity_type}"] = measure(
+                lambda: parser.parse_file(path), repeat=args.repeat * 10
+            )
+            results[f"catalog_lookup.{kind}.{entity_type}"] = measure(
+                lambda: catalog.get_queries(path, entity_type), repeat=args.repeat * 10
+            )
+
+
+def bench_execute(results, args, state):
+    from dashboard_executor import DashboardExecutor
+
+    executor = DashboardExecutor()
+    state['executor'] = executor
+    state['dashboard_files'] = {}
+
+    for entity_type in ('buyer', 'seller'):
+        params = bench_params(entity_type)
+        with contextlib.redirect_stdout(io.StringIO()):
+            entity_ids = executor.get_active_entity_ids(entity_type, params)[:args.entities]
+        if not entity_ids:
+            continue
+
+        results[f"get_active_entity_ids.{entity_type}"] = measure(
+            lambda: executor.get_active_entity_ids(entity_type, params), repeat=args.repeat
+        )
+
+        ids = itertools.cycle(entity_ids)
+        results[f"execute_for_entity.{entity_type}"] = measure(
+            lambda: executor.execute_for_entity(entity_type, next(ids), params),
+            repeat=max(args.repeat, len(entity_ids))
+        )
+
+        with contextlib.redirect_stdout(io.StringIO()):
+            state['dashboard_files'][entity_type] = [
+                executor.process_entity(entity_type, entity_id, params) for entity_id in entity_ids
+            ]
+        state.setdefault('entity_ids', {})[entity_type] = entity_ids
+
+    results['pg_runner'] = executor.runner.stats_summary()
+
+
+def bench_sync(results, args, state):
+    import sync_to_duckdb
+    logging.getLogger().setLevel(logging.WARNING)
+
+    syncer = sync_to_duckdb.DuckDBSync()
+    syncer.initialize_schema()
+
+    for entity_type in ('buyer', 'seller'):
+        params = config.total_data_params(entity_type)
+        fetched = {}
+
+        def load():
+            fetched['results'] = syncer.load_and_execute_queries(entity_type, params)
+
+        results[f"sync.load_and_execute_queries.{entity_type}"] = measure(
+            load, repeat=args.sync_repeat, warmup=0
+        )
+        all_results = fetched['results']
+        results[f"sync.rows_fetched.{entity_type}"] = sum(len(r['rows']) for r in all_results.values())
+
+        entities = syncer.organize_by_entity(entity_type, all_results)
+        results[f"sync.entities.{entity_type}"] = len(entities)
+        results[f"sync.organize_by_entity.{entity_type}"] = measure(
+            lambda: syncer.organize_by_entity(entity_type, all_results), repeat=args.repeat
+        )
+        results[f"sync.save_entities.{entity_type}"] = measure(
+            lambda: syncer.save_entities_to_duckdb(entity_type, entities), repeat=args.repeat
+        )
+        results[f"sync.save_aggregates.{entity_type}"] = measure(
+            lambda: syncer.save_aggregates_to_duckdb(entity_type, entities), repeat=args.repeat
+        )
+        results[f"sync.save_profiles.{entity_type}"] = measure(
+            lambda: syncer.save_profiles_to_duckdb(entity_type, entities), repeat=args.repeat
+        )
+
+    results['sync.full'] = measure(
+        lambda: syncer.sync(workers=args.workers), repeat=args.sync_repeat, warmup=0
+    )
+
+
+def bench_generate(results, args, state):
+    from insights_generator import BenchmarkingInsightsGenerator
+
+    generator = BenchmarkingInsightsGenerator()
+    for entity_type, files in state.get('dashboard_files', {}).items():
+        cycle = itertools.cycle(files)
+        results[f"generate_insights.{entity_type}"] = measure(
+            lambda: generator.generate_insights(next(cycle)), repeat=max(args.repeat, len(files))
+        )
+
+
+def bench_api(results, args, state):
+    try:
+        from fastapi.testclient import TestClient
+    except ImportError as e:
+        results['api.skipped'] = f"fastapi test client unavailable: {e}"
+        return
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        import app
+    client = TestClient(app.app)
+
+    endpoints = [('health', '/'), ('metrics', '/metrics')]
+    for entity_type, entity_ids in state.get('entity_ids', {}).items():
+        entity_id = entity_ids[0]
+        endpoints += [
+            (f"latest.{entity_type}", f"/insights/{entity_type}/{entity_id}/latest"),
+            (f"trends.{entity_type}", f"/trends/{entity_type}/{entity_id}")
+        ]
+
+    for name, path in endpoints:
+        status = client.get(path).status_code
+        results[f"api.{name}"] = {
+            'path': path,
+            'status': status,
+            **measure(lambda: client.get(path), repeat=args.repeat * 20)
+        }
+
+
+def bench_row_convert(results, args):
+    import bench_row_convert
+    for name, result in bench_row_convert.run(rows_count=args.rows, repeat=3)['results'].items():
+        results[f"row_convert.{name}"] = result
+
+
+# ============================================================
+# COMPARE
+# ============================================================
+
+def _seconds(result):
+    """Comparable time of one result (median, or best-of for row_convert)"""
+    if not isinstance(result, dict):
+        return None
+    return result.get('median_s', result.get('seconds'))
+
+
+def compare(current, baseline, threshold):
+    """Print median changes per benchmark; returns names that regressed beyond threshold"""
+    regressions = []
+    print(f"\n{'Benchmark':<48} {'Baseline ms':>12} {'Current ms':>12} {'Change':>9}")
+    print(f"{'-'*48} {'-'*12} {'-'*12} {'-'*9}")
+
+    for name, result in sorted(current['benchmarks'].items()):
+        before = baseline.get('benchmarks', {}).get(name)
+        old, new = _seconds(before), _seconds(result)
+        if old is None or new is None:
+            continue
+
+        change = (new - old) / old if old else 0.0
+        flag = ''
+        if change > threshold:
+            flag = '  ✗ slower'
+            regressions.append(name)
+        elif change < -threshold:
+            flag = '  ✓ faster'
+        print(f"{name:<48} {old * 1000:>12.2f} {new * 1000:>12.2f} {change:>+8.1%}{flag}")
+
+    print(f"\n{len(regressions)} regression(s) beyond {threshold:.0%}")
+    return regressions
+
+
+# ============================================================
+# MAIN
+# ============================================================
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Benchmark the insights pipeline against synthetic data',
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog=__doc__
+    )
+    parser.add_argument('--dsn', required=True, help='Local PostgreSQL loaded by synthetic_data.py')
+    parser.add_argument('--only', help=f"Comma-separated groups ({','.join(GROUPS)})")
+    parser.add_argument('--repeat', type=int, default=5, help='Timed runs per benchmark')
+    parser.add_argument('--sync-repeat', type=int, default=1, help='Timed runs for full-table sync steps')
+    parser.add_argument('--entities', type=int, default=5, help='Entities per type for per-entity benchmarks')
+    parser.add_argument('--workers', type=int, help='Sync worker processes. Default from config.')
+    parser.add_argument('--rows', type=int, default=100000, help='Rows for the row_convert micro-benchmark')
+    parser.add_argument('--llm-latency-ms', type=float, default=0, help='Simulated LLM latency')
+    parser.add_argument('--output', help='Write results JSON here (default: stdout)')
+    parser.add_argument('--compare', help='Baseline results JSON to compare against')
+    parser.add_argument('--threshold', type=float, default=0.10, help='Regression threshold (0.10 = 10%%)')
+    parser.add_argument('--keep-workdir', action='store_true', help='Keep the temporary output directory')
+    args = parser.parse_args()
+
+    groups = args.only.split(',') if args.only else GROUPS
+    unknown = set(groups) - set(GROUPS)
+    if unknown:
+        parser.error(f"Unknown group(s): {', '.join(sorted(unknown))}")
+
+    workdir = tempfile.mkdtemp(prefix='insights_bench_')
+    server, base_url = start_stub(latency_ms=args.llm_latency_ms)
+    configure_workdir(workdir, args.dsn, base_url)
+
+    results = {}
+    state = {}
+    started = time.perf_counter()
+
+    try:
+        # Later groups use what earlier ones produced (DuckDB data, dashboard files)
+        if 'parse' in groups:
+            bench_parse(results, args)
+        if 'sync' in groups or 'generate' in groups or 'api' in groups:
+            bench_sync(results, args, state) if 'sync' in groups else _quiet_sync(args)
+        if 'execute' in groups or 'generate' in groups or 'api' in groups:
+            bench_execute(results, args, state)
+        if 'generate' in groups:
+            bench_generate(results, args, state)
+        if 'api' in groups:
+            bench_api(results, args, state)
+        if 'row_convert' in groups:
+            bench_row_convert(results, args)
+    finally:
+        server.shutdown()
+        if not args.keep_workdir:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    output = {
+        'meta': {
+            'timestamp': datetime.now().isoformat(),
+            'git_commit': git_commit(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'cpu_count': os.cpu_count(),
+            'dataset': dataset_info(args.dsn),
+            'groups': groups,
+            'repeat': args.repeat,
+            'llm_latency_ms': args.llm_latency_ms,
+            'total_seconds': round(time.perf_counter() - started, 2),
+            'workdir': workdir if args.keep_workdir else None
+        },
+        'benchmarks': results
+    }
+
+    text = json.dumps(output, indent=2, default=str)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(text)
+        print(f"✓ Wrote {len(results)} results to {args.output}")
+    else:
+        print(text)
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        if compare(output, baseline, args.threshold):
+            sys.exit(1)
+
+
+def _quiet_sync(args):
+    """Populate DuckDB for the generate/api groups without timing it"""
+    import sync_to_duckdb
+    logging.getLogger().setLevel(logging.WARNING)
+    with contextlib.redirect_stdout(io.StringIO()):
+        sync_to_duckdb.DuckDBSync().sync(workers=args.workers)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,235 @@
+"""
+Synthetic marketplace data for benchmarks
+
+Creates po_details / po_items / vendor_products / "userApis_organization" /
+user_address in a local stand-in PostgreSQL and fills them at a chosen
+scale (orders and entities follow a skewed, Zipf-like popularity so a few
+buyers/sellers are large). Data is seeded and dated relative to today, so
+default_params() / total_data_params() windows always cover it.
+
+    # Throwaway local database only - existing tables are dropped with --reset
+    python benchmarks/synthetic_data.py --dsn postgresql://postgres@localhost/bench --scale small --reset
+    python benchmarks/synthetic_data.py --dsn ... --orders 250000 --buyers 5000 --sellers 1000 --reset
+"""
+
+import argparse
+import io
+import json
+import time
+from datetime import datetime, timedelta
+import numpy as np
+import psycopg2
+import psycopg2.extensions
+
+SCALES = {
+    'small':  {'orders': 1000,    'buyers': 80,    'sellers': 20,    'products': 200},
+    'medium': {'orders': 100000,  'buyers': 4000,  'sellers': 1000,  'products': 10000},
+    'large':  {'orders': 1000000, 'buyers': 40000, 'sellers': 10000, 'products': 100000}
+}
+
+CATEGORIES = 20
+CITIES = 50
+CHANNELS = ['web', 'app', 'api', 'Unknown']
+CHUNK_ROWS = 200000
+
+TABLES = ['po_items', 'po_details', 'vendor_products', '"userApis_organization"', 'user_address']
+
+SCHEMA = """
+CREATE TABLE "userApis_organization" (
+    org_id          INTEGER PRIMARY KEY,
+    company_name    TEXT
+);
+CREATE TABLE user_address (
+    id              SERIAL PRIMARY KEY,
+    city            TEXT
+);
+CREATE TABLE vendor_products (
+    id              INTEGER PRIMARY KEY,
+    org_id          INTEGER,
+    product_name    TEXT,
+    category_ids    JSONB
+);
+CREATE TABLE po_details (
+    id                  INTEGER PRIMARY KEY,
+    buyer_org_id        INTEGER,
+    seller_org_id       INTEGER,
+    created_date        TIMESTAMP,
+    updated_date        TIMESTAMP,
+    source              TEXT,
+    shipping_address    INTEGER
+);
+CREATE TABLE po_items (
+    id              INTEGER PRIMARY KEY,
+    po_id           INTEGER,
+    product_id      INTEGER,
+    total_amount    NUMERIC(14, 2),
+    qty             NUMERIC(10, 2),
+    created_date    TIMESTAMP,
+    updated_date    TIMESTAMP
+);
+"""
+
+INDEXES = """
+CREATE INDEX idx_po_items_po_id ON po_items (po_id);
+CREATE INDEX idx_po_items_created ON po_items (created_date);
+CREATE INDEX idx_po_items_updated ON po_items (updated_date);
+CREATE INDEX idx_po_details_buyer ON po_details (buyer_org_id);
+CREATE INDEX idx_po_details_seller ON po_details (seller_org_id);
+CREATE INDEX idx_vendor_products_org ON vendor_products (org_id);
+"""
+
+
+def db_config_from_dsn(dsn):
+    """psycopg2 DSN / URI -> config.DB_CONFIG-style dict"""
+    parsed = psycopg2.extensions.parse_dsn(dsn)
+    return {
+        'host': parsed.get('host'),
+        'database': parsed.get('dbname'),
+        'user': parsed.get('user'),
+        'password': parsed.get('password'),
+        'port': parsed.get('port')
+    }
+
+
+def skewed_choice(rng, count, size, exponent=0.8):
+    """IDs 0..count-1 drawn with Zipf-like popularity"""
+    weights = 1.0 / np.arange(1, count + 1) ** exponent
+    weights /= weights.sum()
+    return rng.choice(count, size=size, p=weights)
+
+
+def copy_rows(cursor, table, columns, rows):
+    """COPY an iterable of tuples in chunks (tab-separated text, \\N = NULL)"""
+    buffer = io.StringIO()
+    written = 0
+
+    def flush():
+        buffer.seek(0)
+        cursor.copy_expert(f"COPY {table} ({', '.join(columns)}) FROM STDIN", buffer)
+        buffer.seek(0)
+        buffer.truncate()
+
+    for row in rows:
+        buffer.write('\t'.join('\\N' if v is None else str(v) for v in row))
+        buffer.write('\n')
+        written += 1
+        if written % CHUNK_ROWS == 0:
+            flush()
+    flush()
+    return written
+
+
+def generate(dsn, orders, buyers, sellers, products, days=400, seed=42, reset=False):
+    """Create and fill the tables; returns row counts"""
+    rng = np.random.default_rng(seed)
+    products = max(products, sellers)
+    now = datetime.now().replace(microsecond=0)
+    started = time.perf_counter()
+
+    conn = psycopg2.connect(dsn)
+    conn.autocommit = True
+    cursor = conn.cursor()
+
+    cursor.execute("SELECT to_regclass('po_details')")
+    if cursor.fetchone()[0] and not reset:
+        raise SystemExit("Tables already exist - pass --reset to drop them (throwaway databases only)")
+    cursor.execute(f"DROP TABLE IF EXISTS {', '.join(TABLES)}")
+    cursor.execute(SCHEMA)
+
+    # Buyers are org IDs 1..B, sellers B+1..B+S
+    copy_rows(cursor, '"userApis_organization"', ['org_id', 'company_name'],
+              ((org_id, f"Org {org_id}") for org_id in range(1, buyers + sellers + 1)))
+    copy_rows(cursor, 'user_address', ['id', 'city'],
+              ((i, f"City {i}") for i in range(1, CITIES + 1)))
+
+    # Product p belongs to seller (p % S); categories as in production category_ids JSON
+    def product_rows():
+        for product_id in range(1, products + 1):
+            category = {'cat_0': [
+                {'name': 'All Products', 'level': 0},
+                {'name': f"Category {product_id % CATEGORIES}", 'level': 1}
+            ]}
+            yield (product_id, buyers + 1 + (product_id - 1) % sellers,
+                   f"Product {product_id}", json.dumps(category))
+    copy_rows(cursor, 'vendor_products', ['id', 'org_id', 'product_name', 'category_ids'], product_rows())
+
+    # Orders
+    order_buyers = skewed_choice(rng, buyers, orders) + 1
+    order_sellers = skewed_choice(rng, sellers, orders)
+    order_age = rng.integers(0, days * 86400, orders)
+    order_channel = rng.integers(0, len(CHANNELS), orders)
+    order_city = rng.integers(1, CITIES + 1, orders)
+    order_update_lag = rng.integers(0, 4, orders)
+
+    def order_rows():
+        for i in range(orders):
+            created = now - timedelta(seconds=int(order_age[i]))
+            yield (i + 1, int(order_buyers[i]), buyers + 1 + int(order_sellers[i]),
+                   created, created + timedelta(days=int(order_update_lag[i])), CHANNELS[order_channel[i]],
+                   int(order_city[i]))
+    copy_rows(cursor, 'po_details',
+              ['id', 'buyer_org_id', 'seller_org_id', 'created_date', 'updated_date', 'source', 'shipping_address'],
+              order_rows())
+
+    # 1-4 items per order, products from the order's seller
+    items_per_order = rng.integers(1, 5, orders)
+    item_orders = np.repeat(np.arange(orders), items_per_order)
+    item_count = len(item_orders)
+    per_seller = products // sellers
+    item_products = order_sellers[item_orders] + rng.integers(0, per_seller, item_count) * sellers + 1
+    item_amounts = np.round(rng.lognormal(6.5, 1.0, item_count), 2)
+    item_qty = rng.integers(1, 51, item_count)
+    item_update_lag = rng.integers(0, 4, item_count)
+
+    def item_rows():
+        for i in range(item_count):
+            order = item_orders[i]
+            created = now - timedelta(seconds=int(order_age[order]))
+            yield (i + 1, int(order) + 1, int(item_products[i]), item_amounts[i], int(item_qty[i]),
+                   created, created + timedelta(days=int(item_update_lag[i])))
+    copy_rows(cursor, 'po_items',
+              ['id', 'po_id', 'product_id', 'total_amount', 'qty', 'created_date', 'updated_date'],
+              item_rows())
+
+    cursor.execute(INDEXES)
+    cursor.execute("ANALYZE")
+    cursor.close()
+    conn.close()
+
+    counts = {
+        'orders': orders,
+        'order_items': item_count,
+        'buyers': buyers,
+        'sellers': sellers,
+        'products': products,
+        'days': days,
+        'seed': seed,
+        'load_seconds': round(time.perf_counter() - started, 2)
+    }
+    return counts
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Load synthetic benchmark data into a local PostgreSQL')
+    parser.add_argument('--dsn', required=True, help='Throwaway database, e.g. postgresql://postgres@localhost/bench')
+    parser.add_argument('--scale', choices=sorted(SCALES), default='small')
+    parser.add_argument('--orders', type=int, help='Override the scale preset')
+    parser.add_argument('--buyers', type=int, help='Override the scale preset')
+    parser.add_argument('--sellers', type=int, help='Override the scale preset')
+    parser.add_argument('--products', type=int, help='Override the scale preset')
+    parser.add_argument('--days', type=int, default=400, help='Order history length in days')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--reset', action='store_true', help='Drop existing benchmark tables first')
+    args = parser.parse_args()
+
+    scale = dict(SCALES[args.scale])
+    for key in scale:
+        if getattr(args, key) is not None:
+            scale[key] = getattr(args, key)
+
+    counts = generate(args.dsn, days=args.days, seed=args.seed, reset=args.reset, **scale)
+    print(json.dumps(counts, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -1,5 +1,6 @@
 import streamlit as st
 import json
+import sys
 from datetime import datetime, timedelta
 from pathlib import Path
 import plotly.graph_objects as go
@@ -216,17 +217,93 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
-DASHBOARD_PROCESSED_DIR = Path("data/dashboard_data/processed")
+sys.path.insert(0, str(Path(__file__).parent / "src"))
 
+OVERVIEW_PAGE_SIZE = 25
 
-def load_available_entities():
-    import sys
-    sys.path.insert(0, str(Path(__file__).parent / "src"))
-    import duckdb, config
+
+# ─────────────────────────────────────────────────
+# Shared resources (one per server process, reused across sessions)
+# ─────────────────────────────────────────────────
+
+@st.cache_resource(show_spinner=False)
+def get_executor():
+    from dashboard_executor import DashboardExecutor
+    return DashboardExecutor()
+
+
+@st.cache_resource(show_spinner=False)
+def get_generator():
+    from insights_generator import BenchmarkingInsightsGenerator
+    return BenchmarkingInsightsGenerator()
+
+
+def get_fresh_generator():
+    # Shared generator caches aggregates - drop them once a new sync lands
+    generator = get_generator()
+    watermark = get_sync_watermark()
+    if getattr(generator, 'sync_watermark', None) != watermark:
+        generator.clear_aggregates_cache()
+        generator.sync_watermark = watermark
+    return generator
+
+
+@st.cache_resource(show_spinner=False)
+def get_insights_store():
+    from insights_store import InsightsStore
+    store = InsightsStore()
+    # First run after upgrade: index existing processed JSON files
+    if store.count() == 0:
+        store.import_json_files()
+    return store
+
+
+# ─────────────────────────────────────────────────
+# Cache keys - data caches below are keyed on these,
+# so they invalidate as soon as a sync or new insight lands
+# ─────────────────────────────────────────────────
+
+@st.cache_data(ttl=30, show_spinner=False)
+def get_sync_watermark():
+    import config, entity_snapshot
+    snapshot = entity_snapshot.get_snapshot()
+    manifest = snapshot.manifest() if snapshot else None
+    if manifest:
+        return manifest['synced_at']
+    if not Path(config.ANALYTICS_DB_PATH).exists():
+        return None
+    try:
+        import duckdb
+        conn = duckdb.connect(config.ANALYTICS_DB_PATH, read_only=True)
+        last = conn.execute("SELECT MAX(synced_at) FROM sync_log").fetchone()
+        conn.close()
+        return last[0] if last else None
+    except:
+        return None
+
+
+def get_store_version():
+    try:
+        return get_insights_store().version()
+    except:
+        return None
+
+
+# ─────────────────────────────────────────────────
+# Data loaders
+# ─────────────────────────────────────────────────
+
+@st.cache_data(show_spinner=False)
+def load_available_entities(sync_watermark):
+    import config, entity_snapshot
     entities = {'buyer': [], 'seller': []}
+    snapshot = entity_snapshot.get_snapshot()
+    if snapshot and snapshot.manifest():
+        return {et: snapshot.entity_ids(et) or [] for et in entities}
     if not Path(config.ANALYTICS_DB_PATH).exists():
         return entities
     try:
+        import duckdb
         conn = duckdb.connect(config.ANALYTICS_DB_PATH, read_only=True)
         for et in ['buyer', 'seller']:
             rows = conn.execute(
@@ -239,13 +316,18 @@ def load_available_entities():
     return entities
 
 
-def get_db_status():
-    import sys
-    sys.path.insert(0, str(Path(__file__).parent / "src"))
+@st.cache_data(show_spinner=False)
+def get_db_status(sync_watermark):
     try:
-        import duckdb, config
+        import config, entity_snapshot
+        snapshot = entity_snapshot.get_snapshot()
+        manifest = snapshot.manifest() if snapshot else None
+        if manifest:
+            return {'buyers': manifest['entities'].get('buyer', 0), 'sellers': manifest['entities'].get('seller', 0),
+                    'last_sync': str(manifest['synced_at'])[:16] if manifest['synced_at'] else None}
         if not Path(config.ANALYTICS_DB_PATH).exists():
             return None
+        import duckdb
         conn = duckdb.connect(config.ANALYTICS_DB_PATH, read_only=True)
         b = conn.execute("SELECT COUNT(*) FROM entities WHERE entity_type='buyer'").fetchone()[0]
         s = conn.execute("SELECT COUNT(*) FROM entities WHERE entity_type='seller'").fetchone()[0]
@@ -257,46 +339,52 @@ def get_db_status():
 
 
 def run_pipeline(entity_type, entity_id, start_date, end_date):
-    import sys
-    sys.path.insert(0, str(Path(__file__).parent / "src"))
-    from dashboard_executor import DashboardExecutor
-    from insights_generator import BenchmarkingInsightsGenerator
     import config
     params = {
         'start_date': start_date, 'end_date': end_date,
-        'top_n': config.DEFAULT_PARAMS[entity_type]['top_n']
+        'top_n': config.default_params(entity_type)['top_n']
     }
     try:
-        executor = DashboardExecutor()
-        dashboard_file = executor.process_entity(entity_type, entity_id, params)
-        generator = BenchmarkingInsightsGenerator()
-        insights_file = generator.generate_insights(dashboard_file)
+        dashboard_file = get_executor().process_entity(entity_type, entity_id, params)
+        insights_file = get_fresh_generator().generate_insights(dashboard_file)
         return insights_file, None
     except Exception as e:
         return None, str(e)
 
 
-def load_latest_insight(entity_type, entity_id):
-    pattern = f"{entity_type}_{entity_id}_insights_*.json"
-    files = list(DASHBOARD_PROCESSED_DIR.glob(pattern))
-    if not files:
+@st.cache_data(show_spinner=False)
+def load_latest_insight(entity_type, entity_id, store_version):
+    try:
+        return get_insights_store().get_latest(entity_type, entity_id)
+    except:
         return None
-    latest = max(files, key=lambda f: f.stat().st_mtime)
-    with open(latest) as f:
-        return json.load(f)
 
 
-def load_all_insights():
-    if not DASHBOARD_PROCESSED_DIR.exists():
+@st.cache_data(show_spinner=False)
+def load_overview_summary(entity_type, priority, store_version):
+    try:
+        return get_insights_store().summarize(entity_type, priority)
+    except:
+        return {'documents': 0, 'insights_total': 0, 'high_total': 0}
+
+
+@st.cache_data(show_spinner=False)
+def load_overview_page(entity_type, priority, page, store_version):
+    try:
+        return get_insights_store().list_insights(
+            entity_type=entity_type, priority=priority,
+            limit=OVERVIEW_PAGE_SIZE, offset=(page - 1) * OVERVIEW_PAGE_SIZE
+        )
+    except:
         return []
-    result = []
-    for file in DASHBOARD_PROCESSED_DIR.glob("*_insights_*.json"):
-        try:
-            with open(file) as f:
-                result.append(json.load(f))
-        except:
-            pass
-    return result
+
+
+@st.cache_data(show_spinner=False)
+def load_insight_by_id(insight_id, store_version):
+    try:
+        return get_insights_store().get_by_id(insight_id)
+    except:
+        return None
 
 
 def section_label(text):
@@ -470,17 +558,20 @@ def main():
         st.markdown("---")
 
         entity_filter = 'All'
+        priority_filter = 'All'
         if mode == 'Browse All':
             entity_filter = st.selectbox("Filter", ['All', 'Buyers', 'Sellers'])
+            priority_filter = st.selectbox("Has Priority", ['All', 'High', 'Medium', 'Low'])
 
         st.markdown("---")
 
         if st.button("↺  REFRESH", use_container_width=True):
+            get_sync_watermark.clear()
             st.rerun()
 
         st.markdown("---")
 
-        status = get_db_status()
+        status = get_db_status(get_sync_watermark())
         if status:
             st.markdown(f"""
             <div class="db-ok">
@@ -509,7 +600,7 @@ def main():
 
     # GENERATE MODE
     if mode == 'Generate Insights':
-        available = load_available_entities()
+        available = load_available_entities(get_sync_watermark())
 
         section_label("Configure")
         st.markdown('<div class="gen-panel">', unsafe_allow_html=True)
@@ -564,33 +655,32 @@ def main():
 
         st.markdown('</div>', unsafe_allow_html=True)
 
-        latest = load_latest_insight(entity_type, entity_id)
+        latest = load_latest_insight(entity_type, entity_id, get_store_version())
         if latest:
             st.markdown("---")
             render_insights_section(latest)
 
     # BROWSE MODE
     else:
-        all_insights = load_all_insights()
+        version = get_store_version()
+        type_filter = {'Buyers': 'buyer', 'Sellers': 'seller'}.get(entity_filter)
+        priority = None if priority_filter == 'All' else priority_filter.lower()
 
-        if not all_insights:
+        if not load_overview_summary(None, None, version)['documents']:
             st.markdown('<p style="color:#3d2d2d;">No insights found. Generate some first.</p>', unsafe_allow_html=True)
             st.stop()
 
-        if entity_filter == 'Buyers':
-            all_insights = [i for i in all_insights if i.get('entity_type') == 'buyer']
-        elif entity_filter == 'Sellers':
-            all_insights = [i for i in all_insights if i.get('entity_type') == 'seller']
+        summary = load_overview_summary(type_filter, priority, version)
 
-        if not all_insights:
+        if not summary['documents']:
             st.markdown('<p style="color:#3d2d2d;">No insights match the selected filter.</p>', unsafe_allow_html=True)
             st.stop()
 
         section_label("Overview")
 
-        total = len(all_insights)
-        total_ins = sum(i.get('insights_count', 0) for i in all_insights)
-        high = sum(i.get('high_priority_count', 0) for i in all_insights)
+        total = summary['documents']
+        total_ins = summary['insights_total']
+        high = summary['high_total']
         avg = total_ins / total if total else 0
 
         col1, col2, col3, col4 = st.columns(4)
@@ -602,11 +692,24 @@ def main():
         st.markdown("---")
         section_label("Select Entity")
 
-        options = [f"{i['entity_type'].upper()}  {i['entity_id']}   ·   {i['insights_count']} insights" for i in all_insights]
+        pages = max(1, -(-total // OVERVIEW_PAGE_SIZE))
+        col1, col2 = st.columns([1, 3])
+        with col1:
+            page = st.number_input("Page", min_value=1, max_value=pages, value=1, step=1)
+        with col2:
+            st.markdown(f'<p style="font-size:0.75rem;color:#3d2d2d;margin-top:2.1rem;">Page {page} of {pages}  ·  {total} documents</p>', unsafe_allow_html=True)
+
+        rows = load_overview_page(type_filter, priority, int(page), version)
+        if not rows:
+            st.stop()
+
+        options = [f"{r['entity_type'].upper()}  {r['entity_id']}   ·   {r['insights_count']} insights   ·   {r['generated_at'][:16]}" for r in rows]
         selected_idx = st.selectbox("", range(len(options)), format_func=lambda i: options[i])
 
-        st.markdown("---")
-        render_insights_section(all_insights[selected_idx])
+        selected = load_insight_by_id(rows[selected_idx]['id'], version)
+        if selected:
+            st.markdown("---")
+            render_insights_section(selected)
 
     st.markdown("---")
     st.markdown(f'<p style="font-size:0.68rem;color:#1e1010;letter-spacing:0.1em;text-transform:uppercase;">Vipani Insights  ·  {datetime.now().strftime("%d %b %Y, %H:%M")}</p>', unsafe_allow_html=True)
@@ -2,16 +2,16 @@
 FastAPI application for on-demand insights generation
 """
 
-from fastapi import FastAPI, HTTPException, Query
-from fastapi.responses import JSONResponse
+from fastapi import FastAPI, HTTPException, Query, Request
+from fastapi.responses import JSONResponse, PlainTextResponse
 from datetime import datetime, timedelta
 from pathlib import Path
 import json
 import os
+import time
 
 import config
-from dashboard_executor import DashboardExecutor
-from insights_generator import BenchmarkingInsightsGenerator
+import metrics
 
 app = FastAPI(
     title="Vendor/Buyer Insights API",
@@ -19,9 +19,51 @@ app = FastAPI(
     version="1.0.0"
 )
 
-# Initialize components
-executor = DashboardExecutor()
-generator = BenchmarkingInsightsGenerator()
+# The API server writes the structured metrics log (importing pipeline modules alone doesn't)
+metrics.enable_structured_log()
+
+# Components are created on first use, so workers start without importing
+# psycopg2 / openai / duckdb or touching the databases
+_executor = None
+_generator = None
+_store = None
+
+
+def get_executor():
+    global _executor
+    if _executor is None:
+        from dashboard_executor import DashboardExecutor
+        _executor = DashboardExecutor()
+    return _executor
+
+
+def get_generator():
+    global _generator
+    if _generator is None:
+        from insights_generator import BenchmarkingInsightsGenerator
+        _generator = BenchmarkingInsightsGenerator()
+    return _generator
+
+
+def get_store():
+    global _store
+    if _store is None:
+        from insights_store import InsightsStore
+        _store = InsightsStore()
+    return _store
+
+
+@app.middleware("http")
+async def record_request_metrics(request: Request, call_next):
+    """Latency and status per route template (not per raw path, to keep label sets small)"""
+    started = time.perf_counter()
+    response = await call_next(request)
+    route = request.scope.get('route')
+    path = getattr(route, 'path', 'unmatched')
+    metrics.observe('api_request_seconds', time.perf_counter() - started,
+                    method=request.method, path=path)
+    metrics.inc('api_requests_total', method=request.method, path=path, status=response.status_code)
+    return response
 
 
 @app.get("/")
@@ -35,6 +77,12 @@ def root():
     }
 
 
+@app.get("/metrics", response_class=PlainTextResponse)
+def get_metrics():
+    """Prometheus-style metrics for every pipeline stage in this process"""
+    return metrics.registry.render_prometheus()
+
+
 @app.get("/insights/{entity_type}/{entity_id}")
 def generate_insights(
     entity_type: str,
@@ -77,7 +125,7 @@ def generate_insights(
         )
     
     # Build parameters
-    params = config.DEFAULT_PARAMS[entity_type].copy()
+    params = config.default_params(entity_type)
     
     if start_date:
         params['start_date'] = start_date
@@ -93,10 +141,10 @@ def generate_insights(
         print(f"Period: {params['start_date']} to {params['end_date']}")
         print(f"{'='*60}\n")
         
-        dashboard_file = executor.process_entity(entity_type, entity_id, params)
+        dashboard_file = get_executor().process_entity(entity_type, entity_id, params)
         
         # Step 2: Generate insights
-        insights_file = generator.generate_insights(dashboard_file)
+        insights_file = get_generator().generate_insights(dashboard_file)
         
         # Step 3: Load and return insights
         with open(insights_file, 'r') as f:
@@ -129,6 +177,63 @@ def generate_insights(
         )
 
 
+@app.get("/insights/{entity_type}/{entity_id}/latest")
+def get_latest_insights(entity_type: str, entity_id: int):
+    """
+    Return the most recently generated insights for an entity (no regeneration)
+    
+    Example:
+        GET /insights/buyer/5098/latest
+    """
+    
+    if entity_type not in ['buyer', 'seller']:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Invalid entity_type '{entity_type}'. Must be 'buyer' or 'seller'."
+        )
+    
+    insights_data = get_store().get_latest(entity_type, entity_id)
+    
+    if insights_data is None:
+        raise HTTPException(
+            status_code=404,
+            detail=f"No insights stored for {entity_type} {entity_id}."
+        )
+    
+    return JSONResponse(content={
+        "status": "success",
+        "insights": insights_data
+    })
+
+
+@app.get("/trends/{entity_type}/{entity_id}")
+def get_entity_trends(entity_type: str, entity_id: int):
+    """
+    Trend statistics (growth, slope, volatility, anomalies) for an entity's time series
+    
+    Example:
+        GET /trends/seller/7
+    """
+    
+    if entity_type not in ['buyer', 'seller']:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Invalid entity_type '{entity_type}'. Must be 'buyer' or 'seller'."
+        )
+    
+    try:
+        trends = get_generator().load_entity_trends(entity_type, entity_id)
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    
+    return {
+        "status": "success",
+        "entity_type": entity_type,
+        "entity_id": entity_id,
+        "trends": trends
+    }
+
+
 @app.get("/insights/batch/{entity_type}")
 def generate_insights_batch(
     entity_type: str,
@@ -177,7 +282,7 @@ def generate_insights_batch(
         )
     
     # Build parameters
-    params = config.DEFAULT_PARAMS[entity_type].copy()
+    params = config.default_params(entity_type)
     
     if start_date:
         params['start_date'] = start_date
@@ -191,8 +296,8 @@ def generate_insights_batch(
     
     for entity_id in ids:
         try:
-            dashboard_file = executor.process_entity(entity_type, entity_id, params)
-            insights_file = generator.generate_insights(dashboard_file)
+            dashboard_file = get_executor().process_entity(entity_type, entity_id, params)
+            insights_file = get_generator().generate_insights(dashboard_file)
             
             with open(insights_file, 'r') as f:
                 insights_data = json.load(f)
@@ -0,0 +1,141 @@
+"""
+Change Screening: Decide which entities need fresh LLM insights
+
+Runs the dashboard overview query once for the whole platform, compares
+every entity's overview metrics with the values recorded at its last
+insights run (baseline in the insights store) and scores the change in
+one vectorized pass. Only entities scoring above SCREENING_CONFIG
+min_score are queued; the rest keep their cached insights.
+
+Score = largest relative metric change / PRIORITY_THRESHOLDS medium
+self_deviation, or 1.0 if any metric moved into a different benchmark
+band (vs platform median). New entities and stale baselines are always queued.
+"""
+
+import warnings
+from datetime import datetime, timedelta
+import numpy as np
+import config
+from insights_store import InsightsStore
+
+
+def benchmark_bands(matrix, median):
+    """0 / 1 / 2 = within / beyond medium / beyond high benchmark deviation"""
+    thresholds = config.PRIORITY_THRESHOLDS
+    with np.errstate(invalid='ignore', divide='ignore'):
+        deviation = np.abs(np.where(median != 0, (matrix - median) / np.abs(median) * 100, 0.0))
+    bands = np.zeros(matrix.shape, dtype=np.int8)
+    bands[deviation > thresholds['medium']['benchmark_deviation']] = 1
+    bands[deviation > thresholds['high']['benchmark_deviation']] = 2
+    return bands
+
+
+def change_scores(current, baseline):
+    """
+    Score rows of current vs baseline metric matrices (NaN = unknown)
+    Returns (scores, band_crossed)
+    """
+    with np.errstate(invalid='ignore', divide='ignore'):
+        change_pct = np.where(
+            np.abs(baseline) > 0,
+            np.abs(current - baseline) / np.abs(baseline) * 100,
+            np.where(current == baseline, 0.0, 100.0)     # From / to zero counts as a full change
+        )
+    change_pct = np.where(np.isnan(current) | np.isnan(baseline), 0.0, change_pct)
+    self_score = change_pct.max(axis=1) / config.PRIORITY_THRESHOLDS['medium']['self_deviation']
+
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore', RuntimeWarning)    # metric missing for everyone
+        median = np.nanmedian(current, axis=0) if len(current) else np.full(current.shape[1], np.nan)
+    crossed = (benchmark_bands(current, median) != benchmark_bands(baseline, median)).any(axis=1)
+
+    return np.maximum(self_score, crossed.astype(float)), crossed
+
+
+class ChangeScreener:
+    def __init__(self, executor, store=None):
+        self.executor = executor
+        self.store = store or InsightsStore()
+
+    def fetch_overview(self, entity_type, params):
+        """Platform-wide dashboard overview for the period: {entity_id: row}"""
+        registry = config.QUERY_REGISTRY[entity_type]
+        queries = self.executor.catalog.dashboard_queries(entity_type)
+        query = next(q for q in queries if q['name'] == registry['overview_query'])
+
+        rows = self.executor.execute_query(query['query'], params, name=query['name'])
+        id_col = registry['entity_id_col']
+        return {row[id_col]: row for row in rows if row.get(id_col) is not None}
+
+    def metric_values(self, entity_type, row):
+        return {metric: row.get(metric) for metric in config.SCREENING_CONFIG['metrics'][entity_type]}
+
+    def screen(self, entity_type, params, entity_ids):
+        """
+        Score entity_ids and split them into queued / skipped
+        Returns {'queued', 'skipped', 'scores', 'reasons', 'overview'}
+        """
+        screening = config.SCREENING_CONFIG
+        metrics = screening['metrics'][entity_type]
+        stale_before = (datetime.now() - timedelta(days=screening['max_age_days'])).isoformat()
+
+        overview = self.fetch_overview(entity_type, params)
+        baselines = self.store.get_screening_baselines(entity_type)
+
+        current = np.full((len(entity_ids), len(metrics)), np.nan)
+        baseline = np.full((len(entity_ids), len(metrics)), np.nan)
+        for row, entity_id in enumerate(entity_ids):
+            values = overview.get(entity_id, {})
+            previous = baselines.get(entity_id, ({}, None))[0]
+            for col, metric in enumerate(metrics):
+                if isinstance(values.get(metric), (int, float)):
+                    current[row, col] = values[metric]
+                if isinstance(previous.get(metric), (int, float)):
+                    baseline[row, col] = previous[metric]
+
+        scores, crossed = change_scores(current, baseline)
+
+        result = {'queued': [], 'skipped': [], 'scores': {}, 'reasons': {}, 'overview': overview}
+        for row, entity_id in enumerate(entity_ids):
+            score = float(scores[row])
+
+            if entity_id not in baselines:
+                reason = 'new'
+            elif entity_id not in overview:
+                reason = 'no_overview'
+            elif baselines[entity_id][1] < stale_before:
+                reason = 'stale'
+            elif score >= screening['min_score']:
+                reason = 'threshold' if crossed[row] else 'changed'
+            else:
+                reason = None
+
+            result['scores'][entity_id] = round(score, 3)
+            if reason:
+                result['queued'].append(entity_id)
+                result['reasons'][entity_id] = reason
+            else:
+                result['skipped'].append(entity_id)
+
+        return result
+
+    def record_baselines(self, entity_type, entity_ids, overview):
+        """Entities that just got fresh insights: their current metrics become the baseline"""
+        baselines = {
+            entity_id: self.metric_values(entity_type, overview[entity_id])
+            for entity_id in entity_ids
+            if entity_id in overview
+        }
+        if baselines:
+            self.store.save_screening_baselines(entity_type, baselines)
+        return len(baselines)
+
+    def print_summary(self, entity_type, result):
+        reasons = list(result['reasons'].values())
+        print(f"Screened {len(result['scores'])} active {entity_type}s "
+              f"(min score {config.SCREENING_CONFIG['min_score']})")
+        print(f"  Queued for insights: {len(result['queued'])} "
+              f"(new: {reasons.count('new')}, changed: {reasons.count('changed')}, "
+              f"threshold crossed: {reasons.count('threshold')}, stale: {reasons.count('stale')}, "
+              f"no overview: {reasons.count('no_overview')})")
+        print(f"  Unchanged, keeping cached insights: {len(result['skipped'])}")
@@ -5,17 +5,27 @@ Configuration settings for insights generation system
 import os
 from datetime import datetime, timedelta
 from pathlib import Path
-from dotenv import load_dotenv
 
 
 BASE_DIR = Path(__file__).resolve().parent.parent
 env_path = BASE_DIR / '.env'
 
+# Importing config has no side effects: .env is read into a dict (not into
+# os.environ), nothing is printed and no directories are created - the
+# components that write files create their own directories
 if env_path.exists():
-    load_dotenv(dotenv_path=env_path)
-    print(f" Loaded .env from: {env_path}")
+    from dotenv import dotenv_values
+    _dotenv = dotenv_values(env_path)
 else:
-    print(f" Warning: .env file not found at {env_path}")
+    _dotenv = {}
+
+
+def env(key, default=None):
+    """Environment variable, falling back to .env (real environment wins)"""
+    value = os.environ.get(key)
+    if value is None:
+        value = _dotenv.get(key)
+    return default if value is None else value
 
 
 # ============================================================================
@@ -24,11 +34,35 @@ else:
 
 # PostgreSQL (production - source of truth)
 DB_CONFIG = {
-    'host': os.getenv('DB_HOST'),
-    'database': os.getenv('DB_NAME'),
-    'user': os.getenv('DB_USER'),
-    'password': os.getenv('DB_PASSWORD'),
-    'port': os.getenv('DB_PORT')
+    'host': env('DB_HOST'),
+    'database': env('DB_NAME'),
+    'user': env('DB_USER'),
+    'password': env('DB_PASSWORD'),
+    'port': env('DB_PORT')
+}
+
+# Connection pool used for dashboard queries - see pg_pool.py
+# min == max keeps every connection (and its prepared statements) alive
+PG_POOL_CONFIG = {
+    'min_connections': 4,
+    'max_connections': 4,
+    'prepared_statements': True
+}
+
+# Postgres types for query placeholders when PREPAREing named queries
+QUERY_PARAM_TYPES = {
+    'start_date': 'date',
+    'end_date': 'date',
+    'top_n': 'integer',
+    'time_resolution': 'text',
+    'entity_ids': 'integer[]',
+    'since': 'timestamp',
+    'prev_edge_start': 'date',
+    'prev_edge_end': 'date',
+    'start_edge_start': 'date',
+    'start_edge_end': 'date',
+    'end_edge_start': 'date',
+    'end_edge_end': 'date'
 }
 
 # ============================================================================
@@ -37,7 +71,26 @@ DB_CONFIG = {
 ANALYTICS_DIR = os.path.join(str(BASE_DIR), 'data', 'analytics')
 ANALYTICS_DB_PATH = os.path.join(ANALYTICS_DIR, 'vipani_analytics.db')
 
-os.makedirs(ANALYTICS_DIR, exist_ok=True)
+# Sync builds here, then atomically replaces ANALYTICS_DB_PATH (blue/green)
+ANALYTICS_STAGING_PATH = os.path.join(ANALYTICS_DIR, 'vipani_analytics.staging.db')
+
+# Incremental daily aggregates (not swapped by sync) - see period_metrics.py
+INCREMENTAL_DB_PATH = os.path.join(ANALYTICS_DIR, 'vipani_incremental.db')
+
+# Memory-mapped copy of each sync for readers (see entity_snapshot.py)
+ENTITY_SNAPSHOT_CONFIG = {
+    'enabled': True,           # Sync writes it; generator / dashboard read it before DuckDB
+    'dir': os.path.join(ANALYTICS_DIR, 'snapshot'),
+    'keep_versions': 2         # Previous version stays for processes still reading it
+}
+
+# Partitioned Parquet export for bulk consumers (see parquet_export.py)
+PARQUET_EXPORT_CONFIG = {
+    'enabled': False,          # Export after every sync (or: sync_to_duckdb.py --export-parquet)
+    'dir': os.path.join(ANALYTICS_DIR, 'parquet'),
+    'compression': 'zstd',
+    'keep_days': 90            # Daily entities / aggregates partitions kept (insights are never pruned)
+}
 
 # Entity ID columns in your PostgreSQL/DuckDB table
 ENTITY_ID_COLUMNS = {
@@ -52,14 +105,62 @@ BASELINE_DAYS = 365
 SYNC_CONFIG = {
     'batch_size': 10000,
     'log_path': os.path.join(str(BASE_DIR), 'cron', 'cron_logs', 'sync.log'),
-    'incremental_column': 'updated_at'  # ← Column used to detect new rows
+    'incremental_column': 'updated_at',  # ← Column used to detect new rows
+    'workers': 1,                 # Query worker processes (1 = sequential; raise once measured)
+    'shards': 1,                  # Split non-overview queries into N entity-ID ranges (each shard re-runs the query's CTEs)
+    'shard_min_entities': 500     # Don't shard entity types smaller than this
+}
+
+# Per-entity benchmark profiles materialized at sync - see entity_profiles.py
+PROFILE_CONFIG = {
+    'buyer': {
+        'metrics': [
+            'current_period_purchases', 'purchase_percentage_change',
+            'current_period_quantity', 'avg_price_per_unit_current',
+            'avg_purchase_per_supplier_current', 'items_purchased_current',
+            'suppliers_current', 'new_suppliers_current'
+        ]
+    },
+    'seller': {
+        'metrics': [
+            'total_sales', 'units_sold', 'average_order_value',
+            'total_buyers', 'repeat_buyers', 'repeat_purchase_rate_pct'
+        ]
+    }
+}
+
+# Time series analysed by trend_analytics.py (period column sorts chronologically)
+TREND_CONFIG = {
+    'series': {
+        'buyer': {},                       # No time series in buyer total queries
+        'seller': {
+            'monthly_trends': {'period': 'month', 'value': 'total_sales'},
+            'sales_time_series': {'period': 'date_period', 'value': 'total_sales'}
+        }
+    },
+    'rolling_window': 3,                   # Periods compared in rolling growth
+    'anomaly_z': 3.5                       # Robust z-score above which a period is flagged
+}
+
+# Rolling period-over-period overviews kept in INCREMENTAL_DB_PATH - see period_metrics.py
+PERIOD_METRICS_CONFIG = {
+    'windows': [30, 90, 365],   # Window lengths (days) slid forward on every refresh
+    'lookback_days': 3,         # Re-pull this many days before the last refresh (late item updates)
+    'sketches': True,           # Keep HyperLogLog sketches per buyer per day for approximate distinct counts
+    'sketch_precision': 12,     # 2^p registers; standard error 1.04/sqrt(2^p) = 1.6% at 12 (see hll.py)
+    'approximate_distinct': False, # overview() default for windows that are not maintained (exact if False)
+    'top_k': 50,                # Ranking index keeps this many keys per buyer, window and dimension
+    'serve_rankings': True,     # Dashboard executor answers top_* queries from the index when it covers them
+    'ranking_max_age_minutes': 90, # ...and only if the index was refreshed this recently
+    'rebuild_every_hours': 24,     # A refresh becomes a full rebuild once the last one is this old (clears updated_date drift)
+    'rebuild_max_age_hours': 26    # Rankings / multi-window overviews are served only if also rebuilt this recently
 }
 
 # ============================================================================
 # LLM CONFIGURATION
 # ============================================================================
 
-OPENROUTER_API_KEY = os.getenv('OPENROUTER_API_KEY')
+OPENROUTER_API_KEY = env('OPENROUTER_API_KEY')
 OPENROUTER_BASE_URL = 'https://openrouter.ai/api/v1'
 DEFAULT_MODEL = 'openai/gpt-4o-mini'
 
@@ -81,6 +182,40 @@ DASHBOARD_DATA_DIR = os.path.join(DATA_DIR, 'dashboard_data')
 DASHBOARD_RAW_DIR = os.path.join(DASHBOARD_DATA_DIR, 'raw')
 DASHBOARD_PROCESSED_DIR = os.path.join(DASHBOARD_DATA_DIR, 'processed')
 
+# Dashboard raw files are columnar JSON (see raw_format.py), optionally gzipped
+RAW_DATA_FORMAT = {
+    'compress': True,
+    'compress_level': 6
+}
+
+# Indexed insights store (SQLite) - see insights_store.py
+INSIGHTS_STORE_PATH = os.path.join(DASHBOARD_DATA_DIR, 'insights_store.db')
+
+# Snapshot retention - see retention.py
+RETENTION_CONFIG = {
+    'keep_latest': 3,               # Per (entity, window length) - see retention.py
+    'archive_dir': os.path.join(DASHBOARD_DATA_DIR, 'archive'),
+    'schedule_interval_hours': 24
+}
+
+# Pipeline instrumentation - see metrics.py
+METRICS_CONFIG = {
+    'structured_log': True,    # One JSON line per timed operation - written only by the pipeline
+                               # entry points (sync, run_all, service, API), not by imports / benchmarks
+    'log_path': os.path.join(str(BASE_DIR), 'cron', 'cron_logs', 'metrics.jsonl'),
+    'log_max_bytes': 10 * 1024 * 1024,   # Rotated at this size...
+    'log_backups': 5,                    # ...keeping this many old files
+    'prefix': 'insights_'      # Prometheus metric name prefix
+}
+
+# Resident pipeline service (cron submits jobs to it) - see pipeline_service.py
+PIPELINE_SERVICE_CONFIG = {
+    'host': '127.0.0.1',       # Control endpoint is local only
+    'port': 8790,
+    'job_history': 200,        # Finished jobs kept for status queries
+    'poll_seconds': 2          # Longest client polling interval with --wait
+}
+
 # ============================================================================
 # QUERY FILES (Dashboard only - total queries replaced by DuckDB)
 # ============================================================================
@@ -100,15 +235,14 @@ TOTAL_QUERY_FILES = {
     'seller': 'seller_total_queries.sql'
 }
 
-TOTAL_DATA_PARAMS = {
+# Total (sync) windows: the last `days` days as of each sync - see total_data_params()
+TOTAL_DATA_WINDOWS = {
     'buyer': {
-        'start_date': (datetime.now() - timedelta(days=365)).strftime('%Y-%m-%d'),
-        'end_date': datetime.now().strftime('%Y-%m-%d'),
+        'days': 365,
         'top_n': 20
     },
     'seller': {
-        'start_date': (datetime.now() - timedelta(days=365)).strftime('%Y-%m-%d'),
-        'end_date': datetime.now().strftime('%Y-%m-%d'),
+        'days': 365,
         'top_n': 30,
         'time_resolution': 'month'
     }
@@ -126,19 +260,69 @@ TOTAL_DATA_PARAMS = {
 # QUERY PARAMETERS
 # ============================================================================
 
-DEFAULT_PARAMS = {
+# Dashboard windows: the last `days` days as of each run - see default_params()
+DEFAULT_WINDOWS = {
     'buyer': {
-        'start_date': (datetime.now() - timedelta(days=90)).strftime('%Y-%m-%d'),
-        'end_date': datetime.now().strftime('%Y-%m-%d'),
+        'days': 90,
         'top_n': 10
     },
     'seller': {
-        'start_date': (datetime.now() - timedelta(days=90)).strftime('%Y-%m-%d'),
-        'end_date': datetime.now().strftime('%Y-%m-%d'),
+        'days': 90,
         'top_n': 20
     }
 }
 
+
+def window_params(window):
+    """
+    Query parameters for a window setting: start_date / end_date for the
+    last `days` days as of now, plus the other settings. Computed per call,
+    so a long-running service doesn't keep the dates it started with.
+    """
+    end = datetime.now()
+    params = {k: v for k, v in window.items() if k != 'days'}
+    return {
+        'start_date': (end - timedelta(days=window['days'])).strftime('%Y-%m-%d'),
+        'end_date': end.strftime('%Y-%m-%d'),
+        **params
+    }
+
+
+def total_data_params(entity_type):
+    """Total query parameters for a sync starting now"""
+    return window_params(TOTAL_DATA_WINDOWS[entity_type])
+
+
+def default_params(entity_type):
+    """Dashboard query parameters for a run starting now"""
+    return window_params(DEFAULT_WINDOWS[entity_type])
+
+# Multi-window insights (run_all --windows): every window in one raw document and one LLM call
+MULTI_WINDOW_CONFIG = {
+    'windows': [30, 90, 365],     # Default window lengths (days), all ending on the same day
+    'use_period_metrics': True    # Buyers: overview / rankings of every window from the period metrics day buckets when current
+}
+
+# Which entities count as active in a window - see entity_discovery.py
+ENTITY_DISCOVERY = {
+    'source': 'postgres',      # 'postgres' (exact) or 'duckdb' (from the last sync, no Postgres load)
+    'cache_ttl_minutes': 60,   # Reuse a window's ID set this long (0 = always re-query)
+    # DuckDB source: entity is active if this synced series has value > 0 in a
+    # period overlapping the window; types without one use every synced entity
+    'activity_series': {
+        'buyer': None,
+        'seller': {'query': 'monthly_trends', 'period': 'month', 'value': 'order_count'}
+    }
+}
+
+# Reuse raw dashboard snapshots of entities with no new orders - see delta_refresh.py
+DELTA_REFRESH_CONFIG = {
+    'enabled': True,
+    'max_age_days': 7,         # Re-query anyway once the snapshot's queries are this old (catches deletions / reassignments)
+    'allow_window_shift': True, # Rolling windows (--days) may reuse if no orders crossed the moved edges
+    'order_change_columns': ['created_date', 'updated_date']  # po_details timestamps checked with po_items'
+}
+
 # ============================================================================
 # INSIGHTS GENERATION SETTINGS
 # ============================================================================
@@ -170,6 +354,24 @@ PRIORITY_THRESHOLDS = {
     }
 }
 
+# Change screening before LLM generation - see change_screening.py
+SCREENING_CONFIG = {
+    'enabled': True,
+    'min_score': 1.0,        # 1.0 = largest metric change reaches PRIORITY_THRESHOLDS medium self_deviation
+    'max_age_days': 7,       # Regenerate anyway once the last insights are this old
+    'metrics': {
+        'buyer': [
+            'current_period_purchases', 'current_period_quantity',
+            'avg_price_per_unit_current', 'items_purchased_current',
+            'suppliers_current', 'new_suppliers_current'
+        ],
+        'seller': [
+            'total_sales', 'units_sold', 'average_order_value',
+            'total_buyers', 'repeat_buyers', 'repeat_purchase_rate_pct'
+        ]
+    }
+}
+
 # ============================================================================
 # INSIGHT VALIDATION
 # ============================================================================
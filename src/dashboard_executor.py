@@ -2,108 +2,84 @@
 Dashboard Executor: Run dashboard-specific queries for individual entities
 """
 
-import psycopg2
-import psycopg2.extras
 import json
 import os
 import argparse
 from datetime import datetime
 from pathlib import Path
 import config
-from query_parser import QueryParser
+from query_catalog import get_catalog
+from pg_pool import PreparedQueryRunner
+from entity_discovery import EntityDiscovery
+from delta_refresh import DeltaRefresh
+from insights_store import InsightsStore
+from period_metrics import PeriodMetrics, RANKINGS
+import metrics
+import raw_format
+import row_convert
 
 class DashboardExecutor:
     def __init__(self, db_config=None):
         self.db_config = db_config or config.DB_CONFIG
-        self.parser = QueryParser()
+        self.catalog = get_catalog()
+        self.runner = PreparedQueryRunner(self.db_config)
+        self.store = InsightsStore()
+        self.discovery = EntityDiscovery(self.runner, self.store)
+        self.delta = DeltaRefresh(self.runner, self.store)
+        self.period_metrics = PeriodMetrics(self.runner)
         
         # Ensure directories exist
         os.makedirs(config.DASHBOARD_RAW_DIR, exist_ok=True)
     
     def get_connection(self):
         """Create database connection"""
+        import psycopg2
         return psycopg2.connect(**self.db_config)
     
-    def get_active_entity_ids(self, entity_type, params):
-        """Get all active entity IDs for a given entity type within date range"""
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        
-        start_date = params['start_date']
-        end_date = params['end_date']
-        
-        if entity_type == 'buyer':
-            query = f"""
-            SELECT DISTINCT pd.buyer_org_id 
-            FROM po_details pd
-            JOIN po_items pi ON pd.id = pi.po_id
-            WHERE pd.buyer_org_id IS NOT NULL
-              AND pi.updated_date BETWEEN '{start_date}' AND '{end_date}'
-            ORDER BY pd.buyer_org_id
-            """
-        else:  # seller
-            query = f"""
-            SELECT DISTINCT pd.seller_org_id 
-            FROM po_details pd
-            JOIN po_items pi ON pd.id = pi.po_id
-            WHERE pd.seller_org_id IS NOT NULL
-              AND pi.created_date BETWEEN '{start_date}' AND '{end_date}'
-            ORDER BY pd.seller_org_id
-            """
-        
-        cursor.execute(query)
-        ids = [row[0] for row in cursor.fetchall()]
-        
-        cursor.close()
-        conn.close()
-        
-        return ids
+    def get_active_entity_ids(self, entity_type, params, source=None, refresh=False):
+        """Get all active entity IDs for a given entity type within date range (cached)"""
+        return self.discovery.active_entity_ids(entity_type, params, source, refresh)
     
     def load_dashboard_queries(self, entity_type):
-        """Load dashboard queries from SQL file"""
-        query_file = config.DASHBOARD_QUERY_FILES[entity_type]
-        query_path = os.path.join(config.DASHBOARD_QUERIES_DIR, entity_type, query_file)
-        
-        print(f"Loading dashboard queries from: {query_path}")
-        queries = self.parser.parse_file(query_path)
+        """Load dashboard queries from the shared catalog (parsed once per file change)"""
+        queries = self.catalog.dashboard_queries(entity_type)
         print(f"Found {len(queries)} queries: {[q['name'] for q in queries]}")
         
         return queries
     
-    def execute_query(self, query, params):
-        """Execute query with parameters"""
-        conn = self.get_connection()
-        cursor = conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor)
-        
+    def execute_query(self, query, params, name=None, entity_filter=None):
+        """
+        Execute query with parameters (prepared once per pooled connection when named)
+        entity_filter=(column, value) drops other entities' rows before conversion
+        """
         try:
-            cursor.execute(query, params)
-            results = cursor.fetchall()
+            if name:
+                results, description = self.runner.execute(name, query, params)
+            else:
+                conn = self.get_connection()
+                cursor = conn.cursor()
+                try:
+                    cursor.execute(query, params)
+                    results = cursor.fetchall()
+                    description = cursor.description
+                finally:
+                    cursor.close()
+                    conn.close()
             
-            # Convert to serializable format
-            results_list = []
-            for row in results:
-                row_dict = dict(row)
-                for key, value in row_dict.items():
-                    if hasattr(value, 'isoformat'):
-                        row_dict[key] = value.isoformat()
-                    elif isinstance(value, (int, float, str, bool, type(None))):
-                        pass
-                    else:
-                        row_dict[key] = str(value)
-                results_list.append(row_dict)
+            if entity_filter:
+                results = row_convert.filter_rows(description, results, *entity_filter)
             
-            return results_list
+            # Convert to serializable format (Decimals stay numeric)
+            columns, rows = row_convert.convert_rows(description, results)
+            return row_convert.rows_to_dicts(columns, rows)
         except Exception as e:
             print(f"Error executing query: {e}")
             raise
-        finally:
-            cursor.close()
-            conn.close()
     
-    def execute_for_entity(self, entity_type, entity_id, params=None):
-        """Execute dashboard queries for specific entity"""
+    def execute_for_entity(self, entity_type, entity_id, params=None, queries=None):
+        """Execute dashboard queries for specific entity (all catalog queries unless given)"""
         if params is None:
-            params = config.DEFAULT_PARAMS[entity_type].copy()
+            params = config.default_params(entity_type)
         
         print(f"\n{'='*60}")
         print(f"Executing Dashboard Queries")
@@ -112,7 +88,8 @@ class DashboardExecutor:
         print(f"Period: {params['start_date']} to {params['end_date']}")
         print(f"{'='*60}\n")
         
-        queries = self.load_dashboard_queries(entity_type)
+        if queries is None:
+            queries = self.load_dashboard_queries(entity_type)
         
         results = {
             'entity_type': entity_type,
@@ -130,10 +107,14 @@ class DashboardExecutor:
             print(f"  Executing {query_name}...")
             
             try:
-                query_results = self.execute_query(query_info['query'], params)
-                
-                # Filter for this entity
-                filtered = [r for r in query_results if r.get(id_field) == entity_id]
+                filtered = self.ranking_from_index(entity_type, entity_id, query_name, params)
+                if filtered is None:
+                    # Filter for this entity (ID column from catalog metadata)
+                    query_id_field = query_info.get('entity_id_col') or id_field
+                    filtered = self.execute_query(
+                        query_info['query'], params,
+                        name=query_name, entity_filter=(query_id_field, entity_id)
+                    )
                 
                 results['queries'][query_name] = {
                     'description': query_info['description'],
@@ -152,14 +133,102 @@ class DashboardExecutor:
         
         return results
     
+    def execute_windows(self, entity_type, entity_ids, window_params):
+        """
+        Dashboard queries of several windows per entity: {entity_id: results},
+        with results['windows'][days] shaped like execute_for_entity's output.
+        Buyer overview / rankings come from the period metrics day buckets for
+        all entities and windows at once when current; the rest runs per window.
+        """
+        queries = self.load_dashboard_queries(entity_type)
+        longest = max(window_params)
+
+        served = {}
+        if (config.MULTI_WINDOW_CONFIG['use_period_metrics'] and entity_type in RANKINGS
+                and os.path.exists(config.INCREMENTAL_DB_PATH)):
+            for days, params in window_params.items():
+                try:
+                    with metrics.timer('multi_window_seconds', entity_type=entity_type, source='period_metrics'):
+                        served[days] = self.period_metrics.dashboards(entity_type, params, entity_ids)
+                    print(f"✓ {days}-day window from period metrics ({len(entity_ids)} {entity_type}s)")
+                except Exception as e:
+                    print(f"⚠ {days}-day window not served from period metrics ({e}), querying Postgres")
+
+        results = {}
+        for entity_id in entity_ids:
+            windows = {}
+            for days, params in window_params.items():
+                from_store = served.get(days, {}).get(entity_id, {})
+                remaining = [q for q in queries if q['name'] not in from_store]
+                executed = {}
+                if remaining:
+                    executed = self.execute_for_entity(entity_type, entity_id, params, queries=remaining)['queries']
+
+                window_queries = {}
+                for query_info in queries:
+                    name = query_info['name']
+                    if name in from_store:
+                        window_queries[name] = {
+                            'description': query_info['description'],
+                            'result_count': len(from_store[name]),
+                            'data': from_store[name]
+                        }
+                    else:
+                        window_queries[name] = executed[name]
+                windows[days] = {'parameters': params, 'queries': window_queries}
+
+            results[entity_id] = {
+                'entity_type': entity_type,
+                'entity_id': entity_id,
+                'execution_timestamp': datetime.now().isoformat(),
+                'parameters': {**window_params[longest], 'windows': sorted(window_params)},
+                'windows': windows
+            }
+        return results
+
+    def process_entities_windows(self, entity_type, entity_ids, window_params):
+        """Execute and save one multi-window raw document per entity; returns file paths"""
+        id_col = config.QUERY_REGISTRY[entity_type]['entity_id_col']
+        return [
+            self.save_dashboard_document(entity_type, entity_id, raw_format.encode_windows(results, id_col))
+            for entity_id, results in self.execute_windows(entity_type, entity_ids, window_params).items()
+        ]
+
+    def ranking_from_index(self, entity_type, entity_id, query_name, params):
+        """Rows of a top_* query from the period metrics ranking index, or None to run the SQL"""
+        if not config.PERIOD_METRICS_CONFIG['serve_rankings'] or query_name not in RANKINGS.get(entity_type, {}):
+            return None
+        if not os.path.exists(config.INCREMENTAL_DB_PATH):
+            return None
+
+        try:
+            rows = self.period_metrics.ranking(
+                entity_type, query_name, params, entity_ids=[entity_id], require_index=True
+            )
+        except Exception as e:
+            # Window not maintained, index stale or locked by a refresh
+            metrics.inc('cache_requests_total', cache='ranking_index', result='miss')
+            print(f"    ↺ Ranking index not used ({e}), querying Postgres")
+            return None
+
+        metrics.inc('cache_requests_total', cache='ranking_index', result='hit')
+        print(f"    ✓ From ranking index")
+        return rows
+
     def save_dashboard_raw(self, entity_type, entity_id, data):
-        """Save dashboard raw data"""
+        """Save dashboard raw data (compact columnar format, see raw_format.py)"""
+        id_col = config.QUERY_REGISTRY[entity_type]['entity_id_col']
+        return self.save_dashboard_document(entity_type, entity_id, raw_format.encode_dashboard(data, id_col))
+    
+    def save_dashboard_document(self, entity_type, entity_id, document):
+        """Save an already columnar dashboard document"""
         timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-        filename = f"{entity_type}_{entity_id}_dashboard_{timestamp}.json"
+        tag = raw_format.period_tag(document.get('parameters') or {})
+        suffix = f"_{tag}" if tag else ""
+        filename = f"{entity_type}_{entity_id}_dashboard_{timestamp}{suffix}{raw_format.raw_extension()}"
         filepath = os.path.join(config.DASHBOARD_RAW_DIR, filename)
         
-        with open(filepath, 'w') as f:
-            json.dump(data, f, indent=2)
+        raw_format.save_dashboard(document, filepath)
         
         print(f"\n{'='*60}")
         print(f"✓ Saved dashboard raw data to:")
@@ -170,23 +239,43 @@ class DashboardExecutor:
     
     def process_entity(self, entity_type, entity_id, params=None):
         """Execute queries and save for single entity"""
+        # Delta refresh compares this with po_items timestamps - take it from the DB clock
+        try:
+            snapshot_at = self.delta.db_now()
+        except Exception as e:
+            snapshot_at = None
+            print(f"⚠ Could not read the DB clock, snapshot not indexed for delta refresh: {e}")
+        
         results = self.execute_for_entity(entity_type, entity_id, params)
         filepath = self.save_dashboard_raw(entity_type, entity_id, results)
+        
+        # Index for delta refresh: data is current as of when the queries started
+        if snapshot_at:
+            self.store.save_raw_snapshot(
+                entity_type, entity_id, filepath, results['parameters'], snapshot_at
+            )
         return filepath
     
-    def process_all_entities(self, entity_type, params=None, limit=None):
-        """Process all active entities of a given type"""
+    def process_all_entities(self, entity_type, params=None, limit=None, entity_ids=None, delta=None):
+        """
+        Process all active entities of a given type (or just entity_ids, e.g. after screening)
+        With delta refresh, entities without new orders reuse their previous raw data
+        Returns {entity_id: raw file path} of the entities processed
+        """
         if params is None:
-            params = config.DEFAULT_PARAMS[entity_type].copy()
-        
-        # Get active entity IDs
-        print(f"\n{'='*60}")
-        print(f"Finding Active {entity_type.upper()}S")
-        print(f"{'='*60}")
-        print(f"Period: {params['start_date']} to {params['end_date']}")
-        print(f"{'='*60}\n")
+            params = config.default_params(entity_type)
+        if delta is None:
+            delta = config.DELTA_REFRESH_CONFIG['enabled']
         
-        entity_ids = self.get_active_entity_ids(entity_type, params)
+        if entity_ids is None:
+            # Get active entity IDs
+            print(f"\n{'='*60}")
+            print(f"Finding Active {entity_type.upper()}S")
+            print(f"{'='*60}")
+            print(f"Period: {params['start_date']} to {params['end_date']}")
+            print(f"{'='*60}\n")
+            
+            entity_ids = self.get_active_entity_ids(entity_type, params)
         
         if limit:
             entity_ids = entity_ids[:limit]
@@ -195,19 +284,39 @@ class DashboardExecutor:
         
         if not entity_ids:
             print(f"No active {entity_type}s found in the specified period.")
-            return []
+            return {}
+        
+        reusable = {}
+        self.delta.last_plan = {'checked': 0, 'reused': 0, 'changed': len(entity_ids)}
+        if delta:
+            try:
+                reusable = self.delta.plan(entity_type, params, entity_ids)
+                print(f"Delta refresh: {len(reusable)} unchanged since last snapshot, "
+                      f"{len(entity_ids) - len(reusable)} to query")
+            except Exception as e:
+                print(f"⚠ Delta check failed, querying all entities: {e}")
         
-        processed_files = []
+        processed_files = {}
         errors = []
         
         for i, entity_id in enumerate(entity_ids, 1):
+            if entity_id in reusable:
+                try:
+                    processed_files[entity_id] = self.delta.reuse(
+                        entity_type, entity_id, reusable[entity_id], params, self.save_dashboard_document
+                    )
+                    print(f"↺ {entity_type} {entity_id}: no new orders, reusing {Path(reusable[entity_id]['file_path']).name}")
+                    continue
+                except Exception as e:
+                    self.delta.last_plan['reused'] -= 1
+                    print(f"⚠ Could not reuse snapshot for {entity_type} {entity_id}, querying: {e}")
+            
             print(f"\n{'='*60}")
             print(f"Processing {i}/{len(entity_ids)}")
             print(f"{'='*60}")
             
             try:
-                filepath = self.process_entity(entity_type, entity_id, params)
-                processed_files.append(filepath)
+                processed_files[entity_id] = self.process_entity(entity_type, entity_id, params)
             except Exception as e:
                 print(f"\n✗ Error processing {entity_type} {entity_id}: {e}")
                 errors.append((entity_id, str(e)))
@@ -218,8 +327,13 @@ class DashboardExecutor:
         print(f"EXECUTION COMPLETE")
         print(f"{'='*60}")
         print(f"Successfully processed: {len(processed_files)}/{len(entity_ids)}")
+        print(f"Reused unchanged snapshots: {self.delta.last_plan['reused']}")
         print(f"Errors: {len(errors)}")
         
+        stats = self.runner.stats_summary()
+        print(f"Prepared statements: {stats['prepares']} prepared, "
+              f"{stats['prepared_hits']} reused ({stats['prepared_hit_rate']:.1%} hit rate)")
+        
         if errors:
             print("\nFailed entities:")
             for entity_id, error in errors[:10]:  # Show first 10 errors
@@ -257,8 +371,8 @@ Examples:
 
 Output:
   Creates files in data/dashboard_data/raw/:
-  - buyer_5098_dashboard_20260212_143024.json
-  - seller_7_dashboard_20260212_143156.json
+  - buyer_5098_dashboard_20260212_143024_90d.json.gz
+  - seller_7_dashboard_20260212_143156_90d.json.gz
 
 Next Steps:
   After running this, use insights_generator.py to generate insights:
@@ -321,7 +435,7 @@ Next Steps:
         exit(1)
     
     # Build parameters
-    params = config.DEFAULT_PARAMS[args.entity].copy()
+    params = config.default_params(args.entity)
     
     if args.start_date:
         params['start_date'] = args.start_date
@@ -0,0 +1,208 @@
+"""
+Delta Refresh: Reuse raw dashboard snapshots of entities with no new orders
+
+Every raw dashboard file is indexed in the insights store (raw_snapshots)
+with the time its data was known to be current. Before an --all run, one
+grouped query finds each candidate's latest change to its orders - the
+po_items and po_details timestamps (created_date / updated_date); entities
+with nothing newer than their snapshot keep their previous raw data and
+skip the dashboard queries.
+
+Deleted items and orders moved to another buyer/seller leave no timestamp
+behind for the entity that lost them, so no snapshot is reused for longer
+than max_age_days after its queries last ran: that full refresh bounds how
+long such changes can go unseen.
+
+Rolling windows (--days) move every day. With allow_window_shift a
+snapshot for an equally long, earlier window is still reusable when the
+entity has no items in the ranges the move affects (the dropped start of
+the previous period, the current/previous boundary and the new end days);
+the raw file is then re-saved with the new parameters. A move into another
+month or quarter is never reused: the seller trend queries have one row per
+month / quarter of the window, so their row set changes with it.
+
+Snapshot and check times come from the Postgres clock, like the po_items
+timestamps they are compared with.
+"""
+
+import os
+from datetime import date, datetime, timedelta
+import config
+import metrics
+import raw_format
+from entity_discovery import ACTIVITY_COLUMNS
+
+CHANGED_SQL = """
+    SELECT pd.{id_col}, MAX(GREATEST(pi.created_date, pi.updated_date, {order_columns}))
+    FROM po_items pi
+    JOIN po_details pd ON pd.id = pi.po_id
+    WHERE pd.{id_col} = ANY(%(entity_ids)s)
+      AND (pi.created_date >= %(since)s OR pi.updated_date >= %(since)s OR {order_since})
+    GROUP BY pd.{id_col}
+"""
+
+SHIFTED_SQL = """
+    SELECT DISTINCT pd.{id_col}
+    FROM po_items pi
+    JOIN po_details pd ON pd.id = pi.po_id
+    WHERE pd.{id_col} = ANY(%(entity_ids)s)
+      AND ({item_edges} OR {order_edges})
+"""
+
+EDGES_SQL = """(({col} >= %(prev_edge_start)s AND {col} < %(prev_edge_end)s)
+        OR ({col} >= %(start_edge_start)s AND {col} < %(start_edge_end)s)
+        OR ({col} > %(end_edge_start)s AND {col} <= %(end_edge_end)s))"""
+
+
+def _as_date(value):
+    return value if isinstance(value, date) else date.fromisoformat(str(value)[:10])
+
+
+def _series_periods(day):
+    """Month and quarter a window edge falls in (date_trunc in the trend queries' series)"""
+    return (day.year, day.month), (day.year, (day.month - 1) // 3)
+
+
+def window_shift(old_params, new_params):
+    """
+    None if the snapshot can't serve the new parameters, 0 if they are
+    identical, else the number of days the window moved forward
+    """
+    old = {k: v for k, v in old_params.items() if k not in ('start_date', 'end_date')}
+    new = {k: v for k, v in new_params.items() if k not in ('start_date', 'end_date')}
+    if old != new:
+        return None
+
+    old_start, old_end = _as_date(old_params['start_date']), _as_date(old_params['end_date'])
+    new_start, new_end = _as_date(new_params['start_date']), _as_date(new_params['end_date'])
+    shift = (new_start - old_start).days
+    if (new_end - old_end).days != shift or shift < 0:
+        return None
+    if shift and (_series_periods(old_start) != _series_periods(new_start)
+                  or _series_periods(old_end) != _series_periods(new_end)):
+        return None
+    return shift
+
+
+def shift_ranges(old_params, new_params):
+    """
+    Edges where items enter or leave the current / previous period when the
+    window moves forward (previous period = same length, just before start)
+    """
+    old_start, old_end = _as_date(old_params['start_date']), _as_date(old_params['end_date'])
+    new_start, new_end = _as_date(new_params['start_date']), _as_date(new_params['end_date'])
+    length = timedelta(days=(old_end - old_start).days + 1)
+    return {
+        'prev_edge_start': old_start - length,            # Leaving the previous period
+        'prev_edge_end': new_start - length,
+        'start_edge_start': old_start - timedelta(days=1),  # Current -> previous
+        'start_edge_end': new_start,
+        'end_edge_start': old_end,                         # Entering the current period
+        'end_edge_end': new_end
+    }
+
+
+class DeltaRefresh:
+    def __init__(self, runner, store):
+        self.runner = runner
+        self.store = store
+        self.last_plan = {'checked': 0, 'reused': 0, 'changed': 0}
+
+    def db_now(self):
+        """Postgres clock as ISO text (LOCALTIMESTAMP, comparable to the TIMESTAMP columns)"""
+        rows, _ = self.runner.execute('delta_db_now', "SELECT LOCALTIMESTAMP", {})
+        return rows[0][0].isoformat()
+
+    def plan(self, entity_type, params, entity_ids):
+        """{entity_id: snapshot} of entities whose previous raw data is still valid"""
+        delta_config = config.DELTA_REFRESH_CONFIG
+        checked_at = datetime.fromisoformat(self.db_now())
+        oldest_query = (checked_at - timedelta(days=delta_config['max_age_days'])).isoformat()
+
+        candidates = {}
+        for entity_id, snapshot in self.store.get_raw_snapshots(entity_type, entity_ids).items():
+            shift = window_shift(snapshot['parameters'], params)
+            if shift is None or (shift and not delta_config['allow_window_shift']):
+                continue
+            if snapshot['queried_at'] < oldest_query or not os.path.exists(snapshot['file_path']):
+                continue
+            candidates[entity_id] = {**snapshot, 'shift': shift}
+
+        changed = set()
+        if candidates:
+            with metrics.timer('delta_check_seconds', entity_type=entity_type):
+                changed = self.changed_entities(entity_type, params, candidates)
+
+        reusable = {
+            entity_id: {**snapshot, 'checked_at': checked_at.isoformat()}
+            for entity_id, snapshot in candidates.items()
+            if entity_id not in changed
+        }
+
+        metrics.inc('cache_requests_total', len(reusable), cache='raw_snapshots', result='hit')
+        metrics.inc('cache_requests_total', len(entity_ids) - len(reusable), cache='raw_snapshots', result='miss')
+        self.last_plan = {
+            'checked': len(entity_ids),
+            'reused': len(reusable),
+            'changed': len(entity_ids) - len(reusable)
+        }
+        return reusable
+
+    def changed_entities(self, entity_type, params, candidates):
+        """Candidates with order / item changes since their snapshot, or orders across moved window edges"""
+        id_col, date_col = ACTIVITY_COLUMNS[entity_type]
+        since = min(snapshot['snapshot_at'] for snapshot in candidates.values())
+        order_columns = [f"pd.{col}" for col in config.DELTA_REFRESH_CONFIG['order_change_columns']]
+
+        query = CHANGED_SQL.format(
+            id_col=id_col,
+            order_columns=', '.join(order_columns),
+            order_since=' OR '.join(f"{col} >= %(since)s" for col in order_columns)
+        )
+        rows, _ = self.runner.execute(
+            f"delta_changed_{entity_type}", query, {'entity_ids': list(candidates), 'since': since}
+        )
+        changed = {
+            entity_id for entity_id, last_change in rows
+            if last_change is not None
+            and last_change >= datetime.fromisoformat(candidates[entity_id]['snapshot_at'])
+        }
+
+        # Shifted windows: one query per distinct old window (normally one per run)
+        by_window = {}
+        for entity_id, snapshot in candidates.items():
+            if snapshot['shift'] and entity_id not in changed:
+                old = snapshot['parameters']
+                by_window.setdefault((str(old['start_date']), str(old['end_date'])), []).append(entity_id)
+
+        for (old_start, old_end), entity_ids in by_window.items():
+            ranges = shift_ranges({'start_date': old_start, 'end_date': old_end}, params)
+            # Item dates, and order dates (seller repeat_purchase_metrics filters on pd.created_date)
+            query = SHIFTED_SQL.format(
+                id_col=id_col,
+                item_edges=EDGES_SQL.format(col=f"pi.{date_col}"),
+                order_edges=EDGES_SQL.format(col="pd.created_date")
+            )
+            rows, _ = self.runner.execute(
+                f"delta_shifted_{entity_type}", query, {'entity_ids': entity_ids, **ranges}
+            )
+            changed.update(row[0] for row in rows)
+
+        return changed
+
+    def reuse(self, entity_type, entity_id, snapshot, params, save_raw):
+        """Raw file for the new run from a still-valid snapshot; returns its path"""
+        if snapshot['shift']:
+            # Same data, new window: re-save with the new parameters
+            document = raw_format.load_dashboard(snapshot['file_path'])
+            document['parameters'] = params
+            document['reused_from'] = os.path.basename(snapshot['file_path'])
+            filepath = save_raw(entity_type, entity_id, document)
+        else:
+            filepath = snapshot['file_path']
+
+        self.store.save_raw_snapshot(
+            entity_type, entity_id, filepath, params,
+            snapshot_at=snapshot['checked_at'], queried_at=snapshot['queried_at']
+        )
+        return filepath
@@ -0,0 +1,149 @@
+"""
+Entity Discovery: Which buyers/sellers were active in a date window
+
+Postgres source: one EXISTS query per entity type with bound dates, run as
+a prepared statement (planned once per pooled connection). It probes
+po_items by date, so an index on the date column keeps it cheap:
+
+    CREATE INDEX ON po_items (updated_date);   -- buyers
+    CREATE INDEX ON po_items (created_date);   -- sellers
+
+DuckDB source: derived from the last sync's entities table, with no
+Postgres load (see ENTITY_DISCOVERY activity_series). Monthly periods make
+it a slight superset of the exact set.
+
+Either way the ID set is cached per (entity type, window, source) in the
+insights store for ENTITY_DISCOVERY cache_ttl_minutes.
+"""
+
+import json
+from datetime import datetime, timedelta
+import config
+import metrics
+from insights_store import InsightsStore
+
+# Same activity rules as the original DISTINCT join: buyers by item update
+# date, sellers by item creation date. (po_details ID column, po_items date column)
+ACTIVITY_COLUMNS = {
+    'buyer': ('buyer_org_id', 'updated_date'),
+    'seller': ('seller_org_id', 'created_date')
+}
+
+ACTIVE_ENTITY_SQL = {
+    'buyer': """
+        SELECT pd.buyer_org_id
+        FROM po_details pd
+        WHERE pd.buyer_org_id IS NOT NULL
+          AND EXISTS (
+              SELECT 1 FROM po_items pi
+              WHERE pi.po_id = pd.id
+                AND pi.updated_date BETWEEN %(start_date)s AND %(end_date)s
+          )
+        GROUP BY pd.buyer_org_id
+        ORDER BY pd.buyer_org_id
+    """,
+    'seller': """
+        SELECT pd.seller_org_id
+        FROM po_details pd
+        WHERE pd.seller_org_id IS NOT NULL
+          AND EXISTS (
+              SELECT 1 FROM po_items pi
+              WHERE pi.po_id = pd.id
+                AND pi.created_date BETWEEN %(start_date)s AND %(end_date)s
+          )
+        GROUP BY pd.seller_org_id
+        ORDER BY pd.seller_org_id
+    """
+}
+
+SOURCES = ('postgres', 'duckdb')
+
+
+def period_in_window(period, start_date, end_date):
+    """'2025-10' / '2025-10-01T00:00:00' style period overlaps [start_date, end_date]"""
+    period = str(period)
+    return start_date[:len(period)] <= period <= end_date[:len(period)]
+
+
+class EntityDiscovery:
+    def __init__(self, runner=None, store=None, db_config=None):
+        self._runner = runner
+        self.db_config = db_config
+        self.store = store or InsightsStore()
+
+    @property
+    def runner(self):
+        """Shared PreparedQueryRunner if given, else a single-connection one of our own"""
+        if self._runner is None:
+            from pg_pool import PreparedQueryRunner
+            self._runner = PreparedQueryRunner(
+                self.db_config,
+                pool_config={**config.PG_POOL_CONFIG, 'min_connections': 1, 'max_connections': 1}
+            )
+        return self._runner
+
+    def active_entity_ids(self, entity_type, params, source=None, refresh=False):
+        """Sorted IDs of entities active between params start_date and end_date"""
+        source = source or config.ENTITY_DISCOVERY['source']
+        if source not in SOURCES:
+            raise ValueError(f"Unknown entity discovery source '{source}' (expected one of: {', '.join(SOURCES)})")
+
+        start_date, end_date = str(params['start_date']), str(params['end_date'])
+        if source == 'duckdb' and start_date < config.total_data_params(entity_type)['start_date']:
+            print(f"⚠ Window starts before the synced history - discovering {entity_type}s from Postgres")
+            source = 'postgres'
+
+        ttl = config.ENTITY_DISCOVERY['cache_ttl_minutes']
+        if ttl and not refresh:
+            computed_after = (datetime.now() - timedelta(minutes=ttl)).isoformat()
+            cached = self.store.get_active_entities(entity_type, start_date, end_date, source, computed_after)
+            if cached is not None:
+                metrics.inc('cache_requests_total', cache='active_entities', result='hit')
+                return cached
+            metrics.inc('cache_requests_total', cache='active_entities', result='miss')
+
+        with metrics.timer('entity_discovery_seconds', entity_type=entity_type, source=source):
+            if source == 'duckdb':
+                ids = self.from_duckdb(entity_type, start_date, end_date)
+            else:
+                ids = self.from_postgres(entity_type, start_date, end_date)
+
+        if ttl:
+            self.store.save_active_entities(entity_type, start_date, end_date, source, ids)
+        return ids
+
+    def from_postgres(self, entity_type, start_date, end_date):
+        rows, _ = self.runner.execute(
+            f"active_{entity_type}_ids", ACTIVE_ENTITY_SQL[entity_type],
+            {'start_date': start_date, 'end_date': end_date}
+        )
+        return [row[0] for row in rows]
+
+    def from_duckdb(self, entity_type, start_date, end_date):
+        import duckdb
+
+        series = config.ENTITY_DISCOVERY['activity_series'].get(entity_type)
+        conn = duckdb.connect(config.ANALYTICS_DB_PATH, read_only=True)
+        try:
+            if not series:
+                rows = conn.execute("""
+                SELECT entity_id FROM entities WHERE entity_type = ? ORDER BY entity_id
+                """, [entity_type]).fetchall()
+                return [row[0] for row in rows]
+
+            # Pull just the activity series out of each entity's JSON
+            rows = conn.execute("""
+            SELECT entity_id, json_extract(queries_data, ?) FROM entities
+            WHERE entity_type = ? ORDER BY entity_id
+            """, [f"$.{series['query']}", entity_type]).fetchall()
+        finally:
+            conn.close()
+
+        return [
+            entity_id for entity_id, points in rows
+            if any(
+                (point.get(series['value']) or 0) > 0
+                and period_in_window(point.get(series['period']), start_date, end_date)
+                for point in json.loads(points or '[]')
+            )
+        ]
@@ -0,0 +1,116 @@
+"""
+Entity Profiles: Compact per-entity benchmark profiles built at sync time
+
+For every entity the key overview metrics are positioned against the whole
+platform in one vectorized pass (value, platform median, % deviation vs
+median, percentile, z-score), plus the trend statistics from
+trend_analytics.py. The generator reads one narrow row per entity instead
+of decoding the full history blob.
+"""
+
+import numpy as np
+import config
+import trend_analytics
+
+
+def metric_matrix(entity_type, entities):
+    """
+    (entity_ids, metric names, float matrix entities x metrics)
+    Missing / non-numeric values are NaN
+    """
+    profile_config = config.PROFILE_CONFIG[entity_type]
+    overview_key = config.QUERY_REGISTRY[entity_type]['overview_query']
+    metrics = profile_config['metrics']
+
+    entity_ids = list(entities.keys())
+    matrix = np.full((len(entity_ids), len(metrics)), np.nan)
+
+    for row_index, entity_id in enumerate(entity_ids):
+        overview = entities[entity_id].get(overview_key) or [{}]
+        for col_index, metric in enumerate(metrics):
+            value = overview[0].get(metric)
+            if isinstance(value, (int, float)) and not isinstance(value, bool):
+                matrix[row_index, col_index] = value
+
+    return entity_ids, metrics, matrix
+
+
+def position_metrics(matrix):
+    """
+    Platform position of every cell, column by column:
+    median, std, deviation vs median (%), percentile (0-100), z-score
+    """
+    with np.errstate(invalid='ignore', divide='ignore'):
+        median = np.nanmedian(matrix, axis=0)
+        mean = np.nanmean(matrix, axis=0)
+        std = np.nanstd(matrix, axis=0)
+
+        deviation = np.where(median != 0, (matrix - median) / np.abs(median) * 100, np.nan)
+        z_score = np.where(std > 0, (matrix - mean) / std, 0.0)
+
+    percentile = np.full(matrix.shape, np.nan)
+    for col in range(matrix.shape[1]):
+        column = matrix[:, col]
+        valid = ~np.isnan(column)
+        if valid.any():
+            ordered = np.sort(column[valid])
+            # Share of entities at or below this value
+            ranks = np.searchsorted(ordered, column[valid], side='right')
+            percentile[valid, col] = ranks / len(ordered) * 100
+
+    return {
+        'median': median,
+        'std': std,
+        'deviation_vs_median_pct': deviation,
+        'percentile': percentile,
+        'z_score': np.where(np.isnan(matrix), np.nan, z_score)
+    }
+
+
+def _rounded(value, digits=2):
+    if value is None or np.isnan(value):
+        return None
+    return round(float(value), digits)
+
+
+def build_profiles(entity_type, entities):
+    """{entity_id: profile dict} for all entities of one type"""
+    if not entities:
+        return {}
+
+    overview_key = config.QUERY_REGISTRY[entity_type]['overview_query']
+
+    entity_ids, metrics, matrix = metric_matrix(entity_type, entities)
+    positions = position_metrics(matrix)
+    trends = trend_analytics.analyze_batch(entity_type, entities)
+
+    profiles = {}
+    for row, entity_id in enumerate(entity_ids):
+        data = entities[entity_id]
+        overview = data.get(overview_key) or [{}]
+
+        profile = {
+            'entity_type': entity_type,
+            'entity_id': entity_id,
+            'platform_entities': len(entity_ids),
+            'overview': overview[0],
+            'metrics': {}
+        }
+
+        for col, metric in enumerate(metrics):
+            if np.isnan(matrix[row, col]):
+                continue
+            profile['metrics'][metric] = {
+                'value': _rounded(matrix[row, col]),
+                'platform_median': _rounded(positions['median'][col]),
+                'deviation_vs_median_pct': _rounded(positions['deviation_vs_median_pct'][row, col]),
+                'percentile': _rounded(positions['percentile'][row, col], 1),
+                'z_score': _rounded(positions['z_score'][row, col])
+            }
+
+        if trends.get(entity_id):
+            profile['trends'] = trends[entity_id]
+
+        profiles[entity_id] = profile
+
+    return profiles
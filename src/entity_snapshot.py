@@ -0,0 +1,283 @@
+"""
+Entity Snapshot: Memory-mapped, read-optimized copy of each DuckDB sync
+
+Readers otherwise open DuckDB and query per entity, so every new process
+starts cold. After each sync the analytics DB is also written out as a
+snapshot directory that readers memory-map:
+
+    <ENTITY_SNAPSHOT_CONFIG dir>/
+      CURRENT                      name of the active version (swapped atomically)
+      <version>/manifest.json      sync time, entity counts, platform aggregates
+      <version>/buyer_ids.npy      sorted entity IDs (int64)
+      <version>/buyer_history.offsets.npy + buyer_history.bin   history JSON per entity
+      <version>/buyer_profile.offsets.npy + buyer_profile.bin   profile JSON per entity
+      ... same for seller
+
+Each column is an offsets array plus one data buffer (the layout of an
+Arrow binary column, without needing pyarrow). A lookup is a binary search
+on the mapped IDs and one slice of the mapped buffer, so only the pages of
+that entity are read - through the OS page cache, shared by every worker
+process, with nothing to load at startup.
+
+Readers check CURRENT on each call and remap after a new sync; versions
+beyond keep_versions are deleted (open maps stay valid until closed).
+With no snapshot - or disabled - readers fall back to DuckDB.
+
+    python src/entity_snapshot.py build      # from the live DB (sync does this itself)
+    python src/entity_snapshot.py status
+    python src/entity_snapshot.py get --entity buyer --id 42
+"""
+
+import argparse
+import json
+import os
+import shutil
+import threading
+from datetime import datetime
+from pathlib import Path
+import config
+import metrics
+
+SNAPSHOT_FORMAT = 'entity-snapshot-v1'
+ENTITY_TYPES = ('buyer', 'seller')
+COLUMNS = {                  # column: (DuckDB table, JSON column)
+    'history': ('entities', 'queries_data'),
+    'profile': ('entity_profiles', 'profile')
+}
+
+
+# ============================================================
+# WRITE
+# ============================================================
+
+def write_column(directory, name, values):
+    """Offsets + buffer files for a list of str / None (None is stored as empty)"""
+    import numpy as np
+
+    offsets = np.zeros(len(values) + 1, dtype=np.int64)
+    with open(os.path.join(directory, f"{name}.bin"), 'wb') as f:
+        for i, value in enumerate(values):
+            if value is not None:
+                offsets[i + 1] = f.write(value.encode('utf-8'))
+    np.save(os.path.join(directory, f"{name}.offsets.npy"), np.cumsum(offsets))
+
+
+def build(db_path=None, root=None):
+    """Write a new snapshot version from an analytics DB; returns its directory (not yet active)"""
+    import duckdb
+    import numpy as np
+
+    root = root or config.ENTITY_SNAPSHOT_CONFIG['dir']
+    version = datetime.now().strftime('%Y%m%d_%H%M%S_%f')
+    directory = os.path.join(root, version)
+    building = directory + '.building'
+    os.makedirs(building)
+
+    conn = duckdb.connect(db_path or config.ANALYTICS_DB_PATH, read_only=True)
+    try:
+        manifest = {
+            'format': SNAPSHOT_FORMAT,
+            'version': version,
+            'created_at': datetime.now().isoformat(),
+            'synced_at': conn.execute("SELECT MAX(synced_at) FROM sync_log").fetchone()[0],
+            'entities': {},
+            'aggregates': {
+                entity_type: json.loads(data) for entity_type, data in
+                conn.execute("SELECT entity_type, aggregates_data FROM aggregates").fetchall()
+            }
+        }
+
+        for entity_type in ENTITY_TYPES:
+            ids = [row[0] for row in conn.execute("""
+            SELECT entity_id FROM entities WHERE entity_type = ? ORDER BY entity_id
+            """, [entity_type]).fetchall()]
+            np.save(os.path.join(building, f"{entity_type}_ids.npy"), np.array(ids, dtype=np.int64))
+
+            for column, (table, value_col) in COLUMNS.items():
+                # Aligned with the sorted IDs (NULL where an entity has no profile)
+                rows = conn.execute(f"""
+                SELECT c.{value_col} FROM entities e
+                LEFT JOIN {table} c ON c.entity_id = e.entity_id AND c.entity_type = e.entity_type
+                WHERE e.entity_type = ? ORDER BY e.entity_id
+                """, [entity_type]).fetchall()
+                write_column(building, f"{entity_type}_{column}", [row[0] for row in rows])
+
+            manifest['entities'][entity_type] = len(ids)
+    except BaseException:
+        shutil.rmtree(building, ignore_errors=True)
+        raise
+    finally:
+        conn.close()
+
+    with open(os.path.join(building, 'manifest.json'), 'w') as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(building, directory)
+    return directory
+
+
+def activate(directory, root=None):
+    """Point CURRENT at a built version and delete versions beyond keep_versions"""
+    root = root or config.ENTITY_SNAPSHOT_CONFIG['dir']
+    pointer = os.path.join(root, 'CURRENT')
+    with open(pointer + '.tmp', 'w') as f:
+        f.write(os.path.basename(directory))
+    os.replace(pointer + '.tmp', pointer)
+
+    versions = sorted(
+        p for p in os.listdir(root)
+        if os.path.isdir(os.path.join(root, p)) and not p.endswith('.building')
+    )
+    for old in versions[:-config.ENTITY_SNAPSHOT_CONFIG['keep_versions']]:
+        shutil.rmtree(os.path.join(root, old), ignore_errors=True)
+
+
+def deactivate(root=None):
+    """Readers go back to DuckDB (e.g. the snapshot for a new sync could not be built)"""
+    pointer = os.path.join(root or config.ENTITY_SNAPSHOT_CONFIG['dir'], 'CURRENT')
+    if os.path.exists(pointer):
+        os.remove(pointer)
+
+
+# ============================================================
+# READ
+# ============================================================
+
+class EntitySnapshot:
+    def __init__(self, root=None):
+        self.root = root or config.ENTITY_SNAPSHOT_CONFIG['dir']
+        self._lock = threading.Lock()
+        self._state = None      # (version, manifest, {entity_type: mapped columns})
+
+    def _current(self):
+        """(version, manifest, columns) of the active version, remapped after a new sync; None if none"""
+        try:
+            version = Path(self.root, 'CURRENT').read_text().strip()
+        except FileNotFoundError:
+            return None
+
+        state = self._state
+        if state is None or state[0] != version:
+            with self._lock:
+                if self._state is None or self._state[0] != version:
+                    with open(os.path.join(self.root, version, 'manifest.json')) as f:
+                        self._state = (version, json.load(f), {})
+                state = self._state
+        return state
+
+    def _columns(self, state, entity_type):
+        import numpy as np
+
+        version, manifest, mapped = state
+        if entity_type not in mapped and entity_type in manifest['entities']:
+            directory = os.path.join(self.root, version)
+            try:
+                columns = {'ids': np.load(os.path.join(directory, f"{entity_type}_ids.npy"), mmap_mode='r')}
+                for column in COLUMNS:
+                    path = os.path.join(directory, f"{entity_type}_{column}")
+                    columns[f"{column}_offsets"] = np.load(f"{path}.offsets.npy", mmap_mode='r')
+                    # np.memmap refuses empty files
+                    columns[column] = (np.memmap(f"{path}.bin", dtype=np.uint8, mode='r')
+                                       if os.path.getsize(f"{path}.bin") else np.empty(0, dtype=np.uint8))
+            except FileNotFoundError:
+                return None     # Version pruned by a newer sync before this type was mapped
+            mapped[entity_type] = columns
+        return mapped.get(entity_type)
+
+    def _lookup(self, column, entity_type, entity_id):
+        state = self._current()
+        columns = self._columns(state, entity_type) if state else None
+        if columns is None:
+            return None
+
+        ids = columns['ids']
+        i = int(ids.searchsorted(entity_id))
+        if i == len(ids) or ids[i] != entity_id:
+            return None
+        start, end = columns[f"{column}_offsets"][i:i + 2]
+        if start == end:
+            return None
+        return json.loads(columns[column][start:end].tobytes())
+
+    def history(self, entity_type, entity_id):
+        """{query_name: rows} of the entity's total data, or None"""
+        return self._lookup('history', entity_type, entity_id)
+
+    def profile(self, entity_type, entity_id):
+        """Benchmark profile (entity_profiles.py), or None"""
+        return self._lookup('profile', entity_type, entity_id)
+
+    def aggregates(self, entity_type):
+        state = self._current()
+        return state[1]['aggregates'].get(entity_type) if state else None
+
+    def entity_ids(self, entity_type):
+        """Sorted entity IDs, or None if there is no snapshot"""
+        state = self._current()
+        columns = self._columns(state, entity_type) if state else None
+        return None if columns is None else columns['ids'].tolist()
+
+    def manifest(self):
+        state = self._current()
+        return state[1] if state else None
+
+
+_shared = None
+
+
+def get_snapshot():
+    """Process-wide reader, or None when ENTITY_SNAPSHOT_CONFIG is disabled"""
+    global _shared
+    if not config.ENTITY_SNAPSHOT_CONFIG['enabled']:
+        return None
+    if _shared is None:
+        _shared = EntitySnapshot()
+    return _shared
+
+
+def lookup(kind, entity_type, entity_id=None):
+    """history / profile / aggregates from the shared snapshot (None = not there, use DuckDB)"""
+    snapshot = get_snapshot()
+    if snapshot is None:
+        return None
+    with metrics.timer('snapshot_load_seconds', table=kind):
+        if kind == 'aggregates':
+            value = snapshot.aggregates(entity_type)
+        else:
+            value = getattr(snapshot, kind)(entity_type, entity_id)
+    metrics.inc('cache_requests_total', cache='entity_snapshot', result='miss' if value is None else 'hit')
+    return value
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Memory-mapped entity snapshot of the analytics DB')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    subparsers.add_parser('build', help='Write and activate a snapshot of the live analytics DB')
+    subparsers.add_parser('status', help='Active version and entity counts')
+    get_parser = subparsers.add_parser('get', help="Print one entity's history and profile")
+    get_parser.add_argument('--entity', choices=ENTITY_TYPES, required=True)
+    get_parser.add_argument('--id', type=int, required=True)
+    args = parser.parse_args()
+
+    if args.command == 'build':
+        started = datetime.now()
+        directory = build()
+        activate(directory)
+        manifest = EntitySnapshot().manifest()
+        print(f"✓ Snapshot {manifest['version']} active ({manifest['entities']}) "
+              f"in {(datetime.now() - started).total_seconds():.2f}s")
+    elif args.command == 'status':
+        manifest = EntitySnapshot().manifest()
+        if manifest is None:
+            print("✗ No active snapshot (readers use DuckDB) - run: python src/entity_snapshot.py build")
+        else:
+            print(json.dumps({k: v for k, v in manifest.items() if k != 'aggregates'}, indent=2))
+    else:
+        snapshot = EntitySnapshot()
+        print(json.dumps({
+            'history': snapshot.history(args.entity, args.id),
+            'profile': snapshot.profile(args.entity, args.id)
+        }, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,95 @@
+"""
+HyperLogLog: Mergeable approximate distinct-count sketches (numpy)
+
+A sketch has m = 2^p registers. Each value is hashed (splitmix64); the top
+p bits pick a register, which keeps the highest rank (1 + leading zeros of
+the remaining bits) seen. Sketches merge by register-wise MAX, so sketches
+stored per entity per day combine into a distinct count for any date range
+at a cost bounded by m per stored sketch, however many rows they summarize.
+Sketches are kept sparse: one (register, rank) pair per non-empty register.
+
+Error bound: relative standard error 1.04 / sqrt(m), i.e. 1.6% at p=12
+(m=4096) - about 95% of estimates within ±3.3% and 99.7% within ±4.9%.
+Up to 3·m distinct values the estimate uses linear counting instead, which
+is tighter for small sets; just above the switch the raw estimate runs
+~0.5x the standard error high and the RMS error rises to ~1.25x. At most
+1% of estimates are off by more than 3x the standard error.
+tests/test_hll.py checks these figures (fixed seeds, with sampling margin).
+"""
+
+import numpy as np
+
+MIN_PRECISION = 7      # alpha below is only valid for m >= 128
+MAX_PRECISION = 16     # register index must fit SMALLINT-sized storage
+LINEAR_COUNTING_LIMIT = 3.0   # Use linear counting up to this many times m distinct values
+
+
+def check_precision(p):
+    if not MIN_PRECISION <= p <= MAX_PRECISION:
+        raise ValueError(f"HyperLogLog precision must be {MIN_PRECISION}-{MAX_PRECISION}, got {p}")
+
+
+def standard_error(p):
+    """Relative standard error of an estimate at precision p"""
+    return 1.04 / np.sqrt(1 << p)
+
+
+def hash64(values):
+    """splitmix64 of int64 values as uint64 (stable across runs and platforms)"""
+    x = np.asarray(values, dtype=np.int64).astype(np.uint64)
+    with np.errstate(over='ignore'):
+        x = x + np.uint64(0x9E3779B97F4A7C15)
+        x = (x ^ (x >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+        x = (x ^ (x >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+        return x ^ (x >> np.uint64(31))
+
+
+def _leading_zeros(x):
+    """Leading zero bits of uint64 values (63 for 0)"""
+    zeros = np.zeros(x.shape, dtype=np.uint8)
+    for shift in (32, 16, 8, 4, 2, 1):
+        short = x < (np.uint64(1) << np.uint64(64 - shift))
+        zeros[short] += shift
+        x = np.where(short, x << np.uint64(shift), x)
+    return zeros
+
+
+def registers(values, p):
+    """(register index, rank) of each value"""
+    check_precision(p)
+    hashed = hash64(values)
+    index = (hashed >> np.uint64(64 - p)).astype(np.int16 if p < 16 else np.int32)
+    rest = hashed << np.uint64(p)
+    max_rank = 64 - p + 1
+    rank = np.where(rest == 0, max_rank, np.minimum(_leading_zeros(rest) + 1, max_rank)).astype(np.int8)
+    return index, rank
+
+
+def dense(index, rank, p):
+    """Merge (register, rank) pairs into a dense register array"""
+    merged = np.zeros(1 << p, dtype=np.int8)
+    np.maximum.at(merged, index, rank)
+    return merged
+
+
+def estimate(nonzero, harmonic_sum, p):
+    """
+    Distinct-count estimate from a merged sketch's summary, vectorized:
+    nonzero = registers with rank > 0, harmonic_sum = sum of 2^-rank over them
+    """
+    m = 1 << p
+    alpha = 0.7213 / (1 + 1.079 / m)
+    nonzero = np.asarray(nonzero, dtype=float)
+    zeros = m - nonzero
+    raw = alpha * m * m / (np.asarray(harmonic_sum, dtype=float) + zeros)
+    linear = m * np.log(m / np.where(zeros > 0, zeros, 1))
+    # The raw estimate is biased upward below ~3m; linear counting is
+    # tighter there (switching on the linear estimate, not the raw one)
+    return np.where((linear <= LINEAR_COUNTING_LIMIT * m) & (zeros > 0), linear, raw)
+
+
+def count(values, p):
+    """Estimated distinct values of one collection"""
+    merged = dense(*registers(values, p), p)
+    filled = merged[merged > 0]
+    return float(estimate(len(filled), np.ldexp(1.0, -filled.astype(int)).sum(), p))
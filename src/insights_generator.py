@@ -7,19 +7,34 @@ import os
 import argparse
 from datetime import datetime
 from pathlib import Path
-from openai import OpenAI
 import config
-import sqlite3
+import raw_format
+import metrics
+import entity_snapshot
+from insights_store import InsightsStore
 
 class BenchmarkingInsightsGenerator:
     def __init__(self, api_key=None):
         self.api_key = api_key or config.OPENROUTER_API_KEY
-        self.client = OpenAI(
-            base_url=config.OPENROUTER_BASE_URL,
-            api_key=self.api_key
-        )
-        
+        self._client = None
+
         self._aggregates_cache ={}
+        self.store = InsightsStore()
+        
+    @property
+    def client(self):
+        """OpenAI client, created on first LLM call (openai is slow to import)"""
+        if self._client is None:
+            from openai import OpenAI
+            self._client = OpenAI(
+                base_url=config.OPENROUTER_BASE_URL,
+                api_key=self.api_key
+            )
+        return self._client
+
+    def clear_aggregates_cache(self):
+        """Drop cached aggregates (call after a DuckDB sync)"""
+        self._aggregates_cache.clear()
         
     def get_sqlite_path(self, entity_type):
         """Get SQLite database path"""
@@ -32,17 +47,23 @@ class BenchmarkingInsightsGenerator:
         return os.path.join(config.TOTAL_DATA_DIR, filename)
     
     def load_entity_from_duckdb(self, entity_type, entity_id):
-        """Loads all queries dynamically - no hardcoding"""
-        import duckdb
+        """Loads all queries dynamically - no hardcoding (memory-mapped snapshot first)"""
+        data = entity_snapshot.lookup('history', entity_type, entity_id)
+        if data is not None:
+            print(f"✓ Loaded {len(data)} queries from snapshot: {list(data.keys())}")
+            return data
         
-        conn = duckdb.connect(config.ANALYTICS_DB_PATH)
-        
-        result = conn.execute("""
-        SELECT queries_data FROM entities 
-        WHERE entity_id = ? AND entity_type = ?
-        """, [entity_id, entity_type]).fetchone()
+        import duckdb
         
-        conn.close()
+        with metrics.timer('duckdb_load_seconds', table='entities'):
+            conn = duckdb.connect(config.ANALYTICS_DB_PATH, read_only=True)
+            
+            result = conn.execute("""
+            SELECT queries_data FROM entities 
+            WHERE entity_id = ? AND entity_type = ?
+            """, [entity_id, entity_type]).fetchone()
+            
+            conn.close()
         
         if not result:
             raise ValueError(f"No data found for {entity_type} {entity_id}")
@@ -56,25 +77,89 @@ class BenchmarkingInsightsGenerator:
         return data
     
     
-    def load_aggregates_from_duckdb(self, entity_type):
-        """Load aggregates from DuckDB - replaces JSON files"""
+    def load_entity_profile(self, entity_type, entity_id):
+        """Precomputed benchmark profile (one narrow row), or None if not synced yet"""
+        profile = entity_snapshot.lookup('profile', entity_type, entity_id)
+        if profile is not None:
+            return profile
+        
         import duckdb
         
+        with metrics.timer('duckdb_load_seconds', table='entity_profiles'):
+            conn = duckdb.connect(config.ANALYTICS_DB_PATH, read_only=True)
+            
+            try:
+                result = conn.execute("""
+                SELECT profile FROM entity_profiles
+                WHERE entity_id = ? AND entity_type = ?
+                """, [entity_id, entity_type]).fetchone()
+            except duckdb.CatalogException:
+                # Analytics DB synced before profiles existed
+                result = None
+            finally:
+                conn.close()
+        
+        return json.loads(result[0]) if result else None
+    
+    def _history_section(self, label, entity_total_data, profile):
+        """Prompt block for the entity's own history - profile if available, full history otherwise"""
+        if profile:
+            return (
+                f"{label}'S BENCHMARK PROFILE (lifetime values; per metric: platform median, "
+                f"% deviation vs median, percentile 0-100, z-score; trends = growth, slope, CV and anomalies per series):\n"
+                f"{json.dumps(profile, separators=raw_format.COMPACT_SEPARATORS)}"
+            )
+        section = f"{label}'S LIFETIME/HISTORICAL DATA:\n{json.dumps(entity_total_data, indent=2)}"
+        
+        trends = {k: v for k, v in self.trends_from_history(label.lower(), entity_total_data).items() if v}
+        if trends:
+            section += (
+                f"\n\n{label}'S TREND ANALYTICS (growth, linear slope, coefficient of variation, anomalous periods):\n"
+                f"{json.dumps(trends, separators=raw_format.COMPACT_SEPARATORS)}"
+            )
+        return section
+    
+    def trends_from_history(self, entity_type, entity_total_data):
+        if not entity_total_data:
+            return {}
+        import trend_analytics
+        return trend_analytics.analyze_entity(entity_type, entity_total_data)
+    
+    def load_entity_trends(self, entity_type, entity_id):
+        """Trend stats from the synced profile, computed from full history if there is none"""
+        profile = self.load_entity_profile(entity_type, entity_id)
+        if profile is not None:
+            return profile.get('trends', {})
+        return self.trends_from_history(entity_type, self.load_entity_from_duckdb(entity_type, entity_id))
+    
+    def load_aggregates_from_duckdb(self, entity_type):
+        """Load aggregates from DuckDB - replaces JSON files"""
         # Cache per session
         if entity_type in self._aggregates_cache:
+            metrics.inc('cache_requests_total', cache='aggregates', result='hit')
             print(f"✓ Loaded aggregates from cache")
             return self._aggregates_cache[entity_type]
         
-        print(f"Loading platform aggregates from DuckDB...")
+        metrics.inc('cache_requests_total', cache='aggregates', result='miss')
         
-        conn = duckdb.connect(config.ANALYTICS_DB_PATH)
+        aggregates = entity_snapshot.lookup('aggregates', entity_type)
+        if aggregates is not None:
+            self._aggregates_cache[entity_type] = aggregates
+            print(f"✓ Loaded platform aggregates from snapshot ({aggregates.get('total_count', 0)} {entity_type}s)")
+            return aggregates
         
-        result = conn.execute("""
-        SELECT aggregates_data FROM aggregates 
-        WHERE entity_type = ?
-        """, [entity_type]).fetchone()
+        print(f"Loading platform aggregates from DuckDB...")
+        import duckdb
         
-        conn.close()
+        with metrics.timer('duckdb_load_seconds', table='aggregates'):
+            conn = duckdb.connect(config.ANALYTICS_DB_PATH, read_only=True)
+            
+            result = conn.execute("""
+            SELECT aggregates_data FROM aggregates 
+            WHERE entity_type = ?
+            """, [entity_type]).fetchone()
+            
+            conn.close()
         
         if not result:
             raise ValueError(f"No aggregates found for {entity_type}")
@@ -101,15 +186,29 @@ class BenchmarkingInsightsGenerator:
             return json.load(f)
     
     def load_dashboard_raw(self, filepath):
-        """Load dashboard raw data"""
-        with open(filepath, 'r') as f:
-            return json.load(f)
+        """Load dashboard raw data (columnar or legacy, plain or gzipped)"""
+        return raw_format.load_dashboard(filepath)
     
     def get_entity_from_total(self, total_data, entity_id):
         """Extract specific entity from total data"""
         return total_data['entities'].get(str(entity_id))
     
-    def generate_buyer_insights(self, dashboard_data, entity_total_data, aggregates):
+    def _dashboard_section(self, dashboard_data):
+        """Prompt section with the dashboard data: one window, or several to compare"""
+        data = json.dumps(dashboard_data, separators=raw_format.COMPACT_SEPARATORS)
+        windows = dashboard_data['parameters'].get('windows')
+        if not windows:
+            return f"CURRENT DASHBOARD DATA (Last 90 days, column-oriented: each column lists one value per row):\n{data}"
+
+        return f"""CURRENT DASHBOARD DATA FOR {len(windows)} WINDOWS ending {dashboard_data['parameters']['end_date']} ({', '.join(map(str, windows))} days; "windows" is keyed by window length in days, column-oriented: each column lists one value per row):
+{data}
+
+WINDOW COMPARISON:
+- Compare the windows with each other: is recent (short-window) performance accelerating, slowing or departing from the longer-term pattern?
+- Prefer insights that hold across windows or show a change between them over restating one window's numbers
+- Add "windows": [the window lengths the insight is based on, e.g. "30", "365"] to each insight"""
+
+    def generate_buyer_insights(self, dashboard_data, entity_total_data, aggregates, profile=None):
         """Generate buyer insights with benchmarking"""
         
         # Use config for insight counts
@@ -124,11 +223,9 @@ class BenchmarkingInsightsGenerator:
         prompt = f"""
 You are a procurement analytics expert. Analyze this buyer's current performance against their historical data and industry benchmarks.
 
-CURRENT DASHBOARD DATA (Last 90 days):
-{json.dumps(dashboard_data, indent=2)}
+{self._dashboard_section(dashboard_data)}
 
-BUYER'S LIFETIME/HISTORICAL DATA:
-{json.dumps(entity_total_data, indent=2)}
+{self._history_section('BUYER', entity_total_data, profile)}
 
 INDUSTRY BENCHMARKS (All Buyers):
 {json.dumps(aggregates, indent=2)}
@@ -197,21 +294,14 @@ Key Focus Areas:
 Respond ONLY with valid JSON, no additional text.
 """
         
-        response = self.client.chat.completions.create(
-            model=config.DEFAULT_MODEL,
-            messages=[{"role": "user", "content": prompt}],
-            temperature=config.LLM_CONFIG['temperature'],
-            max_tokens=config.LLM_CONFIG['max_tokens']
-        )
-        
-        insights_text = response.choices[0].message.content.strip()
+        insights_text = self._complete(prompt, 'buyer')
         
         # Parse and validate
         insights = self._parse_and_validate_insights(insights_text)
         
         return insights
     
-    def generate_seller_insights(self, dashboard_data, entity_total_data, aggregates):
+    def generate_seller_insights(self, dashboard_data, entity_total_data, aggregates, profile=None):
         """Generate seller insights with benchmarking"""
         
         # Use config for insight counts
@@ -226,11 +316,9 @@ Respond ONLY with valid JSON, no additional text.
         prompt = f"""
 You are a sales analytics expert. Analyze this seller's current performance against their historical data and industry benchmarks.
 
-CURRENT DASHBOARD DATA (Last 90 days):
-{json.dumps(dashboard_data, indent=2)}
+{self._dashboard_section(dashboard_data)}
 
-SELLER'S LIFETIME/HISTORICAL DATA:
-{json.dumps(entity_total_data, indent=2)}
+{self._history_section('SELLER', entity_total_data, profile)}
 
 INDUSTRY BENCHMARKS (All Sellers):
 {json.dumps(aggregates, indent=2)}
@@ -305,20 +393,31 @@ Key Focus Areas:
 Respond ONLY with valid JSON, no additional text.
 """
         
-        response = self.client.chat.completions.create(
-            model=config.DEFAULT_MODEL,
-            messages=[{"role": "user", "content": prompt}],
-            temperature=config.LLM_CONFIG['temperature'],
-            max_tokens=config.LLM_CONFIG['max_tokens']
-        )
-        
-        insights_text = response.choices[0].message.content.strip()
+        insights_text = self._complete(prompt, 'seller')
         
         # Parse and validate
         insights = self._parse_and_validate_insights(insights_text)
         
         return insights
     
+    def _complete(self, prompt, entity_type):
+        """One LLM call - records latency and token usage"""
+        with metrics.timer('llm_request_seconds', entity_type=entity_type, model=config.DEFAULT_MODEL):
+            response = self.client.chat.completions.create(
+                model=config.DEFAULT_MODEL,
+                messages=[{"role": "user", "content": prompt}],
+                temperature=config.LLM_CONFIG['temperature'],
+                max_tokens=config.LLM_CONFIG['max_tokens']
+            )
+        
+        usage = getattr(response, 'usage', None)
+        if usage:
+            metrics.inc('llm_tokens_total', usage.prompt_tokens or 0, kind='prompt')
+            metrics.inc('llm_tokens_total', usage.completion_tokens or 0, kind='completion')
+        metrics.inc('llm_requests_total', entity_type=entity_type)
+        
+        return response.choices[0].message.content.strip()
+    
     def _parse_and_validate_insights(self, insights_text):
         """Parse LLM response and validate against config rules"""
         try:
@@ -493,16 +592,23 @@ Respond ONLY with valid JSON, no additional text.
         print(f"\nEntity: {entity_type.upper()} {entity_id}")
         print(f"Dashboard Period: {dashboard_data['parameters']['start_date']} to {dashboard_data['parameters']['end_date']}")
         
-        # Load entity's historical data from SQLite DATABASE (FAST!)
-        print(f"\nLoading historical data for {entity_type} {entity_id} from DuckDB...")
-        entity_total = self.load_entity_from_duckdb(entity_type, entity_id)
+        # Precomputed benchmark profile - one narrow row instead of the full history
+        profile = self.load_entity_profile(entity_type, entity_id)
         
-        if not entity_total:
-            print(f"⚠ Warning: No historical data found for {entity_type} {entity_id}")
-            print(f"   Insights will be limited to current period analysis only")
+        if profile:
+            print(f"\n✓ Loaded benchmark profile for {entity_type} {entity_id} ({len(profile['metrics'])} metrics)")
             entity_total = {}
         else:
-            print(f"✓ Loaded historical data ({len(entity_total)} queries)")
+            # No profile yet (DB synced before profiles) - fall back to the full history
+            print(f"\nLoading historical data for {entity_type} {entity_id} from DuckDB...")
+            entity_total = self.load_entity_from_duckdb(entity_type, entity_id)
+            
+            if not entity_total:
+                print(f"⚠ Warning: No historical data found for {entity_type} {entity_id}")
+                print(f"   Insights will be limited to current period analysis only")
+                entity_total = {}
+            else:
+                print(f"✓ Loaded historical data ({len(entity_total)} queries)")
         
         # Load platform aggregates (cached after first load)
         print(f"Loading platform aggregates...")
@@ -511,18 +617,20 @@ Respond ONLY with valid JSON, no additional text.
         
         print(f"✓ Loaded platform aggregates ({aggregates.get('total_count', 0)} {entity_type}s)")
         
-        # Format data for LLM
-        formatted_dashboard = {
-            'parameters': dashboard_data['parameters'],
-            'queries': dashboard_data['queries']
-        }
+        # Format data for LLM (multi-window documents: all windows in one prompt)
+        formatted_dashboard = {'parameters': dashboard_data['parameters']}
+        if 'windows' in dashboard_data:
+            formatted_dashboard['windows'] = dashboard_data['windows']
+            print(f"✓ {len(dashboard_data['windows'])} windows: {', '.join(dashboard_data['windows'])} days")
+        else:
+            formatted_dashboard['queries'] = dashboard_data['queries']
         
         # Generate insights based on entity type
         print(f"\nGenerating insights with LLM...")
         if entity_type == 'buyer':
-            insights = self.generate_buyer_insights(formatted_dashboard, entity_total, aggregates)
+            insights = self.generate_buyer_insights(formatted_dashboard, entity_total, aggregates, profile)
         else:  # seller
-            insights = self.generate_seller_insights(formatted_dashboard, entity_total, aggregates)
+            insights = self.generate_seller_insights(formatted_dashboard, entity_total, aggregates, profile)
         
         print(f"✓ Generated {len(insights)} insights")
         
@@ -561,8 +669,11 @@ Respond ONLY with valid JSON, no additional text.
             'comparison_types': comparison_counts,
             'source_dashboard_file': dashboard_raw_filepath,
             'total_data_version': aggregates_data.get('generated_at'),
-            'has_historical_data': entity_total is not None and len(entity_total) > 0
+            'has_historical_data': bool(profile) or (entity_total is not None and len(entity_total) > 0),
+            'used_benchmark_profile': bool(profile)
         }
+        if 'windows' in dashboard_data:
+            processed['windows'] = dashboard_data['parameters']['windows']
         
         # Save
         output_filepath = self.save_insights(entity_type, entity_id, processed)
@@ -573,22 +684,31 @@ Respond ONLY with valid JSON, no additional text.
     def save_insights(self, entity_type, entity_id, processed_data):
         """Save processed insights to JSON file"""
         timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-        filename = f"{entity_type}_{entity_id}_insights_{timestamp}.json"
+        tag = raw_format.period_tag(processed_data.get('dashboard_period') or {})
+        suffix = f"_{tag}" if tag else ""
+        filename = f"{entity_type}_{entity_id}_insights_{timestamp}{suffix}.json"
         filepath = os.path.join(config.DASHBOARD_PROCESSED_DIR, filename)
         
         # Ensure directory exists
         os.makedirs(config.DASHBOARD_PROCESSED_DIR, exist_ok=True)
         
-        with open(filepath, 'w') as f:
-            json.dump(processed_data, f, indent=2)
+        with metrics.timer('file_io_seconds', op='write_insights'):
+            with open(filepath, 'w') as f:
+                json.dump(processed_data, f, indent=2)
         
         print(f"\n✓ Saved insights to: {filepath}")
         
+        # Index in insights store so readers don't have to glob
+        try:
+            self.store.add_insights(processed_data, filepath)
+        except Exception as e:
+            print(f"⚠ Could not index insights (run insights_store.py --import later): {e}")
+        
         return filepath
     
     def process_all_dashboard_raw(self, entity_type=None):
         """Process all dashboard raw files"""
-        pattern = f"{entity_type}_*_dashboard_*.json" if entity_type else "*_dashboard_*.json"
+        pattern = f"{entity_type}_*_dashboard_*.json*" if entity_type else "*_dashboard_*.json*"
         files = list(Path(config.DASHBOARD_RAW_DIR).glob(pattern))
         
         print(f"\n{'='*60}")
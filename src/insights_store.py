@@ -0,0 +1,533 @@
+"""
+Insights Store: Indexed SQLite store for processed insights
+Replaces globbing data/dashboard_data/processed/ for lookups
+"""
+
+import json
+import os
+import sqlite3
+import argparse
+from datetime import datetime
+import config
+
+
+class InsightsStore:
+    def __init__(self, db_path=None):
+        self.db_path = db_path or config.INSIGHTS_STORE_PATH
+        os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
+        self._initialized = False
+
+    # ============================================================
+    # CONNECTION / SCHEMA
+    # ============================================================
+
+    def get_connection(self):
+        """Open a connection (WAL so the generator can write while dashboards read)"""
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        conn.row_factory = sqlite3.Row
+        if not self._initialized:
+            self.initialize_schema(conn)
+        return conn
+
+    def initialize_schema(self, conn):
+        """Create insights table and indexes"""
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("""
+        CREATE TABLE IF NOT EXISTS insights (
+            id                      INTEGER PRIMARY KEY AUTOINCREMENT,
+            entity_type             TEXT NOT NULL,
+            entity_id               INTEGER NOT NULL,
+            generated_at            TEXT NOT NULL,
+            period_start            TEXT,
+            period_end              TEXT,
+            insights_count          INTEGER NOT NULL DEFAULT 0,
+            high_priority_count     INTEGER NOT NULL DEFAULT 0,
+            medium_priority_count   INTEGER NOT NULL DEFAULT 0,
+            low_priority_count      INTEGER NOT NULL DEFAULT 0,
+            file_name               TEXT UNIQUE,
+            payload                 TEXT NOT NULL    -- full processed insights JSON
+        )
+        """)
+
+        # Latest-for-entity lookups are a single index seek
+        conn.execute("""
+        CREATE INDEX IF NOT EXISTS idx_insights_entity
+        ON insights (entity_type, entity_id, generated_at)
+        """)
+
+        # Overview pages are ordered by recency
+        conn.execute("""
+        CREATE INDEX IF NOT EXISTS idx_insights_type_generated
+        ON insights (entity_type, generated_at)
+        """)
+        conn.execute("""
+        CREATE INDEX IF NOT EXISTS idx_insights_generated
+        ON insights (generated_at)
+        """)
+
+        # Precomputed overview totals per entity type, maintained by triggers
+        conn.execute("""
+        CREATE TABLE IF NOT EXISTS insights_summary (
+            entity_type     TEXT PRIMARY KEY,
+            documents       INTEGER NOT NULL DEFAULT 0,
+            insights_total  INTEGER NOT NULL DEFAULT 0,
+            high_total      INTEGER NOT NULL DEFAULT 0,
+            medium_total    INTEGER NOT NULL DEFAULT 0,
+            low_total       INTEGER NOT NULL DEFAULT 0
+        )
+        """)
+        conn.execute("""
+        CREATE TRIGGER IF NOT EXISTS trg_insights_summary_insert
+        AFTER INSERT ON insights
+        BEGIN
+            INSERT OR IGNORE INTO insights_summary (entity_type) VALUES (NEW.entity_type);
+            UPDATE insights_summary SET
+                documents      = documents + 1,
+                insights_total = insights_total + NEW.insights_count,
+                high_total     = high_total + NEW.high_priority_count,
+                medium_total   = medium_total + NEW.medium_priority_count,
+                low_total      = low_total + NEW.low_priority_count
+            WHERE entity_type = NEW.entity_type;
+        END
+        """)
+        conn.execute("""
+        CREATE TRIGGER IF NOT EXISTS trg_insights_summary_delete
+        AFTER DELETE ON insights
+        BEGIN
+            UPDATE insights_summary SET
+                documents      = documents - 1,
+                insights_total = insights_total - OLD.insights_count,
+                high_total     = high_total - OLD.high_priority_count,
+                medium_total   = medium_total - OLD.medium_priority_count,
+                low_total      = low_total - OLD.low_priority_count
+            WHERE entity_type = OLD.entity_type;
+        END
+        """)
+
+        # Overview metrics at the last LLM run per entity - see change_screening.py
+        conn.execute("""
+        CREATE TABLE IF NOT EXISTS screening_baselines (
+            entity_type     TEXT NOT NULL,
+            entity_id       INTEGER NOT NULL,
+            metrics         TEXT NOT NULL,    -- JSON {metric: value}
+            recorded_at     TEXT NOT NULL,
+            PRIMARY KEY (entity_type, entity_id)
+        )
+        """)
+
+        # Active entity IDs per discovery window - see entity_discovery.py
+        conn.execute("""
+        CREATE TABLE IF NOT EXISTS active_entity_sets (
+            entity_type     TEXT NOT NULL,
+            start_date      TEXT NOT NULL,
+            end_date        TEXT NOT NULL,
+            source          TEXT NOT NULL,    -- postgres / duckdb
+            entity_ids      TEXT NOT NULL,    -- JSON list, sorted
+            computed_at     TEXT NOT NULL,
+            PRIMARY KEY (entity_type, start_date, end_date, source)
+        )
+        """)
+
+        # Latest raw dashboard snapshot per entity - see delta_refresh.py
+        conn.execute("""
+        CREATE TABLE IF NOT EXISTS raw_snapshots (
+            entity_type     TEXT NOT NULL,
+            entity_id       INTEGER NOT NULL,
+            file_path       TEXT NOT NULL,
+            parameters      TEXT NOT NULL,    -- JSON query parameters
+            snapshot_at     TEXT NOT NULL,    -- data known unchanged up to here
+            queried_at      TEXT NOT NULL,    -- when the dashboard queries last ran
+            PRIMARY KEY (entity_type, entity_id)
+        )
+        """)
+
+        # Stores created before the summary table existed: backfill once
+        has_summary = conn.execute("SELECT 1 FROM insights_summary LIMIT 1").fetchone()
+        has_insights = conn.execute("SELECT 1 FROM insights LIMIT 1").fetchone()
+        if has_insights and not has_summary:
+            conn.execute("""
+            INSERT INTO insights_summary
+            SELECT entity_type, COUNT(*), SUM(insights_count), SUM(high_priority_count),
+                   SUM(medium_priority_count), SUM(low_priority_count)
+            FROM insights
+            GROUP BY entity_type
+            """)
+
+        conn.commit()
+        self._initialized = True
+
+    # ============================================================
+    # WRITE
+    # ============================================================
+
+    def _row_values(self, processed_data, file_name):
+        insights = processed_data.get('insights', [])
+        period = processed_data.get('dashboard_period') or {}
+        priorities = [i.get('priority') for i in insights]
+
+        return (
+            processed_data['entity_type'],
+            int(processed_data['entity_id']),
+            processed_data.get('generated_at') or datetime.now().isoformat(),
+            period.get('start_date'),
+            period.get('end_date'),
+            processed_data.get('insights_count', len(insights)),
+            processed_data.get('high_priority_count', priorities.count('high')),
+            priorities.count('medium'),
+            priorities.count('low'),
+            file_name,
+            json.dumps(processed_data)
+        )
+
+    def add_insights(self, processed_data, filepath=None):
+        """Index a processed insights document"""
+        file_name = os.path.basename(filepath) if filepath else None
+        conn = self.get_connection()
+
+        try:
+            # Explicit delete (not INSERT OR REPLACE) so summary triggers fire
+            if file_name:
+                conn.execute("DELETE FROM insights WHERE file_name = ?", [file_name])
+            conn.execute("""
+            INSERT INTO insights (
+                entity_type, entity_id, generated_at, period_start, period_end,
+                insights_count, high_priority_count, medium_priority_count,
+                low_priority_count, file_name, payload
+            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """, self._row_values(processed_data, file_name))
+            conn.commit()
+        finally:
+            conn.close()
+
+    def import_json_files(self, directory=None, batch_size=500):
+        """One-shot import of existing processed JSON files (idempotent)"""
+        directory = directory or config.DASHBOARD_PROCESSED_DIR
+
+        if not os.path.isdir(directory):
+            print(f"No processed directory found at {directory}")
+            return 0
+
+        conn = self.get_connection()
+        imported = 0
+        skipped = 0
+        batch = []
+
+        def flush():
+            nonlocal imported
+            cursor = conn.executemany("""
+            INSERT OR IGNORE INTO insights (
+                entity_type, entity_id, generated_at, period_start, period_end,
+                insights_count, high_priority_count, medium_priority_count,
+                low_priority_count, file_name, payload
+            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """, batch)
+            conn.commit()
+            imported += cursor.rowcount
+            batch.clear()
+
+        try:
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    if '_insights_' not in entry.name or not entry.name.endswith('.json'):
+                        continue
+                    try:
+                        with open(entry.path) as f:
+                            data = json.load(f)
+                        batch.append(self._row_values(data, entry.name))
+                    except (OSError, ValueError, KeyError) as e:
+                        print(f"⚠ Skipping {entry.name}: {e}")
+                        skipped += 1
+                        continue
+
+                    if len(batch) >= batch_size:
+                        flush()
+
+            if batch:
+                flush()
+        finally:
+            conn.close()
+
+        print(f"✓ Imported {imported} insight files ({skipped} skipped)")
+        return imported
+
+    def save_screening_baselines(self, entity_type, baselines):
+        """Record {entity_id: {metric: value}} as the new screening baseline"""
+        now = datetime.now().isoformat()
+        conn = self.get_connection()
+
+        try:
+            conn.executemany("""
+            INSERT OR REPLACE INTO screening_baselines (entity_type, entity_id, metrics, recorded_at)
+            VALUES (?, ?, ?, ?)
+            """, [
+                (entity_type, int(entity_id), json.dumps(metrics), now)
+                for entity_id, metrics in baselines.items()
+            ])
+            conn.commit()
+        finally:
+            conn.close()
+
+    def save_active_entities(self, entity_type, start_date, end_date, source, entity_ids):
+        """Cache the active entity IDs found for a window"""
+        conn = self.get_connection()
+
+        try:
+            conn.execute("""
+            INSERT OR REPLACE INTO active_entity_sets
+                (entity_type, start_date, end_date, source, entity_ids, computed_at)
+            VALUES (?, ?, ?, ?, ?, ?)
+            """, [entity_type, str(start_date), str(end_date), source,
+                  json.dumps([int(i) for i in entity_ids]), datetime.now().isoformat()])
+            conn.commit()
+        finally:
+            conn.close()
+
+    def save_raw_snapshot(self, entity_type, entity_id, file_path, parameters, snapshot_at, queried_at=None):
+        """Record the latest raw dashboard file for an entity"""
+        conn = self.get_connection()
+
+        try:
+            conn.execute("""
+            INSERT OR REPLACE INTO raw_snapshots
+                (entity_type, entity_id, file_path, parameters, snapshot_at, queried_at)
+            VALUES (?, ?, ?, ?, ?, ?)
+            """, [entity_type, int(entity_id), file_path, json.dumps(parameters, default=str),
+                  snapshot_at, queried_at or snapshot_at])
+            conn.commit()
+        finally:
+            conn.close()
+
+    # ============================================================
+    # READ
+    # ============================================================
+
+    def get_latest(self, entity_type, entity_id):
+        """Latest insights document for an entity, or None"""
+        conn = self.get_connection()
+
+        try:
+            row = conn.execute("""
+            SELECT payload FROM insights
+            WHERE entity_type = ? AND entity_id = ?
+            ORDER BY generated_at DESC
+            LIMIT 1
+            """, [entity_type, int(entity_id)]).fetchone()
+        finally:
+            conn.close()
+
+        return json.loads(row['payload']) if row else None
+
+    def get_screening_baselines(self, entity_type):
+        """{entity_id: (metrics, recorded_at)} for an entity type"""
+        conn = self.get_connection()
+
+        try:
+            rows = conn.execute("""
+            SELECT entity_id, metrics, recorded_at FROM screening_baselines
+            WHERE entity_type = ?
+            """, [entity_type]).fetchall()
+        finally:
+            conn.close()
+
+        return {
+            row['entity_id']: (json.loads(row['metrics']), row['recorded_at'])
+            for row in rows
+        }
+
+    def get_active_entities(self, entity_type, start_date, end_date, source, computed_after):
+        """Cached active entity IDs for a window, or None if missing / computed before computed_after"""
+        conn = self.get_connection()
+
+        try:
+            row = conn.execute("""
+            SELECT entity_ids FROM active_entity_sets
+            WHERE entity_type = ? AND start_date = ? AND end_date = ? AND source = ?
+              AND computed_at >= ?
+            """, [entity_type, str(start_date), str(end_date), source, computed_after]).fetchone()
+        finally:
+            conn.close()
+
+        return json.loads(row['entity_ids']) if row else None
+
+    def get_raw_snapshots(self, entity_type, entity_ids):
+        """{entity_id: snapshot dict} for the given entities that have one"""
+        conn = self.get_connection()
+
+        try:
+            conn.execute("CREATE TEMP TABLE IF NOT EXISTS wanted_ids (entity_id INTEGER PRIMARY KEY)")
+            conn.execute("DELETE FROM wanted_ids")
+            conn.executemany("INSERT OR IGNORE INTO wanted_ids VALUES (?)", [(int(i),) for i in entity_ids])
+            rows = conn.execute("""
+            SELECT s.* FROM raw_snapshots s
+            JOIN wanted_ids w ON w.entity_id = s.entity_id
+            WHERE s.entity_type = ?
+            """, [entity_type]).fetchall()
+        finally:
+            conn.close()
+
+        return {
+            row['entity_id']: {**dict(row), 'parameters': json.loads(row['parameters'])}
+            for row in rows
+        }
+
+    def iter_after(self, after_id=0, batch_size=1000):
+        """Insights rows with id > after_id in id order (re-indexed files get a new id)"""
+        conn = self.get_connection()
+
+        try:
+            cursor = conn.execute("""
+            SELECT id, entity_type, entity_id, generated_at, period_start, period_end,
+                   file_name, payload
+            FROM insights WHERE id > ? ORDER BY id
+            """, [after_id])
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    break
+                yield from rows
+        finally:
+            conn.close()
+
+    def _filters(self, entity_type=None, priority=None):
+        clauses = []
+        args = []
+        if entity_type:
+            clauses.append("entity_type = ?")
+            args.append(entity_type)
+        if priority:
+            if priority not in config.INSIGHT_PRIORITY_LEVELS:
+                raise ValueError(f"Invalid priority '{priority}'")
+            # Column name comes from the validated priority level, never user text
+            clauses.append(f"{priority}_priority_count > 0")
+        where = f" WHERE {' AND '.join(clauses)}" if clauses else ""
+        return where, args
+
+    def list_insights(self, entity_type=None, limit=50, offset=0, include_payload=False,
+                      priority=None):
+        """Page of insights documents, newest first (optionally having a given priority)"""
+        columns = """
+            id, entity_type, entity_id, generated_at, period_start, period_end,
+            insights_count, high_priority_count, file_name
+        """
+        if include_payload:
+            columns += ", payload"
+
+        where, args = self._filters(entity_type, priority)
+        query = f"SELECT {columns} FROM insights{where} ORDER BY generated_at DESC LIMIT ? OFFSET ?"
+        args += [limit, offset]
+
+        conn = self.get_connection()
+        try:
+            rows = conn.execute(query, args).fetchall()
+        finally:
+            conn.close()
+
+        if include_payload:
+            return [json.loads(row['payload']) for row in rows]
+        return [dict(row) for row in rows]
+
+    def get_by_id(self, insight_id):
+        """Full insights document by store id, or None"""
+        conn = self.get_connection()
+        try:
+            row = conn.execute(
+                "SELECT payload FROM insights WHERE id = ?", [insight_id]
+            ).fetchone()
+        finally:
+            conn.close()
+        return json.loads(row['payload']) if row else None
+
+    def summarize(self, entity_type=None, priority=None):
+        """
+        Overview totals: documents, insights_total, high_total
+        Unfiltered-by-priority totals come from the precomputed summary table
+        """
+        conn = self.get_connection()
+        try:
+            if priority:
+                where, args = self._filters(entity_type, priority)
+                row = conn.execute(f"""
+                SELECT COUNT(*), COALESCE(SUM(insights_count), 0),
+                       COALESCE(SUM(high_priority_count), 0)
+                FROM insights{where}
+                """, args).fetchone()
+            else:
+                query = """
+                SELECT COALESCE(SUM(documents), 0), COALESCE(SUM(insights_total), 0),
+                       COALESCE(SUM(high_total), 0)
+                FROM insights_summary
+                """
+                args = []
+                if entity_type:
+                    query += " WHERE entity_type = ?"
+                    args.append(entity_type)
+                row = conn.execute(query, args).fetchone()
+        finally:
+            conn.close()
+
+        return {
+            'documents': row[0],
+            'insights_total': row[1],
+            'high_total': row[2]
+        }
+
+    def count(self, entity_type=None):
+        """Number of stored insights documents"""
+        return self.summarize(entity_type)['documents']
+
+    def version(self):
+        """Cheap change token - moves whenever insights are added or removed"""
+        conn = self.get_connection()
+        try:
+            seq = conn.execute(
+                "SELECT seq FROM sqlite_sequence WHERE name = 'insights'"
+            ).fetchone()
+            documents = conn.execute(
+                "SELECT COALESCE(SUM(documents), 0) FROM insights_summary"
+            ).fetchone()[0]
+        finally:
+            conn.close()
+        return f"{seq[0] if seq else 0}:{documents}"
+
+    def stats(self):
+        """Print store summary"""
+        print("\n" + "=" * 50)
+        print("INSIGHTS STORE")
+        print("=" * 50)
+        print(f"DB Path:       {self.db_path}")
+        print(f"Buyers:        {self.count('buyer')} documents")
+        print(f"Sellers:       {self.count('seller')} documents")
+        if os.path.exists(self.db_path):
+            print(f"DB Size:       {os.path.getsize(self.db_path) / (1024*1024):.2f} MB")
+        print("=" * 50)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Indexed insights store',
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  # Import existing processed JSON files (safe to re-run)
+  python src/insights_store.py --import
+
+  # Show store summary
+  python src/insights_store.py --stats
+        """
+    )
+    parser.add_argument('--import', dest='do_import', action='store_true',
+                       help='Import processed JSON files into the store')
+    parser.add_argument('--dir', help='Processed directory to import from. Default from config.')
+    parser.add_argument('--stats', action='store_true', help='Show store summary')
+    args = parser.parse_args()
+
+    store = InsightsStore()
+
+    if args.do_import:
+        store.import_json_files(args.dir)
+    if args.stats or not args.do_import:
+        store.stats()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,223 @@
+"""
+Metrics: In-process counters and timers for the whole pipeline
+
+Every stage records into one registry (Postgres queries, row conversion,
+file I/O, DuckDB loads, LLM calls, caches). The registry renders as
+Prometheus text for app.py's /metrics, as a summary table for run_all.py,
+and - in processes that call enable_structured_log() (the pipeline entry
+points) - each timing is also written as a JSON line to a rotated log.
+"""
+
+import json
+import logging
+import logging.handlers
+import os
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+import config
+
+# Upper bounds (seconds) for latency histograms
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+logger = logging.getLogger('metrics')
+
+
+def _label_key(labels):
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+def _format_labels(key, extra=None):
+    pairs = list(key) + (extra or [])
+    if not pairs:
+        return ''
+    return '{' + ','.join(f'{k}="{v}"' for k, v in pairs) + '}'
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.counters = {}    # (name, labels) -> value
+        self.timers = {}      # (name, labels) -> {count, sum, max, buckets}
+        self._log_enabled = False
+
+    # ============================================================
+    # RECORD
+    # ============================================================
+
+    def inc(self, name, value=1, **labels):
+        key = (name, _label_key(labels))
+        with self._lock:
+            self.counters[key] = self.counters.get(key, 0) + value
+
+    def observe(self, name, seconds, **labels):
+        key = (name, _label_key(labels))
+        with self._lock:
+            timer = self.timers.get(key)
+            if timer is None:
+                timer = self.timers[key] = {
+                    'count': 0, 'sum': 0.0, 'max': 0.0, 'buckets': [0] * len(BUCKETS)
+                }
+            timer['count'] += 1
+            timer['sum'] += seconds
+            timer['max'] = max(timer['max'], seconds)
+            for i, bound in enumerate(BUCKETS):
+                if seconds <= bound:
+                    timer['buckets'][i] += 1
+
+        self.log_event(name, seconds, labels)
+
+    @contextmanager
+    def timer(self, name, **labels):
+        """Time a block: with metrics.timer('pg_query_seconds', query='top_products'): ..."""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - started, **labels)
+
+    def reset(self):
+        with self._lock:
+            self.counters.clear()
+            self.timers.clear()
+
+    # ============================================================
+    # STRUCTURED LOG
+    # ============================================================
+
+    def enable_structured_log(self):
+        """Write timings to METRICS_CONFIG log_path (rotated) from now on, if structured_log is set"""
+        metrics_config = config.METRICS_CONFIG
+        log_path = metrics_config.get('log_path')
+        if self._log_enabled or not metrics_config.get('structured_log') or not log_path:
+            return
+        if not logger.handlers:
+            os.makedirs(os.path.dirname(log_path), exist_ok=True)
+            handler = logging.handlers.RotatingFileHandler(
+                log_path, maxBytes=metrics_config['log_max_bytes'], backupCount=metrics_config['log_backups']
+            )
+            handler.setFormatter(logging.Formatter('%(message)s'))
+            logger.addHandler(handler)
+            logger.setLevel(logging.INFO)
+            logger.propagate = False
+        self._log_enabled = True
+
+    def log_event(self, name, seconds, labels):
+        if not self._log_enabled:
+            return
+        logger.info(json.dumps({
+            'ts': datetime.now().isoformat(),
+            'metric': name,
+            'seconds': round(seconds, 6),
+            **labels
+        }))
+
+    # ============================================================
+    # EXPORT
+    # ============================================================
+
+    def snapshot(self):
+        """Copy of counters and timers (safe to iterate)"""
+        with self._lock:
+            counters = dict(self.counters)
+            timers = {key: {**t, 'buckets': list(t['buckets'])} for key, t in self.timers.items()}
+        return counters, timers
+
+    def counter_total(self, name, **labels):
+        """Sum of a counter over all label sets matching the given labels"""
+        wanted = set(_label_key(labels))
+        return sum(
+            value for (counter, key), value in self.snapshot()[0].items()
+            if counter == name and wanted <= set(key)
+        )
+
+    def render_prometheus(self, prefix=None):
+        """Prometheus text exposition format"""
+        prefix = prefix if prefix is not None else config.METRICS_CONFIG['prefix']
+        counters, timers = self.snapshot()
+        lines = []
+
+        for name in sorted({n for n, _ in counters}):
+            lines.append(f"# TYPE {prefix}{name} counter")
+            for (counter, key), value in sorted(counters.items()):
+                if counter == name:
+                    lines.append(f"{prefix}{name}{_format_labels(key)} {value}")
+
+        for name in sorted({n for n, _ in timers}):
+            lines.append(f"# TYPE {prefix}{name} histogram")
+            for (timer_name, key), timer in sorted(timers.items()):
+                if timer_name != name:
+                    continue
+                for bound, count in zip(BUCKETS, timer['buckets']):
+                    lines.append(f"{prefix}{name}_bucket{_format_labels(key, [('le', bound)])} {count}")
+                lines.append(f"{prefix}{name}_bucket{_format_labels(key, [('le', '+Inf')])} {timer['count']}")
+                lines.append(f"{prefix}{name}_sum{_format_labels(key)} {timer['sum']:.6f}")
+                lines.append(f"{prefix}{name}_count{_format_labels(key)} {timer['count']}")
+
+        return '\n'.join(lines) + '\n'
+
+    def summary_rows(self):
+        """[(metric, labels, count, total_s, avg_ms, max_ms)] sorted by total time"""
+        _, timers = self.snapshot()
+        rows = []
+        for (name, key), timer in timers.items():
+            labels = ','.join(f"{k}={v}" for k, v in key)
+            rows.append((
+                name, labels, timer['count'], timer['sum'],
+                timer['sum'] / timer['count'] * 1000 if timer['count'] else 0.0,
+                timer['max'] * 1000
+            ))
+        return sorted(rows, key=lambda row: row[3], reverse=True)
+
+    def cache_hit_rates(self):
+        """{cache: (hits, misses, hit rate)} from cache_requests_total"""
+        counters, _ = self.snapshot()
+        caches = {}
+        for (name, key), value in counters.items():
+            if name != 'cache_requests_total':
+                continue
+            labels = dict(key)
+            hits, misses = caches.get(labels.get('cache'), (0, 0))
+            if labels.get('result') == 'hit':
+                hits += value
+            else:
+                misses += value
+            caches[labels.get('cache')] = (hits, misses)
+        return {
+            cache: (hits, misses, hits / (hits + misses) if hits + misses else 0.0)
+            for cache, (hits, misses) in caches.items()
+        }
+
+    def print_summary(self, limit=20):
+        """Per-stage timing table"""
+        rows = self.summary_rows()
+        if not rows:
+            return
+
+        print(f"{'Stage':<28} {'Labels':<32} {'Count':>7} {'Total s':>9} {'Avg ms':>9} {'Max ms':>9}")
+        print(f"{'-'*28} {'-'*32} {'-'*7} {'-'*9} {'-'*9} {'-'*9}")
+        for name, labels, count, total, avg_ms, max_ms in rows[:limit]:
+            print(f"{name:<28} {labels[:32]:<32} {count:>7} {total:>9.2f} {avg_ms:>9.1f} {max_ms:>9.1f}")
+        if len(rows) > limit:
+            print(f"... and {len(rows) - limit} more")
+
+        counters, _ = self.snapshot()
+        pg_rows = self.counter_total('pg_query_rows_total')
+        tokens = {dict(key).get('kind'): value for (name, key), value in counters.items() if name == 'llm_tokens_total'}
+        print()
+        print(f"Postgres rows fetched:       {pg_rows:,}")
+        if tokens:
+            print(f"LLM tokens:                  {tokens.get('prompt', 0):,} prompt, "
+                  f"{tokens.get('completion', 0):,} completion")
+        for cache, (hits, misses, rate) in sorted(self.cache_hit_rates().items()):
+            print(f"Cache {cache + ':':<22} {hits} hits, {misses} misses ({rate:.1%})")
+
+
+registry = MetricsRegistry()
+
+# Module-level shortcuts
+enable_structured_log = registry.enable_structured_log
+inc = registry.inc
+observe = registry.observe
+timer = registry.timer
@@ -0,0 +1,326 @@
+"""
+Parquet Export: Analytics tables as partitioned Parquet for bulk consumers
+
+Downstream teams read compressed, column-pruned files instead of calling
+/insights for thousands of entities or copying vipani_analytics.db:
+
+    <PARQUET_EXPORT_CONFIG dir>/
+      manifest.json                                   listed files, row counts, insights high-water mark
+      entities/entity_type=buyer/date=2026-10-19/part-<export>-<uuid>.parquet
+      aggregates/entity_type=buyer/date=2026-10-19/...
+      insights/entity_type=buyer/date=<generated date>/...
+
+entities    one row per entity per sync day - overview metrics as typed
+            columns, profile and full history as JSON (only read if selected)
+aggregates  one row per entity type per sync day, nested fields as STRUCTs
+insights    one row per generated insight, appended from the insights store
+            (rows after the last exported id; a re-indexed file comes again)
+
+entities / aggregates are daily snapshots: exporting again on the same day
+replaces that day's files, and days beyond keep_days are pruned. A file
+is listed in manifest.json (replaced atomically) only once fully written -
+read the listed files for an exact view, or glob between exports:
+
+    SELECT * FROM read_parquet('<dir>/entities/*/*/*.parquet',
+                               hive_partitioning = true, union_by_name = true)
+
+    python src/parquet_export.py export      # from the live DB (sync does this with --export-parquet)
+    python src/parquet_export.py status
+"""
+
+import argparse
+import json
+import os
+import tempfile
+from datetime import date, datetime, timedelta
+import duckdb
+import config
+import metrics
+from insights_store import InsightsStore
+
+EXPORT_FORMAT = 'parquet-export-v1'
+ENTITY_TYPES = ('buyer', 'seller')
+SNAPSHOT_TABLES = ('entities', 'aggregates')
+
+# Fields of one insight in processed documents ("windows" on multi-window runs)
+INSIGHT_STRUCTURE = json.dumps([{
+    'title': 'VARCHAR',
+    'observation': 'VARCHAR',
+    'recommendation': 'VARCHAR',
+    'priority': 'VARCHAR',
+    'comparison_type': 'VARCHAR',
+    'metrics': ['VARCHAR'],
+    'windows': ['VARCHAR']
+}])
+
+INSIGHT_COLUMNS = {
+    'id': 'BIGINT', 'entity_type': 'VARCHAR', 'entity_id': 'BIGINT', 'generated_at': 'VARCHAR',
+    'period_start': 'VARCHAR', 'period_end': 'VARCHAR', 'file_name': 'VARCHAR', 'payload': 'VARCHAR'
+}
+
+
+def sql_literal(value):
+    return "'" + str(value).replace("'", "''") + "'"
+
+
+def typed_structure(structure):
+    """json_group_structure output with all-null fields typed VARCHAR"""
+    if isinstance(structure, dict):
+        return {key: typed_structure(value) for key, value in structure.items()}
+    if isinstance(structure, list):
+        return [typed_structure(value) for value in structure]
+    return 'VARCHAR' if structure == 'NULL' else structure
+
+
+def partition_values(path):
+    """{'entity_type': ..., 'date': ...} from a hive-partitioned file path"""
+    return dict(part.split('=', 1) for part in path.split(os.sep) if '=' in part)
+
+
+class ParquetExporter:
+    def __init__(self, db_path=None, root=None, store=None):
+        self.db_path = db_path or config.ANALYTICS_DB_PATH
+        self.root = root or config.PARQUET_EXPORT_CONFIG['dir']
+        self.store = store or InsightsStore()
+        self.manifest_path = os.path.join(self.root, 'manifest.json')
+
+    # ============================================================
+    # MANIFEST
+    # ============================================================
+
+    def load_manifest(self):
+        if not os.path.exists(self.manifest_path):
+            return {'format': EXPORT_FORMAT, 'updated_at': None, 'insights_after_id': 0, 'files': []}
+        with open(self.manifest_path) as f:
+            return json.load(f)
+
+    def save_manifest(self, manifest):
+        manifest['updated_at'] = datetime.now().isoformat()
+        with open(self.manifest_path + '.tmp', 'w') as f:
+            json.dump(manifest, f, indent=2)
+        os.replace(self.manifest_path + '.tmp', self.manifest_path)
+
+    def remove_files(self, paths):
+        for path in paths:
+            full_path = os.path.join(self.root, path)
+            if os.path.exists(full_path):
+                os.remove(full_path)
+            # Drop emptied date / entity_type directories
+            directory = os.path.dirname(full_path)
+            for _ in range(2):
+                if os.path.isdir(directory) and not os.listdir(directory):
+                    os.rmdir(directory)
+                directory = os.path.dirname(directory)
+
+    def remove_unlisted(self, manifest):
+        """Files left by an export that failed before updating the manifest"""
+        listed = {entry['path'] for entry in manifest['files']}
+        unlisted = []
+        for table in SNAPSHOT_TABLES + ('insights',):
+            for directory, _, files in os.walk(os.path.join(self.root, table)):
+                unlisted += [
+                    os.path.relpath(os.path.join(directory, name), self.root)
+                    for name in files if name.endswith('.parquet')
+                ]
+        unlisted = [path for path in unlisted if path not in listed]
+        if unlisted:
+            print(f"↺ Removing {len(unlisted)} unlisted file(s) from an interrupted export")
+            self.remove_files(unlisted)
+
+    # ============================================================
+    # EXPORT
+    # ============================================================
+
+    def copy_partitioned(self, conn, table, select_sql, export_id, params=None):
+        """COPY a SELECT (with entity_type and date columns) into table/; manifest entries of the new files"""
+        os.makedirs(os.path.join(self.root, table), exist_ok=True)
+        count, files = conn.execute(f"""
+        COPY ({select_sql}) TO {sql_literal(os.path.join(self.root, table))} (
+            FORMAT PARQUET, PARTITION_BY (entity_type, date),
+            COMPRESSION {config.PARQUET_EXPORT_CONFIG['compression']},
+            APPEND, FILENAME_PATTERN 'part-{export_id}-{{uuid}}', RETURN_FILES true
+        )
+        """, params or []).fetchone()
+        if not count:
+            return []
+
+        rows = dict(conn.execute(
+            "SELECT file_name, num_rows FROM parquet_file_metadata(?)", [files]
+        ).fetchall())
+        return [
+            {'table': table, **partition_values(path), 'path': os.path.relpath(path, self.root),
+             'rows': rows[path], 'export_id': export_id}
+            for path in files
+        ]
+
+    def flat_columns(self, conn, json_expr, source_sql, params, alias, reserved=()):
+        """(json_transform expression, select list) exposing a JSON object's fields as columns"""
+        structure = conn.execute(f"SELECT json_group_structure({json_expr}) FROM {source_sql}", params).fetchone()[0]
+        structure = typed_structure(json.loads(structure)) if structure else None
+        if not isinstance(structure, dict):
+            return None, ''
+        transform = f"json_transform({json_expr}, {sql_literal(json.dumps(structure))})"
+        columns = ''.join(f', {alias}."{key}"' for key in structure if key not in reserved)
+        return transform, columns
+
+    def export_entities(self, conn, entity_type, sync_date, synced_at, export_id):
+        overview_key = config.QUERY_REGISTRY[entity_type]['overview_query']
+        transform, columns = self.flat_columns(
+            conn, f"queries_data -> '$.{overview_key}[0]'", "entities WHERE entity_type = ?", [entity_type],
+            'e.overview', reserved=('entity_id', 'entity_type', 'date', 'synced_at', 'profile', 'queries_data')
+        )
+        if transform is None:
+            return []
+        return self.copy_partitioned(conn, 'entities', f"""
+        SELECT e.entity_id, e.entity_type, CAST(? AS DATE) AS date, ? AS synced_at{columns},
+               p.profile, e.queries_data
+        FROM (SELECT *, {transform} AS overview FROM entities WHERE entity_type = ?) e
+        LEFT JOIN entity_profiles p USING (entity_id, entity_type)
+        """, export_id, [sync_date, synced_at, entity_type])
+
+    def export_aggregates(self, conn, entity_type, sync_date, synced_at, export_id):
+        transform, columns = self.flat_columns(
+            conn, 'aggregates_data::JSON', "aggregates WHERE entity_type = ?", [entity_type],
+            'a.aggregate', reserved=('entity_type', 'date', 'synced_at', 'calculated_at')
+        )
+        if transform is None:
+            return []
+        return self.copy_partitioned(conn, 'aggregates', f"""
+        SELECT a.entity_type, CAST(? AS DATE) AS date, ? AS synced_at, a.calculated_at{columns}
+        FROM (SELECT *, {transform} AS aggregate FROM aggregates WHERE entity_type = ?) a
+        """, export_id, [sync_date, synced_at, entity_type])
+
+    def export_insights(self, conn, after_id, export_id):
+        """(manifest entries, new high-water id) for insights rows after after_id"""
+        with tempfile.TemporaryDirectory(dir=self.root) as tmp_dir:
+            # DuckDB can't read the SQLite store without its extension - stage as NDJSON
+            staged = os.path.join(tmp_dir, 'insights.ndjson')
+            last_id = after_id
+            with open(staged, 'w') as f:
+                for row in self.store.iter_after(after_id):
+                    f.write(json.dumps(dict(row)) + '\n')
+                    last_id = row['id']
+            if last_id == after_id:
+                return [], after_id
+
+            columns = '{' + ', '.join(f"'{name}': '{kind}'" for name, kind in INSIGHT_COLUMNS.items()) + '}'
+            entries = self.copy_partitioned(conn, 'insights', f"""
+            SELECT id AS insight_row_id, entity_type, CAST(left(generated_at, 10) AS DATE) AS date,
+                   entity_id, generated_at, period_start, period_end, file_name, insight_index,
+                   insight.title, insight.observation, insight.recommendation, insight.priority,
+                   insight.comparison_type, insight.metrics, insight.windows
+            FROM (
+                SELECT *, UNNEST(range(1, len(insights) + 1)) AS insight_index, UNNEST(insights) AS insight
+                FROM (
+                    SELECT *, json_transform(payload -> '$.insights', {sql_literal(INSIGHT_STRUCTURE)}) AS insights
+                    FROM read_json({sql_literal(staged)}, format = 'newline_delimited', columns = {columns})
+                )
+            )
+            """, export_id)
+        return entries, last_id
+
+    def export(self, entity_types=None):
+        """Export the given entity types' entities / aggregates and all new insights; {table: rows}"""
+        entity_types = entity_types or list(ENTITY_TYPES)
+        export_id = datetime.now().strftime('%Y%m%d_%H%M%S')
+        os.makedirs(self.root, exist_ok=True)
+
+        manifest = self.load_manifest()
+        self.remove_unlisted(manifest)
+        written = []
+        replaced = []
+
+        conn = duckdb.connect(self.db_path, read_only=True)
+        try:
+            for entity_type in entity_types:
+                synced_at = conn.execute("""
+                SELECT MAX(synced_at) FROM sync_log WHERE entity_type = ? AND status = 'success'
+                """, [entity_type]).fetchone()[0]
+                if synced_at is None:
+                    print(f"⚠ No successful {entity_type} sync to export")
+                    continue
+                sync_date = synced_at[:10]
+
+                for table, export_table in (('entities', self.export_entities),
+                                            ('aggregates', self.export_aggregates)):
+                    with metrics.timer('parquet_export_seconds', table=table):
+                        entries = export_table(conn, entity_type, sync_date, synced_at, export_id)
+                    if entries:
+                        # Same-day export replaces that day's snapshot
+                        replaced += [
+                            entry for entry in manifest['files']
+                            if entry['table'] == table and entry['entity_type'] == entity_type
+                            and entry['date'] == sync_date
+                        ]
+                        written += entries
+
+            with metrics.timer('parquet_export_seconds', table='insights'):
+                entries, manifest['insights_after_id'] = self.export_insights(
+                    conn, manifest['insights_after_id'], export_id
+                )
+            written += entries
+        except BaseException:
+            self.remove_files(entry['path'] for entry in written)
+            raise
+        finally:
+            conn.close()
+
+        cutoff = (date.today() - timedelta(days=config.PARQUET_EXPORT_CONFIG['keep_days'])).isoformat()
+        replaced += [
+            entry for entry in manifest['files']
+            if entry['table'] in SNAPSHOT_TABLES and entry['date'] < cutoff and entry not in replaced
+        ]
+        manifest['files'] = [entry for entry in manifest['files'] if entry not in replaced] + written
+        self.save_manifest(manifest)
+        self.remove_files(entry['path'] for entry in replaced)
+
+        summary = {}
+        for entry in written:
+            summary[entry['table']] = summary.get(entry['table'], 0) + entry['rows']
+        for table, rows in summary.items():
+            metrics.inc('parquet_export_rows_total', rows, table=table)
+        return summary
+
+    def status(self):
+        manifest = self.load_manifest()
+        tables = {}
+        for entry in manifest['files']:
+            table = tables.setdefault(entry['table'], {'files': 0, 'rows': 0, 'dates': set(), 'bytes': 0})
+            table['files'] += 1
+            table['rows'] += entry['rows']
+            table['dates'].add(entry['date'])
+            path = os.path.join(self.root, entry['path'])
+            table['bytes'] += os.path.getsize(path) if os.path.exists(path) else 0
+
+        return {
+            'dir': self.root,
+            'updated_at': manifest['updated_at'],
+            'insights_after_id': manifest['insights_after_id'],
+            'tables': {
+                name: {'files': t['files'], 'rows': t['rows'], 'first_date': min(t['dates']),
+                       'last_date': max(t['dates']), 'size_mb': round(t['bytes'] / (1024 * 1024), 2)}
+                for name, t in tables.items()
+            }
+        }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Partitioned Parquet export of the analytics tables')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    export_parser = subparsers.add_parser('export', help='Export the live DB and new insights')
+    export_parser.add_argument('--entity', choices=ENTITY_TYPES, help='Entities / aggregates of one type only')
+    subparsers.add_parser('status', help='Exported files and rows per table')
+    args = parser.parse_args()
+
+    exporter = ParquetExporter()
+    if args.command == 'export':
+        started = datetime.now()
+        summary = exporter.export([args.entity] if args.entity else None)
+        print(f"✓ Exported {summary or 'nothing new'} to {exporter.root} "
+              f"in {(datetime.now() - started).total_seconds():.2f}s")
+    else:
+        print(json.dumps(exporter.status(), indent=2))
+
+
+if __name__ == '__main__':
+    main()
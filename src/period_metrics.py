@@ -0,0 +1,516 @@
+"""
+Period Metrics: Incremental period-over-period overviews on rolling windows
+
+overview_metrics scans po_items for the current and the previous period on
+every call. Here they are answered from daily buckets kept incrementally in
+their own DuckDB file:
+
+    period_store.py    schema and pulls from Postgres (daily buckets,
+                       first-seen days, sketches)
+    period_windows.py  window maintenance - refresh slides every configured
+                       window and re-ranks its top_k cache
+    period_metrics.py  serving (overview / ranking rows) and the CLI
+
+Distinct counts are keys with lines > 0; new items / suppliers come from
+the first-seen table. A maintained window is served from its totals; any
+other window inside the retained days is aggregated from the daily
+buckets.
+
+Optional approximate distinct counts (approximate_distinct / show
+--approximate): HyperLogLog sketches per buyer per day, rolled up per
+month, are merged for the requested periods instead of grouping keys, and
+amounts are summed from entity-level daily totals. Any window within the
+retained days then costs about the same; see hll.py for the error bound.
+
+Ranking index: top_products, top_suppliers and top_categories for any
+top_n <= top_k are a lookup in the cached top keys (serve_rankings lets the
+dashboard executor use it instead of the platform-wide query).
+
+Periods follow overview_metrics for start_date = end_date - N days:
+current = [start, end), previous = [start - N - 1, start - 1). Two edge
+cases differ from the SQL: items stamped exactly at midnight of end_date or
+start_date - 1 (BETWEEN counts those), and buyers whose only items fall on
+day start - 1 (the SQL lists them with zeros).
+
+Updated items drift until a rebuild (see period_windows.py), so the
+dashboard executor only serves rankings / multi-window overviews from here
+while the last rebuild is within rebuild_max_age_hours.
+
+    python src/period_metrics.py refresh              # hourly (rebuilds daily)
+    python src/period_metrics.py refresh --rebuild    # force a rebuild
+    python src/period_metrics.py show --window 90 --id 42
+    python src/period_metrics.py top top_products --window 30 --id 42
+"""
+
+import argparse
+import json
+from datetime import date, datetime, timedelta
+from decimal import Decimal, ROUND_HALF_UP
+import config
+import metrics
+import hll
+from entity_discovery import ACTIVITY_COLUMNS
+from period_store import COUNTERPARTY_COLUMNS, RANKINGS, PeriodStore, as_date, period_ranges, window_params
+from period_windows import WindowMaintainer
+
+# Per-entity period totals in the shape of overview_metrics' period_metrics CTE;
+# {keys} yields (period, dimension, entity_id, key, amount, qty, lines)
+OVERVIEW_SQL = """
+    WITH keys AS ({keys}),
+    totals AS (
+        SELECT
+            entity_id,
+            COALESCE(SUM(amount) FILTER (WHERE period = 'current' AND dimension = 'product'), 0) AS curr_amount,
+            COALESCE(SUM(qty) FILTER (WHERE period = 'current' AND dimension = 'product'), 0) AS curr_qty,
+            COUNT(*) FILTER (WHERE period = 'current' AND dimension = 'counterparty' AND key <> -1) AS curr_suppliers,
+            COUNT(*) FILTER (WHERE period = 'current' AND dimension = 'product' AND key <> -1) AS curr_items,
+            COALESCE(SUM(amount) FILTER (WHERE period = 'previous' AND dimension = 'product'), 0) AS prev_amount,
+            COALESCE(SUM(qty) FILTER (WHERE period = 'previous' AND dimension = 'product'), 0) AS prev_qty,
+            COUNT(*) FILTER (WHERE period = 'previous' AND dimension = 'counterparty' AND key <> -1) AS prev_suppliers,
+            COUNT(*) FILTER (WHERE period = 'previous' AND dimension = 'product' AND key <> -1) AS prev_items
+        FROM keys
+        WHERE lines > 0
+        GROUP BY entity_id
+    ),
+    first_seen_counts AS (
+        SELECT
+            entity_id,
+            COUNT(*) FILTER (WHERE dimension = 'product' AND first_day >= $start AND first_day < $end) AS new_items_current,
+            COUNT(*) FILTER (WHERE dimension = 'product' AND first_day >= $prev_start AND first_day < $prev_end) AS new_items_previous,
+            COUNT(*) FILTER (WHERE dimension = 'counterparty' AND first_day >= $start AND first_day < $end) AS new_suppliers_current,
+            COUNT(*) FILTER (WHERE dimension = 'counterparty' AND first_day >= $prev_start AND first_day < $prev_end) AS new_suppliers_previous
+        FROM first_seen
+        WHERE entity_type = $entity_type AND key <> -1 AND first_day >= $prev_start AND first_day < $end
+        GROUP BY entity_id
+    )
+    SELECT t.*,
+           COALESCE(f.new_items_current, 0), COALESCE(f.new_items_previous, 0),
+           COALESCE(f.new_suppliers_current, 0), COALESCE(f.new_suppliers_previous, 0)
+    FROM totals t
+    LEFT JOIN first_seen_counts f USING (entity_id)
+    {where}
+    ORDER BY t.entity_id
+"""
+
+WINDOW_KEYS_SQL = """
+    SELECT period, dimension, entity_id, key, amount, qty, lines
+    FROM window_keys
+    WHERE entity_type = $entity_type AND window_days = $window_days
+"""
+
+DAILY_KEYS_SQL = """
+    SELECT CASE WHEN day >= $start THEN 'current' ELSE 'previous' END AS period,
+           dimension, entity_id, key, SUM(amount) AS amount, SUM(qty) AS qty, SUM(lines) AS lines
+    FROM daily_keys
+    WHERE entity_type = $entity_type
+      AND ((day >= $start AND day < $end) OR (day >= $prev_start AND day < $prev_end))
+    GROUP BY ALL
+"""
+
+# Approximate mode: per-entity sums only (distinct counts come from sketches)
+DAILY_TOTALS_SQL = """
+    SELECT CASE WHEN day >= $start THEN 'current' ELSE 'previous' END AS period,
+           dimension, entity_id, -1 AS key, SUM(amount) AS amount, SUM(qty) AS qty, SUM(lines) AS lines
+    FROM daily_keys
+    WHERE entity_type = $entity_type AND dimension = 'product'
+      AND ((day >= $start AND day < $end) OR (day >= $prev_start AND day < $prev_end))
+    GROUP BY ALL
+"""
+
+# Registers of the merged sketch per (entity, period, dimension); {parts}
+# yields (period, dimension, entity_id, reg, rank) from daily/monthly sketches
+SKETCH_SQL = """
+    WITH regs AS ({parts}),
+    merged AS (
+        SELECT period, dimension, entity_id, reg, MAX(rank) AS rank
+        FROM regs
+        GROUP BY ALL
+    )
+    SELECT entity_id, period, dimension, COUNT(*), SUM(POW(2.0, -rank))
+    FROM merged
+    GROUP BY ALL
+"""
+
+RANKING_COLUMNS = {
+    'buyer': {'amount_col': 'total_purchase_amount', 'rank_col': 'rank_within_buyer'}
+}
+
+RANKING_SQL = {
+    # Cached top_k of a maintained window
+    'index': """
+        SELECT t.entity_id, t.key, n.name, t.amount, t.rank
+        FROM window_top t
+        LEFT JOIN item_names n ON n.dimension = t.dimension AND n.key = t.key
+        WHERE t.entity_type = $entity_type AND t.window_days = $window_days
+          AND t.dimension = $dimension AND t.rank <= $top_n {entity_filter}
+        ORDER BY t.entity_id, t.rank
+    """,
+    # Any other window / top_n: rank the daily buckets
+    'daily': """
+        WITH totals AS (
+            SELECT entity_id, key, SUM(amount) AS amount,
+                   ROW_NUMBER() OVER (PARTITION BY entity_id ORDER BY SUM(amount) DESC, key) AS rank
+            FROM daily_keys
+            WHERE entity_type = $entity_type AND dimension = $dimension
+              AND day >= $start AND day < $end {entity_filter}
+            GROUP BY entity_id, key
+        )
+        SELECT t.entity_id, t.key, n.name, t.amount, t.rank
+        FROM totals t
+        LEFT JOIN item_names n ON n.dimension = $dimension AND n.key = t.key
+        WHERE t.rank <= $top_n
+        ORDER BY t.entity_id, t.rank
+    """
+}
+
+
+def _next_month(day):
+    return (day.replace(day=28) + timedelta(days=4)).replace(day=1)
+
+
+def split_range(first_day, end_day):
+    """
+    [first_day, end_day) as (day ranges, month range or None): whole
+    calendar months inside it come from monthly sketches, the edges from daily ones
+    """
+    first_month = first_day if first_day.day == 1 else _next_month(first_day)
+    end_month = end_day.replace(day=1)
+    if first_month >= end_month:
+        return [(first_day, end_day)], None
+    edges = [(first_day, first_month), (end_month, end_day)]
+    return [(a, b) for a, b in edges if a < b], (first_month, end_month)
+
+
+def _pct_change(current, previous):
+    if current is None or previous is None or previous == 0:
+        return None
+    return (current - previous) * 100 / previous
+
+
+def _ratio(numerator, denominator):
+    return numerator / denominator if denominator else None
+
+
+def _rounded(value):
+    """ROUND(numeric, 2) as Postgres does it"""
+    if value is None:
+        return None
+    return float(Decimal(value).quantize(Decimal('0.01'), rounding=ROUND_HALF_UP))
+
+
+def overview_row(entity_type, values):
+    """overview_metrics output row from the period totals of one entity"""
+    (entity_id, curr_amount, curr_qty, curr_suppliers, curr_items,
+     prev_amount, prev_qty, prev_suppliers, prev_items,
+     new_items_current, new_items_previous, new_suppliers_current, new_suppliers_previous) = values
+
+    per_supplier_curr = _ratio(curr_amount, curr_suppliers)
+    per_supplier_prev = _ratio(prev_amount, prev_suppliers)
+    per_unit_curr = _ratio(curr_amount, curr_qty)
+    per_unit_prev = _ratio(prev_amount, prev_qty)
+
+    return {
+        ACTIVITY_COLUMNS[entity_type][0]: entity_id,
+        'current_period_purchases': float(curr_amount),
+        'previous_period_purchases': float(prev_amount),
+        'purchase_percentage_change': _rounded(_pct_change(curr_amount, prev_amount)),
+        'current_period_quantity': float(curr_qty),
+        'previous_period_quantity': float(prev_qty),
+        'quantity_percentage_change': _rounded(_pct_change(curr_qty, prev_qty)),
+        'avg_purchase_per_supplier_current': _rounded(per_supplier_curr),
+        'avg_purchase_per_supplier_previous': _rounded(per_supplier_prev),
+        'avg_purchase_per_supplier_percentage_change': _rounded(_pct_change(per_supplier_curr, per_supplier_prev)),
+        'avg_price_per_unit_current': _rounded(per_unit_curr),
+        'avg_price_per_unit_previous': _rounded(per_unit_prev),
+        'avg_price_per_unit_percentage_change': _rounded(_pct_change(per_unit_curr, per_unit_prev)),
+        'items_purchased_current': curr_items,
+        'items_purchased_previous': prev_items,
+        'items_purchased_percentage_change': _rounded(_pct_change(Decimal(curr_items), Decimal(prev_items))),
+        'new_items_purchased_current': new_items_current,
+        'new_items_purchased_previous': new_items_previous,
+        'suppliers_current': curr_suppliers,
+        'suppliers_previous': prev_suppliers,
+        'suppliers_percentage_change': _rounded(_pct_change(Decimal(curr_suppliers), Decimal(prev_suppliers))),
+        'new_suppliers_current': new_suppliers_current,
+        'new_suppliers_previous': new_suppliers_previous
+    }
+
+
+class PeriodMetrics:
+    def __init__(self, runner=None, db_path=None, db_config=None):
+        self.store = PeriodStore(runner, db_path, db_config)
+        self.windows = WindowMaintainer(self.store)
+        self.settings = self.store.settings
+
+    def refresh(self, entity_type, as_of=None, rebuild=False):
+        """Bring every configured window of entity_type up to as_of - see WindowMaintainer.refresh"""
+        return self.windows.refresh(entity_type, as_of, rebuild)
+
+    def status(self):
+        return self.store.status()
+
+    # ============================================================
+    # READ
+    # ============================================================
+
+    def is_servable(self, refreshed_at, rebuilt_at):
+        """Recently refreshed and, since updated items drift until a rebuild, recently rebuilt"""
+        now = datetime.now()
+        return (
+            refreshed_at is not None and rebuilt_at is not None
+            and now - refreshed_at <= timedelta(minutes=self.settings['ranking_max_age_minutes'])
+            and now - rebuilt_at <= timedelta(hours=self.settings['rebuild_max_age_hours'])
+        )
+
+    def check_retained(self, conn, entity_type, first_day):
+        """ValueError unless the daily buckets reach back to first_day"""
+        pulled_through = conn.execute("""
+        SELECT pulled_through FROM refresh_state WHERE entity_type = ?
+        """, [entity_type]).fetchone()
+        oldest = self.store.retention_start(pulled_through[0]) if pulled_through else None
+        if oldest is None or first_day < oldest:
+            raise ValueError(
+                f"Period starting {first_day} is older than the retained daily buckets "
+                f"({oldest or 'none'}) - run refresh with a longer window configured"
+            )
+
+    def overview(self, entity_type, params, entity_ids=None, approximate=None):
+        """
+        overview_metrics rows for params' window: {entity_id: row}
+        Served from a maintained window when one matches (always exact), else
+        aggregated from the daily buckets (any window inside the retained
+        days), with sketch-estimated distinct counts if approximate
+        """
+        self.store.check_entity_type(entity_type)
+        if approximate is None:
+            approximate = self.settings['approximate_distinct']
+        ranges = period_ranges(params['start_date'], params['end_date'])
+        (start, end), (prev_start, prev_end) = ranges['current'], ranges['previous']
+        window_days = (end - start).days
+
+        conn = self.store.get_connection(read_only=True)
+        try:
+            maintained = conn.execute("""
+            SELECT 1 FROM window_state WHERE entity_type = ? AND window_days = ? AND end_day = ?
+            """, [entity_type, window_days, end]).fetchone()
+
+            if maintained:
+                keys_sql, source = WINDOW_KEYS_SQL, 'window'
+            else:
+                self.check_retained(conn, entity_type, prev_start)
+                if approximate:
+                    keys_sql, source = DAILY_TOTALS_SQL, 'sketches'
+                else:
+                    keys_sql, source = DAILY_KEYS_SQL, 'daily'
+
+            where = "WHERE t.entity_id IN (SELECT UNNEST($entity_ids))" if entity_ids is not None else ""
+            query_params = {
+                'entity_type': entity_type, 'start': start, 'end': end,
+                'prev_start': prev_start, 'prev_end': prev_end
+            }
+            if source == 'window':
+                query_params['window_days'] = window_days
+            if entity_ids is not None:
+                query_params['entity_ids'] = list(entity_ids)
+
+            with metrics.timer('period_metrics_seconds', entity_type=entity_type, step=f'read_{source}'):
+                rows = conn.execute(OVERVIEW_SQL.format(keys=keys_sql, where=where), query_params).fetchall()
+                if source == 'sketches':
+                    estimates = self.distinct_estimates(conn, entity_type, ranges, entity_ids)
+                    rows = [
+                        row[:3] + (estimates.get((row[0], 'current', 'counterparty'), 0),
+                                   estimates.get((row[0], 'current', 'product'), 0))
+                        + row[5:7] + (estimates.get((row[0], 'previous', 'counterparty'), 0),
+                                      estimates.get((row[0], 'previous', 'product'), 0))
+                        + row[9:]
+                        for row in rows
+                    ]
+        finally:
+            conn.close()
+
+        return {row[0]: overview_row(entity_type, row) for row in rows}
+
+    def distinct_estimates(self, conn, entity_type, ranges, entity_ids=None):
+        """{(entity_id, period, dimension): estimated distinct keys} from merged sketches"""
+        precision = conn.execute("""
+        SELECT precision FROM sketch_state WHERE entity_type = ?
+        """, [entity_type]).fetchone()
+        if precision is None:
+            raise ValueError(f"No {entity_type} sketches - enable sketches and run refresh")
+
+        entity_filter = "AND entity_id IN (SELECT UNNEST($entity_ids))" if entity_ids is not None else ""
+        parts = []
+        query_params = {'entity_type': entity_type}
+        for period, (first_day, end_day) in ranges.items():
+            day_ranges, month_range = split_range(first_day, end_day)
+            for table, column, bounds in [('daily_sketches', 'day', r) for r in day_ranges] + (
+                [('monthly_sketches', 'month', month_range)] if month_range else []
+            ):
+                n = len(parts)
+                parts.append(f"""
+                SELECT '{period}' AS period, dimension, entity_id, reg, rank FROM {table}
+                WHERE entity_type = $entity_type AND {column} >= $from_{n} AND {column} < $to_{n} {entity_filter}
+                """)
+                query_params[f'from_{n}'], query_params[f'to_{n}'] = bounds
+        if entity_ids is not None:
+            query_params['entity_ids'] = list(entity_ids)
+
+        rows = conn.execute(SKETCH_SQL.format(parts=' UNION ALL '.join(parts)), query_params).fetchall()
+        if not rows:
+            return {}
+        _, _, _, nonzero, harmonic = zip(*rows)
+        counts = hll.estimate(nonzero, harmonic, precision[0])
+        return {
+            (entity_id, period, dimension): int(round(count))
+            for (entity_id, period, dimension, _, _), count in zip(rows, counts)
+        }
+
+    def ranking(self, entity_type, query_name, params, entity_ids=None, require_index=False):
+        """
+        Rows of a dashboard ranking query (top_products, ...) for params'
+        window and top_n, ordered by entity and rank. From the top_k cache
+        when a maintained window covers it, else ranked from the daily
+        buckets - or ValueError with require_index (caller falls back to SQL)
+        """
+        spec = RANKINGS.get(entity_type, {}).get(query_name)
+        if spec is None:
+            raise ValueError(f"No ranking index for {entity_type} {query_name}")
+        ranges = period_ranges(params['start_date'], params['end_date'])
+        start, end = ranges['current']
+        top_n = int(params['top_n'])
+
+        conn = self.store.get_connection(read_only=True)
+        try:
+            state = conn.execute("""
+            SELECT r.refreshed_at, r.rebuilt_at FROM window_state s
+            JOIN refresh_state r USING (entity_type)
+            WHERE s.entity_type = ? AND s.window_days = ? AND s.end_day = ?
+            """, [entity_type, (end - start).days, end]).fetchone()
+            indexed = (
+                state is not None and top_n <= self.settings['top_k']
+                and self.is_servable(*state)
+            )
+            if not indexed and require_index:
+                raise ValueError(f"Ranking index doesn't cover {start} → {end}, top_n={top_n}")
+
+            source = 'index' if indexed else 'daily'
+            if not indexed:
+                self.check_retained(conn, entity_type, start)
+            query_params = {'entity_type': entity_type, 'dimension': spec['dimension'], 'top_n': top_n}
+            if indexed:
+                query_params['window_days'] = (end - start).days
+            else:
+                query_params.update({'start': start, 'end': end})
+            entity_filter = ""
+            if entity_ids is not None:
+                entity_filter = f"AND {'t.' if indexed else ''}entity_id IN (SELECT UNNEST($entity_ids))"
+                query_params['entity_ids'] = list(entity_ids)
+
+            with metrics.timer('period_metrics_seconds', entity_type=entity_type, step=f'ranking_{source}'):
+                rows = conn.execute(
+                    RANKING_SQL[source].format(entity_filter=entity_filter), query_params
+                ).fetchall()
+        finally:
+            conn.close()
+
+        id_col = ACTIVITY_COLUMNS[entity_type][0]
+        columns = RANKING_COLUMNS[entity_type]
+        result = []
+        for entity_id, key, name, amount, rank in rows:
+            row = {id_col: entity_id}
+            if spec['key_col']:
+                row[spec['key_col']] = None if key == -1 else key
+            row[spec['name_col']] = name
+            row[columns['amount_col']] = float(amount)
+            row[columns['rank_col']] = rank
+            result.append(row)
+        return result
+
+    def check_current(self, entity_type, end_date):
+        """ValueError unless a recent refresh (after a recent rebuild) pulled days through end_date"""
+        conn = self.store.get_connection(read_only=True)
+        try:
+            state = conn.execute("""
+            SELECT pulled_through, refreshed_at, rebuilt_at FROM refresh_state WHERE entity_type = ?
+            """, [entity_type]).fetchone()
+        finally:
+            conn.close()
+        if state is None or state[0] < as_date(end_date) or not self.is_servable(state[1], state[2]):
+            raise ValueError(f"{entity_type} period metrics are not current through {end_date} - run refresh")
+
+    def dashboards(self, entity_type, params, entity_ids):
+        """
+        Overview and ranking rows of params' window for each of entity_ids:
+        {entity_id: {query_name: rows}} (the dashboard queries the store can
+        answer, in their SQL output shape). ValueError unless current.
+        """
+        self.check_current(entity_type, params['end_date'])
+        overview_name = config.QUERY_REGISTRY[entity_type]['overview_query']
+        names = [overview_name, *RANKINGS.get(entity_type, {})]
+        result = {entity_id: {name: [] for name in names} for entity_id in entity_ids}
+
+        for entity_id, row in self.overview(entity_type, params, entity_ids).items():
+            result[entity_id][overview_name].append(row)
+        id_col = ACTIVITY_COLUMNS[entity_type][0]
+        for name in names[1:]:
+            for row in self.ranking(entity_type, name, params, entity_ids):
+                result[row[id_col]][name].append(row)
+        return result
+
+def main():
+    parser = argparse.ArgumentParser(description='Incremental period-over-period overview metrics')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    refresh_parser = subparsers.add_parser('refresh', help='Pull new days and slide the rolling windows')
+    refresh_parser.add_argument('--entity', choices=sorted(COUNTERPARTY_COLUMNS), default='buyer')
+    refresh_parser.add_argument('--as-of', help='Window end date YYYY-MM-DD (default: today)')
+    refresh_parser.add_argument('--rebuild', action='store_true', help='Re-pull all retained days and first-seen dates')
+
+    show_parser = subparsers.add_parser('show', help='Print overview rows for a window')
+    show_parser.add_argument('--entity', choices=sorted(COUNTERPARTY_COLUMNS), default='buyer')
+    show_parser.add_argument('--window', type=int, help='Rolling window in days (default: first configured)')
+    show_parser.add_argument('--as-of', help='Window end date YYYY-MM-DD (default: today)')
+    show_parser.add_argument('--id', type=int, action='append', help='Entity ID(s) (default: all)')
+    show_parser.add_argument('--limit', type=int, default=20)
+    show_parser.add_argument('--approximate', action='store_true', default=None,
+                             help='Sketch-estimated distinct counts (windows that are not maintained)')
+
+    top_parser = subparsers.add_parser('top', help='Print ranking rows (top_products, ...) for a window')
+    top_parser.add_argument('query', choices=sorted(RANKINGS['buyer']))
+    top_parser.add_argument('--window', type=int, help='Rolling window in days (default: first configured)')
+    top_parser.add_argument('--as-of', help='Window end date YYYY-MM-DD (default: today)')
+    top_parser.add_argument('--id', type=int, action='append', help='Buyer ID(s) (default: all)')
+    top_parser.add_argument('--top-n', type=int, default=10)
+
+    subparsers.add_parser('status', help='Maintained windows and retained days')
+
+    args = parser.parse_args()
+    engine = PeriodMetrics()
+
+    if args.command == 'refresh':
+        summary = engine.refresh(args.entity, as_of=args.as_of, rebuild=args.rebuild)
+        windows = ', '.join(f"{days}d {action}" for days, action in summary['windows'].items())
+        print(f"✓ {args.entity} period metrics as of {summary['as_of']} in {summary['seconds']}s "
+              f"({'rebuild, ' if summary['rebuild'] else ''}{summary['pulled_rows']} daily rows since "
+              f"{summary['since']}; {windows})")
+
+    elif args.command == 'show':
+        window_days = args.window or config.PERIOD_METRICS_CONFIG['windows'][0]
+        params = window_params(window_days, args.as_of or date.today())
+        rows = engine.overview(args.entity, params, entity_ids=args.id, approximate=args.approximate)
+        print(f"{len(rows)} {args.entity}s, {params['start_date']} → {params['end_date']}")
+        for row in list(rows.values())[:args.limit]:
+            print(json.dumps(row))
+
+    elif args.command == 'top':
+        window_days = args.window or config.PERIOD_METRICS_CONFIG['windows'][0]
+        params = {**window_params(window_days, args.as_of or date.today()), 'top_n': args.top_n}
+        for row in engine.ranking('buyer', args.query, params, entity_ids=args.id):
+            print(json.dumps(row))
+
+    else:
+        print(json.dumps(engine.status(), indent=2, default=str))
+
+
+if __name__ == '__main__':
+    main()
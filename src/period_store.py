@@ -0,0 +1,437 @@
+"""
+Period Store: Daily buckets pulled from Postgres for period metrics
+
+Items are pulled into daily buckets per (entity, product) and (entity,
+counterparty) - plus per leaf category for ranked entity types - in a
+separate DuckDB file (INCREMENTAL_DB_PATH), with a first-seen day per key
+for new items / suppliers. With sketches on, each pull also stages
+HyperLogLog registers per entity per day (hll.py).
+
+Only the days any configured window needs are retained (retention_start).
+period_windows.py maintains the windows from these tables; period_metrics.py
+serves them.
+"""
+
+import os
+from datetime import date, timedelta
+import config
+import hll
+from entity_discovery import ACTIVITY_COLUMNS
+
+# Counterparty per entity type (distinct / new counterparties)
+COUNTERPARTY_COLUMNS = {
+    'buyer': 'seller_org_id'
+}
+
+DAILY_SQL = """
+    SELECT pd.{id_col}, pi.{date_col}::date,
+           GROUPING(pi.product_id),
+           COALESCE(CASE WHEN GROUPING(pi.product_id) = 0 THEN pi.product_id ELSE pd.{cp_col} END, -1),
+           COALESCE(SUM(pi.total_amount), 0), COALESCE(SUM(pi.qty), 0), COUNT(*)
+    FROM po_items pi
+    JOIN po_details pd ON pd.id = pi.po_id
+    WHERE pd.{id_col} IS NOT NULL
+      AND pi.{date_col} >= %(since)s
+    GROUP BY pd.{id_col}, pi.{date_col}::date, GROUPING SETS ((pi.product_id), (pd.{cp_col}))
+"""
+
+# Buyer spend per leaf category (same category pick and vendor match as top_categories)
+CATEGORY_DAILY_SQL = """
+    SELECT pd.{id_col}, pi.{date_col}::date,
+           (SELECT cat->>'name'
+              FROM jsonb_array_elements(vp.category_ids -> 'cat_0') cat
+              ORDER BY (cat->>'level')::INT DESC
+              LIMIT 1),
+           COALESCE(SUM(pi.total_amount), 0), COALESCE(SUM(pi.qty), 0), COUNT(*)
+    FROM po_items pi
+    JOIN po_details pd ON pd.id = pi.po_id
+    JOIN vendor_products vp ON pi.product_id = vp.id AND pd.seller_org_id = vp.org_id
+    WHERE pd.{id_col} IS NOT NULL
+      AND pi.{date_col} >= %(since)s
+    GROUP BY 1, 2, 3
+"""
+
+# Display names of ranked keys
+NAME_SQL = {
+    'product': "SELECT id, product_name FROM vendor_products WHERE id = ANY(%(entity_ids)s)",
+    'counterparty': 'SELECT org_id, company_name FROM "userApis_organization" WHERE org_id = ANY(%(entity_ids)s)'
+}
+
+FIRST_SEEN_SQL = """
+    SELECT pd.{id_col},
+           GROUPING(pi.product_id),
+           COALESCE(CASE WHEN GROUPING(pi.product_id) = 0 THEN pi.product_id ELSE pd.{cp_col} END, -1),
+           MIN(pi.{date_col})::date
+    FROM po_items pi
+    JOIN po_details pd ON pd.id = pi.po_id
+    WHERE pd.{id_col} IS NOT NULL
+    GROUP BY pd.{id_col}, GROUPING SETS ((pi.product_id), (pd.{cp_col}))
+"""
+
+# NULL product / counterparty keys are stored as -1: counted in sums, not in distinct counts
+
+
+# Column dtypes of the pulled rows, loaded into DuckDB as numpy arrays
+DAILY_DTYPES = [
+    ('entity_id', 'int64'), ('day', 'datetime64[s]'), ('by_counterparty', 'int8'), ('key', 'int64'),
+    ('amount', 'float64'), ('qty', 'float64'), ('lines', 'int64')
+]
+CATEGORY_DTYPES = [
+    ('entity_id', 'int64'), ('day', 'datetime64[s]'), ('key', 'int64'),
+    ('amount', 'float64'), ('qty', 'float64'), ('lines', 'int64')
+]
+NAME_DTYPES = [('key', 'int64'), ('name', 'object')]
+FIRST_SEEN_DTYPES = [
+    ('entity_id', 'int64'), ('by_counterparty', 'int8'), ('key', 'int64'), ('first_day', 'datetime64[s]')
+]
+
+
+def register_rows(conn, name, rows, dtypes):
+    """Expose Postgres result rows to DuckDB as view `name` (columnar, no row-by-row inserts)"""
+    import numpy as np
+
+    columns = list(zip(*rows)) if rows else [()] * len(dtypes)
+    arrays = {
+        column: np.array(values, dtype=dtype)
+        for (column, dtype), values in zip(dtypes, columns)
+    }
+    conn.register(name, arrays)
+    return arrays
+
+
+# Dashboard ranking queries the index can serve: dimension and output columns
+RANKINGS = {
+    'buyer': {
+        'top_products': {'dimension': 'product', 'key_col': 'product_id', 'name_col': 'product_name'},
+        'top_suppliers': {'dimension': 'counterparty', 'key_col': 'seller_org_id', 'name_col': 'company_name'},
+        'top_categories': {'dimension': 'category', 'key_col': None, 'name_col': 'category'}
+    }
+}
+
+
+def as_date(value):
+    return value if isinstance(value, date) else date.fromisoformat(str(value)[:10])
+
+
+def period_ranges(start_date, end_date):
+    """
+    {'current': (first_day, end_day), 'previous': (...)} with exclusive end
+    days, as overview_metrics assigns items for these parameters
+    """
+    start, end = as_date(start_date), as_date(end_date)
+    length = (end - start).days
+    return {
+        'current': (start, end),
+        'previous': (start - timedelta(days=length + 1), start - timedelta(days=1))
+    }
+
+
+def window_params(window_days, as_of):
+    """start/end_date of an N-day rolling window ending on as_of (like run_all --days N)"""
+    end = as_date(as_of)
+    return {'start_date': (end - timedelta(days=window_days)).isoformat(), 'end_date': end.isoformat()}
+
+
+class PeriodStore:
+    def __init__(self, runner=None, db_path=None, db_config=None):
+        self._runner = runner
+        self.db_config = db_config
+        self.db_path = db_path or config.INCREMENTAL_DB_PATH
+        self.settings = config.PERIOD_METRICS_CONFIG
+
+    @property
+    def runner(self):
+        """Shared PreparedQueryRunner if given, else a single-connection one of our own"""
+        if self._runner is None:
+            from pg_pool import PreparedQueryRunner
+            self._runner = PreparedQueryRunner(
+                self.db_config,
+                pool_config={**config.PG_POOL_CONFIG, 'min_connections': 1, 'max_connections': 1}
+            )
+        return self._runner
+
+    # ============================================================
+    # CONNECTION / SCHEMA
+    # ============================================================
+
+    def get_connection(self, read_only=False):
+        import duckdb
+
+        if read_only:
+            return duckdb.connect(self.db_path, read_only=True)
+
+        os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
+        conn = duckdb.connect(self.db_path)
+        self.initialize_schema(conn)
+        return conn
+
+    def initialize_schema(self, conn):
+        """
+        Daily buckets, per-window key totals, first-seen days and refresh state
+        (bulk-replaced tables have no primary key - index upkeep would dominate loads)
+        """
+        conn.execute("""
+        CREATE TABLE IF NOT EXISTS daily_keys (
+            entity_type VARCHAR,
+            dimension   VARCHAR,          -- 'product' or 'counterparty'
+            entity_id   BIGINT,
+            key         BIGINT,
+            day         DATE,
+            amount      DECIMAL(18,2),
+            qty         DECIMAL(18,2),
+            lines       BIGINT
+        )
+        """)
+
+        conn.execute("""
+        CREATE TABLE IF NOT EXISTS window_keys (
+            entity_type VARCHAR,
+            window_days INTEGER,
+            period      VARCHAR,          -- 'current' or 'previous'
+            dimension   VARCHAR,
+            entity_id   BIGINT,
+            key         BIGINT,
+            amount      DECIMAL(18,2),
+            qty         DECIMAL(18,2),
+            lines       BIGINT,
+            PRIMARY KEY (entity_type, window_days, period, dimension, entity_id, key)
+        )
+        """)
+
+        # Top top_k keys per (window, dimension, entity) of the current period
+        conn.execute("""
+        CREATE TABLE IF NOT EXISTS window_top (
+            entity_type VARCHAR,
+            window_days INTEGER,
+            dimension   VARCHAR,
+            entity_id   BIGINT,
+            rank        INTEGER,
+            key         BIGINT,
+            amount      DECIMAL(18,2)
+        )
+        """)
+        # Product / supplier names; categories get their integer keys here
+        conn.execute("""
+        CREATE TABLE IF NOT EXISTS item_names (
+            dimension   VARCHAR,
+            key         BIGINT,
+            name        VARCHAR,
+            PRIMARY KEY (dimension, key)
+        )
+        """)
+
+        conn.execute("""
+        CREATE TABLE IF NOT EXISTS first_seen (
+            entity_type VARCHAR,
+            dimension   VARCHAR,
+            entity_id   BIGINT,
+            key         BIGINT,
+            first_day   DATE,
+            PRIMARY KEY (entity_type, dimension, entity_id, key)
+        )
+        """)
+
+        # end_day of each maintained window; pulled_through = as_of of the last pull
+        conn.execute("""
+        CREATE TABLE IF NOT EXISTS window_state (
+            entity_type VARCHAR,
+            window_days INTEGER,
+            end_day     DATE,
+            PRIMARY KEY (entity_type, window_days)
+        )
+        """)
+        # HyperLogLog registers (hll.py), one row per non-empty register
+        conn.execute("""
+        CREATE TABLE IF NOT EXISTS daily_sketches (
+            entity_type VARCHAR,
+            dimension   VARCHAR,
+            entity_id   BIGINT,
+            day         DATE,
+            reg         INTEGER,
+            rank        TINYINT
+        )
+        """)
+        conn.execute("""
+        CREATE TABLE IF NOT EXISTS monthly_sketches (
+            entity_type VARCHAR,
+            dimension   VARCHAR,
+            entity_id   BIGINT,
+            month       DATE,
+            reg         INTEGER,
+            rank        TINYINT
+        )
+        """)
+        conn.execute("""
+        CREATE TABLE IF NOT EXISTS sketch_state (
+            entity_type VARCHAR PRIMARY KEY,
+            precision   INTEGER
+        )
+        """)
+
+        conn.execute("""
+        CREATE TABLE IF NOT EXISTS refresh_state (
+            entity_type     VARCHAR PRIMARY KEY,
+            pulled_through  DATE,
+            refreshed_at    TIMESTAMP,
+            rebuilt_at      TIMESTAMP
+        )
+        """)
+
+    def check_entity_type(self, entity_type):
+        if entity_type not in COUNTERPARTY_COLUMNS:
+            raise ValueError(
+                f"No period metrics for '{entity_type}' (supported: {', '.join(COUNTERPARTY_COLUMNS)})"
+            )
+
+    def retention_start(self, as_of):
+        """Oldest day any maintained window needs (start of the longest previous period)"""
+        longest = max(self.settings['windows'])
+        return period_ranges(window_params(longest, as_of)['start_date'], as_of)['previous'][0]
+
+    # ============================================================
+    # PULL FROM POSTGRES
+    # ============================================================
+
+    def pull_daily(self, conn, entity_type, since):
+        """Daily buckets for days >= since into temp table pulled_days"""
+        id_col, date_col = ACTIVITY_COLUMNS[entity_type]
+        rows, _ = self.runner.execute(
+            f"period_daily_{entity_type}",
+            DAILY_SQL.format(id_col=id_col, date_col=date_col, cp_col=COUNTERPARTY_COLUMNS[entity_type]),
+            {'since': since}
+        )
+
+        arrays = register_rows(conn, 'pulled_rows', rows, DAILY_DTYPES)
+        try:
+            conn.execute("""
+            CREATE OR REPLACE TEMP TABLE pulled_days AS
+            SELECT ? AS entity_type,
+                   CASE WHEN by_counterparty = 1 THEN 'counterparty' ELSE 'product' END AS dimension,
+                   entity_id, key, day::DATE AS day,
+                   CAST(amount AS DECIMAL(18,2)) AS amount, CAST(qty AS DECIMAL(18,2)) AS qty, lines
+            FROM pulled_rows
+            """, [entity_type])
+        finally:
+            conn.unregister('pulled_rows')
+
+        if self.settings['sketches']:
+            self.stage_sketches(conn, entity_type, arrays)
+        if entity_type in RANKINGS:
+            self.pull_categories(conn, entity_type, since)
+        return len(rows)
+
+    def pull_categories(self, conn, entity_type, since):
+        """Daily category buckets appended to pulled_days (new category names get keys)"""
+        id_col, date_col = ACTIVITY_COLUMNS[entity_type]
+        rows, _ = self.runner.execute(
+            f"period_categories_{entity_type}",
+            CATEGORY_DAILY_SQL.format(id_col=id_col, date_col=date_col),
+            {'since': since}
+        )
+
+        # Few distinct categories: key them here so only numbers go to DuckDB
+        keys = dict(conn.execute("SELECT name, key FROM item_names WHERE dimension = 'category'").fetchall())
+        new = sorted({row[2] for row in rows if row[2] is not None} - keys.keys())
+        if new:
+            first = max(keys.values(), default=0) + 1
+            keys.update((name, first + i) for i, name in enumerate(new))
+            conn.executemany("INSERT INTO item_names VALUES ('category', ?, ?)", [
+                (keys[name], name) for name in new
+            ])
+
+        register_rows(conn, 'pulled_categories', [
+            (entity_id, day, keys.get(category, -1), amount, qty, lines)
+            for entity_id, day, category, amount, qty, lines in rows
+        ], CATEGORY_DTYPES)
+        try:
+            conn.execute("""
+            INSERT INTO pulled_days
+            SELECT ?, 'category', entity_id, key, day::DATE,
+                   CAST(amount AS DECIMAL(18,2)), CAST(qty AS DECIMAL(18,2)), lines
+            FROM pulled_categories
+            """, [entity_type])
+        finally:
+            conn.unregister('pulled_categories')
+
+    def pull_names(self, conn, rebuild=False):
+        """Names of the products / suppliers in pulled_days (all on rebuild, else just unnamed keys)"""
+        for dimension, query in NAME_SQL.items():
+            keys = [row[0] for row in conn.execute("""
+            SELECT DISTINCT key FROM pulled_days p
+            WHERE dimension = ? AND key <> -1
+              AND (? OR NOT EXISTS (SELECT 1 FROM item_names n WHERE n.dimension = p.dimension AND n.key = p.key))
+            """, [dimension, rebuild]).fetchall()]
+            if not keys:
+                continue
+            rows, _ = self.runner.execute(f"period_names_{dimension}", query, {'entity_ids': keys})
+            register_rows(conn, 'pulled_names', rows, NAME_DTYPES)
+            try:
+                conn.execute("""
+                INSERT INTO item_names SELECT ?, key, name FROM pulled_names
+                ON CONFLICT DO UPDATE SET name = EXCLUDED.name
+                """, [dimension])
+            finally:
+                conn.unregister('pulled_names')
+
+    def stage_sketches(self, conn, entity_type, arrays):
+        """Daily sketches of the pulled keys into temp table pulled_sketches"""
+        known = arrays['key'] != -1
+        reg, rank = hll.registers(arrays['key'][known], self.settings['sketch_precision'])
+        conn.register('pulled_registers', {
+            'entity_id': arrays['entity_id'][known],
+            'day': arrays['day'][known],
+            'by_counterparty': arrays['by_counterparty'][known],
+            'reg': reg,
+            'rank': rank
+        })
+        try:
+            conn.execute("""
+            CREATE OR REPLACE TEMP TABLE pulled_sketches AS
+            SELECT ? AS entity_type,
+                   CASE WHEN by_counterparty = 1 THEN 'counterparty' ELSE 'product' END AS dimension,
+                   entity_id, day::DATE AS day, reg::INTEGER AS reg, MAX(rank)::TINYINT AS rank
+            FROM pulled_registers
+            GROUP BY ALL
+            """, [entity_type])
+        finally:
+            conn.unregister('pulled_registers')
+
+    def pull_first_seen(self, conn, entity_type):
+        """Lifetime first day per (entity, product / counterparty), replacing what is stored"""
+        id_col, date_col = ACTIVITY_COLUMNS[entity_type]
+        rows, _ = self.runner.execute(
+            f"period_first_seen_{entity_type}",
+            FIRST_SEEN_SQL.format(id_col=id_col, date_col=date_col, cp_col=COUNTERPARTY_COLUMNS[entity_type]),
+            {}
+        )
+
+        conn.execute("DELETE FROM first_seen WHERE entity_type = ?", [entity_type])
+        register_rows(conn, 'first_seen_rows', rows, FIRST_SEEN_DTYPES)
+        try:
+            conn.execute("""
+            INSERT INTO first_seen
+            SELECT ?, CASE WHEN by_counterparty = 1 THEN 'counterparty' ELSE 'product' END,
+                   entity_id, key, first_day::DATE
+            FROM first_seen_rows
+            """, [entity_type])
+        finally:
+            conn.unregister('first_seen_rows')
+        return len(rows)
+
+    # ============================================================
+    # STATUS
+    # ============================================================
+
+    def status(self):
+        conn = self.get_connection(read_only=True)
+        try:
+            refreshed = conn.execute("SELECT * FROM refresh_state ORDER BY entity_type").fetchall()
+            windows = conn.execute("""
+            SELECT entity_type, window_days, end_day FROM window_state ORDER BY entity_type, window_days
+            """).fetchall()
+            days = conn.execute("""
+            SELECT entity_type, MIN(day), MAX(day), COUNT(*) FROM daily_keys GROUP BY entity_type
+            """).fetchall()
+        finally:
+            conn.close()
+        return {'refresh_state': refreshed, 'windows': windows, 'daily_keys': days}
@@ -0,0 +1,283 @@
+"""
+Period Windows: Rolling windows maintained over the period store's daily buckets
+
+Every rolling window in PERIOD_METRICS_CONFIG keeps per-key totals for its
+current and previous period (window_keys); moving the window adds the days
+that enter a period and subtracts the days that leave it, and re-pulled
+recent days (lookback_days) are applied as differences against what was
+stored. The top_k keys of each window's current period are cached in
+window_top and re-ranked only for entities whose totals changed.
+
+Buyer activity is by updated_date, so an updated item moves to a later
+day; its old day is corrected only if it is still within lookback_days,
+otherwise it counts on both days until the next full rebuild. A refresh
+therefore rebuilds by itself once the last rebuild is rebuild_every_hours
+old.
+"""
+
+from datetime import date, datetime, timedelta
+import metrics
+from period_store import RANKINGS, as_date, period_ranges, window_params
+
+
+class WindowMaintainer:
+    def __init__(self, store):
+        self.store = store
+        self.settings = store.settings
+
+    # ============================================================
+    # WINDOW MAINTENANCE
+    # ============================================================
+
+    def apply_days(self, conn, entity_type, window_days, period, source, first_day, end_day, sign=1):
+        """Add (sign=1) or subtract (sign=-1) source's days in [first_day, end_day) to a period"""
+        if first_day >= end_day:
+            return
+        conn.execute(f"""
+        INSERT INTO window_keys
+        SELECT $entity_type, $window_days, $period, dimension, entity_id, key,
+               $sign * SUM(amount), $sign * SUM(qty), $sign * SUM(lines)
+        FROM {source}
+        WHERE entity_type = $entity_type AND day >= $first_day AND day < $end_day
+        GROUP BY dimension, entity_id, key
+        ON CONFLICT DO UPDATE SET
+            amount = window_keys.amount + EXCLUDED.amount,
+            qty = window_keys.qty + EXCLUDED.qty,
+            lines = window_keys.lines + EXCLUDED.lines
+        """, {
+            'entity_type': entity_type, 'window_days': window_days, 'period': period,
+            'sign': sign, 'first_day': first_day, 'end_day': end_day
+        })
+
+        # Rankings cover the current period: these entities need re-ranking
+        if period == 'current':
+            conn.execute(f"""
+            INSERT INTO touched
+            SELECT DISTINCT $window_days, entity_id FROM {source}
+            WHERE entity_type = $entity_type AND day >= $first_day AND day < $end_day
+            """, {'entity_type': entity_type, 'window_days': window_days,
+                  'first_day': first_day, 'end_day': end_day})
+
+    def recompute_window(self, conn, entity_type, window_days, end_day):
+        for table in ('window_keys', 'window_top'):
+            conn.execute(f"DELETE FROM {table} WHERE entity_type = ? AND window_days = ?", [entity_type, window_days])
+        ranges = period_ranges(window_params(window_days, end_day)['start_date'], end_day)
+        for period, (first_day, last_day) in ranges.items():
+            self.apply_days(conn, entity_type, window_days, period, 'daily_keys', first_day, last_day)
+
+    def advance_window(self, conn, entity_type, window_days, old_end, new_end):
+        """Slide a window: add entering days, subtract leaving days, per period"""
+        if new_end < old_end or (new_end - old_end).days > window_days:
+            self.recompute_window(conn, entity_type, window_days, new_end)
+            return 'recomputed'
+
+        old = period_ranges(window_params(window_days, old_end)['start_date'], old_end)
+        new = period_ranges(window_params(window_days, new_end)['start_date'], new_end)
+        for period in ('current', 'previous'):
+            (old_first, old_last), (new_first, new_last) = old[period], new[period]
+            self.apply_days(conn, entity_type, window_days, period, 'daily_keys', old_last, new_last)
+            self.apply_days(conn, entity_type, window_days, period, 'daily_keys', old_first, new_first, sign=-1)
+        return 'slid'
+
+    def apply_pulled(self, conn, entity_type, since, windows):
+        """
+        Replace stored days >= since with pulled_days; every window period
+        containing a re-pulled day gets the difference
+        """
+        conn.execute("""
+        CREATE OR REPLACE TEMP TABLE day_changes AS
+        SELECT COALESCE(n.entity_type, o.entity_type) AS entity_type,
+               COALESCE(n.dimension, o.dimension) AS dimension,
+               COALESCE(n.entity_id, o.entity_id) AS entity_id,
+               COALESCE(n.key, o.key) AS key,
+               COALESCE(n.day, o.day) AS day,
+               COALESCE(n.amount, 0) - COALESCE(o.amount, 0) AS amount,
+               COALESCE(n.qty, 0) - COALESCE(o.qty, 0) AS qty,
+               COALESCE(n.lines, 0) - COALESCE(o.lines, 0) AS lines
+        FROM pulled_days n
+        FULL OUTER JOIN (
+            SELECT * FROM daily_keys WHERE entity_type = $entity_type AND day >= $since
+        ) o ON n.dimension = o.dimension AND n.entity_id = o.entity_id
+           AND n.key = o.key AND n.day = o.day
+        WHERE n.amount IS DISTINCT FROM o.amount
+           OR n.qty IS DISTINCT FROM o.qty
+           OR n.lines IS DISTINCT FROM o.lines
+        """, {'entity_type': entity_type, 'since': since})
+        changed = conn.execute("SELECT COUNT(*) FROM day_changes").fetchone()[0]
+
+        for window_days, end_day in windows.items():
+            ranges = period_ranges(window_params(window_days, end_day)['start_date'], end_day)
+            for period, (first_day, last_day) in ranges.items():
+                self.apply_days(conn, entity_type, window_days, period, 'day_changes', first_day, last_day)
+
+        conn.execute("""
+        DELETE FROM daily_keys WHERE entity_type = ? AND day >= ?
+        """, [entity_type, since])
+        conn.execute("INSERT INTO daily_keys SELECT * FROM pulled_days")
+
+        # First-seen days only move earlier on new data (see --rebuild for the rest)
+        conn.execute("""
+        INSERT INTO first_seen
+        SELECT entity_type, dimension, entity_id, key, MIN(day) FROM pulled_days
+        WHERE dimension <> 'category'
+        GROUP BY entity_type, dimension, entity_id, key
+        ON CONFLICT DO UPDATE SET first_day = LEAST(first_seen.first_day, EXCLUDED.first_day)
+        """)
+        return changed
+
+    def update_top(self, conn, entity_type):
+        """Re-rank the touched entities of each window; returns how many were re-ranked"""
+        conn.execute("""
+        DELETE FROM window_top
+        WHERE entity_type = $entity_type
+          AND (window_days NOT IN (SELECT UNNEST($windows))
+               OR EXISTS (SELECT 1 FROM touched t
+                          WHERE t.window_days = window_top.window_days AND t.entity_id = window_top.entity_id))
+        """, {'entity_type': entity_type, 'windows': self.settings['windows']})
+        conn.execute("""
+        INSERT INTO window_top
+        SELECT entity_type, window_days, dimension, entity_id, rank, key, amount
+        FROM (
+            SELECT w.*, ROW_NUMBER() OVER (
+                PARTITION BY w.window_days, w.dimension, w.entity_id ORDER BY w.amount DESC, w.key
+            ) AS rank
+            FROM window_keys w
+            WHERE w.entity_type = $entity_type AND w.period = 'current' AND w.lines > 0
+              AND (w.window_days, w.entity_id) IN (SELECT DISTINCT window_days, entity_id FROM touched)
+        )
+        WHERE rank <= $top_k
+        """, {'entity_type': entity_type, 'top_k': self.settings['top_k']})
+        return conn.execute("SELECT COUNT(*) FROM (SELECT DISTINCT * FROM touched)").fetchone()[0]
+
+    def apply_sketches(self, conn, entity_type, since, rebuild):
+        """Replace daily sketches from since on and re-roll the months they fall in"""
+        if rebuild:
+            conn.execute("DELETE FROM daily_sketches WHERE entity_type = ?", [entity_type])
+        else:
+            conn.execute("DELETE FROM daily_sketches WHERE entity_type = ? AND day >= ?", [entity_type, since])
+        conn.execute("INSERT INTO daily_sketches SELECT * FROM pulled_sketches")
+
+        first_month = since.replace(day=1)
+        conn.execute("""
+        DELETE FROM monthly_sketches WHERE entity_type = ? AND month >= ?
+        """, [entity_type, first_month])
+        conn.execute("""
+        INSERT INTO monthly_sketches
+        SELECT entity_type, dimension, entity_id, date_trunc('month', day)::DATE, reg, MAX(rank)
+        FROM daily_sketches
+        WHERE entity_type = ? AND day >= ?
+        GROUP BY ALL
+        """, [entity_type, first_month])
+
+        conn.execute("""
+        INSERT INTO sketch_state VALUES (?, ?)
+        ON CONFLICT DO UPDATE SET precision = EXCLUDED.precision
+        """, [entity_type, self.settings['sketch_precision']])
+
+    # ============================================================
+    # REFRESH
+    # ============================================================
+
+    def refresh(self, entity_type, as_of=None, rebuild=False):
+        """
+        Bring every configured window of entity_type up to as_of (default today)
+        Returns a summary dict
+        """
+        self.store.check_entity_type(entity_type)
+        as_of = as_date(as_of or date.today())
+        started = datetime.now()
+
+        conn = self.store.get_connection()
+        in_transaction = False
+        try:
+            state = conn.execute("""
+            SELECT pulled_through, rebuilt_at FROM refresh_state WHERE entity_type = ?
+            """, [entity_type]).fetchone()
+            windows = dict(conn.execute("""
+            SELECT window_days, end_day FROM window_state WHERE entity_type = ?
+            """, [entity_type]).fetchall())
+            precision = conn.execute("""
+            SELECT precision FROM sketch_state WHERE entity_type = ?
+            """, [entity_type]).fetchone()
+            # A newly configured window may need days older than those retained;
+            # sketches need every retained day at the configured precision;
+            # items whose updated_date moved past lookback_days drift until a rebuild
+            rebuild_every = timedelta(hours=self.settings['rebuild_every_hours'])
+            rebuild = (
+                rebuild or state is None
+                or state[1] is None or started - state[1] >= rebuild_every
+                or any(w not in windows for w in self.settings['windows'])
+                or (self.settings['sketches'] and precision != (self.settings['sketch_precision'],))
+            )
+
+            if rebuild:
+                since = self.store.retention_start(as_of)
+            else:
+                since = min(state[0], as_of) - timedelta(days=self.settings['lookback_days'])
+
+            with metrics.timer('period_metrics_seconds', entity_type=entity_type, step='pull'):
+                pulled = self.store.pull_daily(conn, entity_type, since)
+
+            summary = {'entity_type': entity_type, 'as_of': as_of.isoformat(),
+                       'rebuild': rebuild, 'since': since.isoformat(), 'pulled_rows': pulled, 'windows': {}}
+
+            conn.execute("CREATE OR REPLACE TEMP TABLE touched (window_days INTEGER, entity_id BIGINT)")
+            if entity_type in RANKINGS:
+                self.store.pull_names(conn, rebuild)
+
+            conn.begin()
+            in_transaction = True
+            with metrics.timer('period_metrics_seconds', entity_type=entity_type, step='apply'):
+                if rebuild:
+                    for table in ('daily_keys', 'window_keys', 'window_state', 'window_top'):
+                        conn.execute(f"DELETE FROM {table} WHERE entity_type = ?", [entity_type])
+                    conn.execute("INSERT INTO daily_keys SELECT * FROM pulled_days")
+                    summary['first_seen_keys'] = self.store.pull_first_seen(conn, entity_type)
+                    windows = {}
+                else:
+                    summary['changed_day_keys'] = self.apply_pulled(conn, entity_type, since, windows)
+                if self.settings['sketches']:
+                    self.apply_sketches(conn, entity_type, since, rebuild)
+
+                for window_days in self.settings['windows']:
+                    if window_days in windows:
+                        action = self.advance_window(conn, entity_type, window_days, windows[window_days], as_of)
+                    else:
+                        self.recompute_window(conn, entity_type, window_days, as_of)
+                        action = 'built'
+                    summary['windows'][window_days] = action
+
+                # Dropped windows and keys that left a period
+                conn.execute("""
+                DELETE FROM window_keys WHERE entity_type = ? AND (lines = 0 OR window_days NOT IN (SELECT UNNEST(?)))
+                """, [entity_type, self.settings['windows']])
+                if entity_type in RANKINGS:
+                    summary['reranked_entities'] = self.update_top(conn, entity_type)
+                conn.execute("DELETE FROM window_state WHERE entity_type = ?", [entity_type])
+                conn.executemany("INSERT INTO window_state VALUES (?, ?, ?)", [
+                    (entity_type, window_days, as_of) for window_days in self.settings['windows']
+                ])
+
+                retention_start = self.store.retention_start(as_of)
+                conn.execute("DELETE FROM daily_keys WHERE entity_type = ? AND day < ?", [entity_type, retention_start])
+                conn.execute("DELETE FROM daily_sketches WHERE entity_type = ? AND day < ?", [entity_type, retention_start])
+                conn.execute("DELETE FROM monthly_sketches WHERE entity_type = ? AND month < ?", [entity_type, retention_start])
+
+                now = datetime.now()
+                conn.execute("""
+                INSERT INTO refresh_state VALUES (?, ?, ?, ?)
+                ON CONFLICT DO UPDATE SET
+                    pulled_through = EXCLUDED.pulled_through,
+                    refreshed_at = EXCLUDED.refreshed_at,
+                    rebuilt_at = COALESCE(EXCLUDED.rebuilt_at, refresh_state.rebuilt_at)
+                """, [entity_type, as_of, now, now if rebuild else None])
+            conn.commit()
+        except Exception:
+            if in_transaction:
+                conn.rollback()
+            raise
+        finally:
+            conn.close()
+
+        summary['seconds'] = round((datetime.now() - started).total_seconds(), 3)
+        return summary
@@ -0,0 +1,171 @@
+"""
+PG Pool: Pooled PostgreSQL connections with server-side prepared statements
+
+Named catalogued queries are PREPAREd once per pooled connection and then
+run with EXECUTE, so Postgres plans each long CTE query once per session
+instead of on every call.
+"""
+
+import hashlib
+import re
+import threading
+import config
+import metrics
+
+PARAMETER_PATTERN = re.compile(r'%\(([^)]+)\)s')
+STATEMENT_NAME_PATTERN = re.compile(r'[^a-z0-9_]')
+
+
+def to_prepared_sql(query):
+    """
+    Rewrite %(name)s placeholders to $n
+    Returns (sql, ordered parameter names)
+    """
+    order = []
+
+    def replace(match):
+        name = match.group(1)
+        if name not in order:
+            order.append(name)
+        return f"${order.index(name) + 1}"
+
+    return PARAMETER_PATTERN.sub(replace, query), order
+
+
+def statement_name(name, query):
+    """Stable statement name - changes if the query text changes (hot reload)"""
+    digest = hashlib.sha1(query.encode('utf-8')).hexdigest()[:10]
+    return f"{STATEMENT_NAME_PATTERN.sub('_', name.lower())}_{digest}"
+
+
+class PreparedQueryRunner:
+    def __init__(self, db_config=None, pool_config=None):
+        self.db_config = db_config or config.DB_CONFIG
+        self.pool_config = pool_config or config.PG_POOL_CONFIG
+        self._pool = None
+        self._pool_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self._prepared = {}    # (id(connection), backend pid) -> prepared statement names
+        self.stats = {
+            'executions': 0,
+            'prepares': 0,
+            'prepared_hits': 0,
+            'unprepared': 0
+        }
+
+    # ============================================================
+    # POOL
+    # ============================================================
+
+    @property
+    def pool(self):
+        if self._pool is None:
+            import psycopg2.pool
+            with self._pool_lock:
+                if self._pool is None:
+                    self._pool = psycopg2.pool.ThreadedConnectionPool(
+                        self.pool_config['min_connections'],
+                        self.pool_config['max_connections'],
+                        **self.db_config
+                    )
+        return self._pool
+
+    def get_connection(self):
+        conn = self.pool.getconn()
+        # Read-only queries; autocommit keeps PREPAREs out of transactions
+        if not conn.autocommit:
+            conn.autocommit = True
+        return conn
+
+    def _session_key(self, conn):
+        return (id(conn), conn.get_backend_pid())
+
+    def put_connection(self, conn, broken=False):
+        if broken:
+            self._prepared = {k: v for k, v in self._prepared.items() if k[0] != id(conn)}
+        self.pool.putconn(conn, close=broken)
+
+    def close(self):
+        if self._pool is not None:
+            self._pool.closeall()
+            self._pool = None
+            self._prepared.clear()
+
+    # ============================================================
+    # EXECUTE
+    # ============================================================
+
+    def _count(self, key):
+        with self._stats_lock:
+            self.stats[key] += 1
+
+    def execute(self, name, query, params, cursor_factory=None):
+        """
+        Run a named query; returns (rows, cursor.description)
+        Uses PREPARE/EXECUTE when enabled, plain execute otherwise
+        """
+        import psycopg2
+        conn = self.get_connection()
+        broken = False
+
+        try:
+            cursor = conn.cursor(cursor_factory=cursor_factory)
+            try:
+                with metrics.timer('pg_query_seconds', query=name):
+                    if self.pool_config['prepared_statements']:
+                        self._execute_prepared(conn, cursor, name, query, params)
+                    else:
+                        cursor.execute(query, params)
+                        self._count('unprepared')
+                    rows = cursor.fetchall()
+
+                self._count('executions')
+                metrics.inc('pg_query_rows_total', len(rows), query=name)
+                return rows, cursor.description
+            finally:
+                cursor.close()
+
+        except (psycopg2.OperationalError, psycopg2.InterfaceError):
+            broken = True
+            raise
+        finally:
+            self.put_connection(conn, broken)
+
+    def _execute_prepared(self, conn, cursor, name, query, params):
+        import psycopg2.errors
+        stmt = statement_name(name, query)
+        prepared = self._prepared.setdefault(self._session_key(conn), set())
+        sql, order = to_prepared_sql(query)
+
+        try:
+            self._prepare_and_execute(cursor, prepared, stmt, sql, order, params)
+        except psycopg2.errors.InvalidSqlStatementName:
+            # Session lost its statements (e.g. DISCARD ALL) - prepare again once
+            prepared.clear()
+            self._prepare_and_execute(cursor, prepared, stmt, sql, order, params)
+
+    def _prepare_and_execute(self, cursor, prepared, stmt, sql, order, params):
+        if stmt in prepared:
+            self._count('prepared_hits')
+            metrics.inc('cache_requests_total', cache='prepared_statements', result='hit')
+        else:
+            metrics.inc('cache_requests_total', cache='prepared_statements', result='miss')
+            types = [config.QUERY_PARAM_TYPES.get(p, 'unknown') for p in order]
+            type_list = f" ({', '.join(types)})" if types else ""
+            cursor.execute(f"PREPARE {stmt}{type_list} AS {sql}")
+            prepared.add(stmt)
+            self._count('prepares')
+
+        if order:
+            placeholders = ', '.join(['%s'] * len(order))
+            cursor.execute(f"EXECUTE {stmt} ({placeholders})", [params[p] for p in order])
+        else:
+            cursor.execute(f"EXECUTE {stmt}")
+
+    def hit_rate(self):
+        """Share of prepared executions that reused an existing plan"""
+        total = self.stats['prepares'] + self.stats['prepared_hits']
+        return self.stats['prepared_hits'] / total if total else 0.0
+
+    def stats_summary(self):
+        return {**self.stats, 'prepared_hit_rate': round(self.hit_rate(), 4)}
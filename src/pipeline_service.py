@@ -0,0 +1,414 @@
+"""
+Pipeline Service: Resident worker for scheduled sync and insights jobs
+
+One long-lived process keeps the Postgres pool (and its prepared
+statements), the parsed query catalog, the OpenAI client and the
+aggregates cache warm. Cron submits jobs to its local HTTP endpoint
+instead of starting sync_to_duckdb.py / run_all.py cold every time.
+Jobs run one at a time, in submission order.
+
+    python src/pipeline_service.py serve
+    python src/pipeline_service.py submit sync --wait
+    python src/pipeline_service.py submit insights --entity buyer --all --wait
+    python src/pipeline_service.py submit period_metrics --wait
+    python src/pipeline_service.py status [JOB_ID]
+
+Endpoints: GET /health, GET /jobs, GET /jobs/<id>, POST /jobs, GET /metrics
+"""
+
+import argparse
+import itertools
+import json
+import queue
+import sys
+import threading
+import time
+import traceback
+from collections import OrderedDict
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib import error as urlerror
+from urllib import request as urlrequest
+
+import config
+import metrics
+
+# Accepted parameters per job type (same meaning as the CLI flags)
+JOB_PARAMS = {
+    'sync': {'entity', 'workers', 'shards', 'export_parquet'},
+    'insights': {'entity', 'id', 'all', 'limit', 'days', 'start_date', 'end_date', 'top_n', 'no_screen', 'windows'},
+    'period_metrics': {'entity', 'rebuild'}
+}
+
+FINISHED = ('done', 'failed')
+
+
+class PipelineService:
+    def __init__(self):
+        self._pipeline = None
+        self._syncer = None
+        self._lock = threading.Lock()
+        self._ids = itertools.count(1)
+        self.jobs = OrderedDict()
+        self.queue = queue.Queue()
+        self.current_job = None
+        self.started_at = datetime.now()
+
+    # ============================================================
+    # WARM COMPONENTS
+    # ============================================================
+
+    @property
+    def pipeline(self):
+        if self._pipeline is None:
+            from run_all import DashboardPipeline
+            self._pipeline = DashboardPipeline()
+        return self._pipeline
+
+    @property
+    def syncer(self):
+        if self._syncer is None:
+            import sync_to_duckdb
+            sync_to_duckdb.setup_logging()
+            self._syncer = sync_to_duckdb.DuckDBSync()
+        return self._syncer
+
+    def warm_up(self):
+        """Import everything, parse queries and open the pool before the first job"""
+        started = time.perf_counter()
+        executor = self.pipeline.executor
+        for entity_type in ('buyer', 'seller'):
+            executor.catalog.dashboard_queries(entity_type)
+            executor.catalog.total_queries(entity_type)
+        self.pipeline.generator.client
+        self.syncer
+
+        try:
+            executor.runner.pool
+        except Exception as e:
+            print(f"⚠ Postgres pool not opened yet (will retry on first job): {e}")
+
+        print(f"✓ Components warm in {time.perf_counter() - started:.2f}s")
+
+    # ============================================================
+    # JOBS
+    # ============================================================
+
+    def submit(self, job_type, params=None):
+        """Queue a job; raises ValueError for unknown types or parameters"""
+        params = params or {}
+        if job_type not in JOB_PARAMS:
+            raise ValueError(f"Unknown job type '{job_type}' (expected one of: {', '.join(JOB_PARAMS)})")
+        unknown = set(params) - JOB_PARAMS[job_type]
+        if unknown:
+            raise ValueError(f"Unknown {job_type} parameter(s): {', '.join(sorted(unknown))}")
+        if job_type == 'insights':
+            if params.get('entity') not in ('buyer', 'seller'):
+                raise ValueError("insights jobs need entity 'buyer' or 'seller'")
+            if bool(params.get('id')) == bool(params.get('all')):
+                raise ValueError("insights jobs need exactly one of id or all")
+
+        job = {
+            'id': str(next(self._ids)),
+            'type': job_type,
+            'params': params,
+            'status': 'queued',
+            'submitted_at': datetime.now().isoformat(),
+            'started_at': None,
+            'finished_at': None,
+            'duration_s': None,
+            'result': None,
+            'error': None
+        }
+
+        with self._lock:
+            self.jobs[job['id']] = job
+            self._trim_history()
+        self.queue.put(job['id'])
+        metrics.inc('service_jobs_total', type=job_type, status='submitted')
+        return job
+
+    def _trim_history(self):
+        finished = [job_id for job_id, job in self.jobs.items() if job['status'] in FINISHED]
+        for job_id in finished[:max(0, len(self.jobs) - config.PIPELINE_SERVICE_CONFIG['job_history'])]:
+            del self.jobs[job_id]
+
+    def get_job(self, job_id):
+        with self._lock:
+            job = self.jobs.get(job_id)
+            return dict(job) if job else None
+
+    def list_jobs(self):
+        with self._lock:
+            return [dict(job) for job in self.jobs.values()]
+
+    def worker_loop(self):
+        """Run queued jobs one at a time (DuckDB has a single writer)"""
+        while True:
+            job_id = self.queue.get()
+            if job_id is None:
+                return
+            job = self.jobs[job_id]
+            self.current_job = job_id
+
+            job['status'] = 'running'
+            job['started_at'] = datetime.now().isoformat()
+            started = time.perf_counter()
+            print(f"\n▶ Job {job_id}: {job['type']} {json.dumps(job['params'])}")
+
+            try:
+                with metrics.timer('service_job_seconds', type=job['type']):
+                    job['result'] = self.run_job(job)
+                job['status'] = 'done'
+            except Exception as e:
+                job['status'] = 'failed'
+                job['error'] = str(e)
+                traceback.print_exc()
+
+            job['duration_s'] = round(time.perf_counter() - started, 3)
+            job['finished_at'] = datetime.now().isoformat()
+            self.current_job = None
+            metrics.inc('service_jobs_total', type=job['type'], status=job['status'])
+            print(f"{'✓' if job['status'] == 'done' else '✗'} Job {job_id} {job['status']} "
+                  f"in {job['duration_s']:.2f}s")
+
+    def run_job(self, job):
+        if job['type'] == 'sync':
+            return self.run_sync(**job['params'])
+        if job['type'] == 'period_metrics':
+            return self.run_period_metrics(**job['params'])
+        return self.run_insights(**job['params'])
+
+    def run_sync(self, entity=None, workers=None, shards=None, export_parquet=None):
+        results = self.syncer.sync(entity_type=entity, workers=workers, shards=shards,
+                                   export_parquet=export_parquet)
+
+        # New snapshot published - cached aggregates describe the old one
+        if self._pipeline is not None and self._pipeline._generator is not None:
+            self._pipeline.generator.clear_aggregates_cache()
+
+        if not any(results.values()):
+            raise RuntimeError("No entity type synced - previous snapshot kept")
+        return {'synced': results}
+
+    def run_period_metrics(self, entity='buyer', rebuild=False):
+        return self.pipeline.executor.period_metrics.refresh(entity, rebuild=rebuild)
+
+    def run_insights(self, entity, id=None, all=False, limit=None, days=None,
+                     start_date=None, end_date=None, top_n=None, no_screen=False, windows=None):
+        from run_all import build_params, build_window_params
+
+        pipeline = self.pipeline
+        pipeline.reset_stats()
+        start_time = datetime.now()
+
+        if windows is not None:
+            window_params = build_window_params(
+                entity, windows or config.MULTI_WINDOW_CONFIG['windows'], end_date, top_n
+            )
+            pipeline.run_multi_window(entity, window_params, id, limit)
+        else:
+            params = build_params(entity, days, start_date, end_date, top_n)
+            if id:
+                pipeline.run_for_single_entity(entity, id, params)
+            else:
+                pipeline.run_for_all_entities(entity, params, limit, screen=False if no_screen else None)
+        pipeline.print_summary(start_time)
+
+        stats = pipeline.stats
+        if stats['errors'] and not stats['insights_generated']:
+            error_type, entity_id, message = stats['errors'][0]
+            raise RuntimeError(f"[{error_type}] {entity_id}: {message}")
+
+        return {
+            'queries_executed': stats['queries_executed'],
+            'insights_generated': stats['insights_generated'],
+            'screened_out': stats['screened_out'],
+            'errors': len(stats['errors'])
+        }
+
+
+# ============================================================
+# HTTP ENDPOINT
+# ============================================================
+
+class ServiceHandler(BaseHTTPRequestHandler):
+    service = None
+
+    def _send(self, status, payload, content_type='application/json'):
+        body = payload if isinstance(payload, str) else json.dumps(payload, default=str)
+        body = body.encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        path = self.path.split('?')[0].rstrip('/')
+
+        if path in ('', '/health'):
+            self._send(200, {
+                'status': 'ok',
+                'started_at': self.service.started_at.isoformat(),
+                'queued': self.service.queue.qsize(),
+                'running': self.service.current_job
+            })
+        elif path == '/jobs':
+            self._send(200, self.service.list_jobs())
+        elif path.startswith('/jobs/'):
+            job = self.service.get_job(path[len('/jobs/'):])
+            if job:
+                self._send(200, job)
+            else:
+                self._send(404, {'detail': 'Job not found'})
+        elif path == '/metrics':
+            self._send(200, metrics.registry.render_prometheus(), 'text/plain; version=0.0.4')
+        else:
+            self._send(404, {'detail': 'Not found'})
+
+    def do_POST(self):
+        if self.path.split('?')[0].rstrip('/') != '/jobs':
+            self._send(404, {'detail': 'Not found'})
+            return
+
+        try:
+            body = json.loads(self.rfile.read(int(self.headers.get('Content-Length', 0))) or b'{}')
+            job = self.service.submit(body.get('type'), body.get('params'))
+        except (ValueError, AttributeError) as e:
+            self._send(400, {'detail': str(e)})
+            return
+        self._send(202, job)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def serve(host=None, port=None, warm=True):
+    service_config = config.PIPELINE_SERVICE_CONFIG
+    host = host or service_config['host']
+    port = port or service_config['port']
+
+    service = PipelineService()
+    if warm:
+        service.warm_up()
+
+    handler = type('BoundServiceHandler', (ServiceHandler,), {'service': service})
+    server = ThreadingHTTPServer((host, port), handler)
+    worker = threading.Thread(target=service.worker_loop, daemon=True)
+    worker.start()
+
+    print(f"✓ Pipeline service listening on http://{host}:{port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\nShutting down (running job is abandoned)")
+    finally:
+        server.server_close()
+        service.queue.put(None)
+
+
+# ============================================================
+# CLIENT (for cron)
+# ============================================================
+
+def call(method, path, payload=None, host=None, port=None, timeout=30):
+    """(status, decoded JSON) from the service"""
+    service_config = config.PIPELINE_SERVICE_CONFIG
+    url = f"http://{host or service_config['host']}:{port or service_config['port']}{path}"
+    data = json.dumps(payload).encode('utf-8') if payload is not None else None
+    req = urlrequest.Request(url, data=data, method=method, headers={'Content-Type': 'application/json'})
+    try:
+        with urlrequest.urlopen(req, timeout=timeout) as response:
+            return response.status, json.loads(response.read())
+    except urlerror.HTTPError as e:
+        return e.code, json.loads(e.read() or b'{}')
+
+
+def submit_job(job_type, params, wait=False, host=None, port=None):
+    """Submit a job; with wait=True poll until it finishes. Returns the job."""
+    status, job = call('POST', '/jobs', {'type': job_type, 'params': params}, host, port)
+    if status != 202:
+        raise ValueError(job.get('detail', f"HTTP {status}"))
+
+    delay = 0.05
+    while wait and job['status'] not in FINISHED:
+        time.sleep(delay)
+        delay = min(delay * 2, config.PIPELINE_SERVICE_CONFIG['poll_seconds'])
+        _, job = call('GET', f"/jobs/{job['id']}", host=host, port=port)
+    return job
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Resident pipeline service and its job client',
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Example crontab (service started once, e.g. by systemd):
+  0 2 * * *  python src/pipeline_service.py submit sync --wait
+  30 2 * * * python src/pipeline_service.py submit insights --entity buyer --all --wait
+  45 2 * * * python src/pipeline_service.py submit insights --entity seller --all --wait
+  5 * * * *  python src/pipeline_service.py submit period_metrics --wait
+        """
+    )
+    parser.add_argument('--host', help=f"Default {config.PIPELINE_SERVICE_CONFIG['host']}")
+    parser.add_argument('--port', type=int, help=f"Default {config.PIPELINE_SERVICE_CONFIG['port']}")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    serve_parser = commands.add_parser('serve', help='Run the service in the foreground')
+    serve_parser.add_argument('--no-warm', action='store_true', help='Skip warm-up (components load on first job)')
+
+    submit_parser = commands.add_parser('submit', help='Queue a job')
+    submit_parser.add_argument('type', choices=sorted(JOB_PARAMS))
+    submit_parser.add_argument('--entity', choices=['buyer', 'seller'])
+    submit_parser.add_argument('--id', type=int, help='insights: single entity')
+    submit_parser.add_argument('--all', action='store_true', help='insights: all active entities')
+    submit_parser.add_argument('--limit', type=int, help='insights: limit with --all')
+    submit_parser.add_argument('--days', type=int, help='insights: days back from today')
+    submit_parser.add_argument('--start-date', help='insights: YYYY-MM-DD')
+    submit_parser.add_argument('--end-date', help='insights: YYYY-MM-DD')
+    submit_parser.add_argument('--top-n', type=int, help='insights: top items in rankings')
+    submit_parser.add_argument('--no-screen', action='store_true', help='insights: skip change screening')
+    submit_parser.add_argument('--windows', type=int, nargs='*', help='insights: window lengths compared in one run')
+    submit_parser.add_argument('--workers', type=int, help='sync: query worker processes')
+    submit_parser.add_argument('--shards', type=int, help='sync: entity-ID range shards')
+    submit_parser.add_argument('--export-parquet', action='store_true', help='sync: Parquet export afterwards')
+    submit_parser.add_argument('--rebuild', action='store_true', help='period_metrics: re-pull all retained days')
+    submit_parser.add_argument('--wait', action='store_true', help='Block until the job finishes (exit 1 if it failed)')
+
+    status_parser = commands.add_parser('status', help='Show one job, or all recent jobs')
+    status_parser.add_argument('job_id', nargs='?')
+
+    args = parser.parse_args()
+
+    if args.command == 'serve':
+        metrics.enable_structured_log()
+        serve(args.host, args.port, warm=not args.no_warm)
+        return
+
+    try:
+        if args.command == 'status':
+            path = f"/jobs/{args.job_id}" if args.job_id else '/jobs'
+            status, payload = call('GET', path, host=args.host, port=args.port)
+            print(json.dumps(payload, indent=2))
+            sys.exit(0 if status == 200 else 1)
+
+        params = {
+            key: getattr(args, key) for key in JOB_PARAMS[args.type]
+            if getattr(args, key) not in (None, False)
+        }
+        job = submit_job(args.type, params, wait=args.wait, host=args.host, port=args.port)
+    except urlerror.URLError as e:
+        print(f"✗ Pipeline service not reachable: {e.reason}")
+        sys.exit(2)
+    except ValueError as e:
+        print(f"✗ {e}")
+        sys.exit(1)
+
+    print(json.dumps(job, indent=2))
+    if job['status'] == 'failed':
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,156 @@
+"""
+Query Catalog: Parse-once cache of the named SQL queries
+
+Each SQL file is parsed once and cached by (mtime, size) with a content
+hash as tie-breaker, so executors stop re-reading and re-parsing the same
+file for every entity. Files are re-checked on access, so edits are picked
+up without a restart (hot reload).
+"""
+
+import hashlib
+import os
+import threading
+import config
+import metrics
+from query_parser import QueryParser
+
+
+class QueryCatalog:
+    def __init__(self, parser=None):
+        self.parser = parser or QueryParser()
+        self._entries = {}
+        self._lock = threading.Lock()
+        self.stats = {'hits': 0, 'parses': 0, 'reloads': 0}
+
+    # ============================================================
+    # PATHS
+    # ============================================================
+
+    def dashboard_query_path(self, entity_type):
+        return os.path.join(
+            config.DASHBOARD_QUERIES_DIR, entity_type, config.DASHBOARD_QUERY_FILES[entity_type]
+        )
+
+    def total_query_path(self, entity_type):
+        return os.path.join(
+            config.TOTAL_QUERIES_DIR, entity_type, config.TOTAL_QUERY_FILES[entity_type]
+        )
+
+    # ============================================================
+    # LOOKUP
+    # ============================================================
+
+    def dashboard_queries(self, entity_type):
+        return self.get_queries(self.dashboard_query_path(entity_type), entity_type)
+
+    def total_queries(self, entity_type):
+        return self.get_queries(self.total_query_path(entity_type), entity_type)
+
+    def get_query(self, filepath, name, entity_type=None):
+        """Single catalogued query by name, or None"""
+        for query in self.get_queries(filepath, entity_type):
+            if query['name'] == name:
+                return query
+        return None
+
+    def get_queries(self, filepath, entity_type=None):
+        """
+        Catalogued queries for a SQL file: list of
+        {name, description, query, parameters, entity_id_col, type}
+        """
+        stat = os.stat(filepath)
+        signature = (stat.st_mtime_ns, stat.st_size)
+
+        entry = self._entries.get(filepath)
+        if entry and entry['signature'] == signature:
+            self.stats['hits'] += 1
+            metrics.inc('cache_requests_total', cache='query_catalog', result='hit')
+            return entry['queries']
+
+        with self._lock:
+            entry = self._entries.get(filepath)
+            if entry and entry['signature'] == signature:
+                self.stats['hits'] += 1
+                metrics.inc('cache_requests_total', cache='query_catalog', result='hit')
+                return entry['queries']
+            metrics.inc('cache_requests_total', cache='query_catalog', result='miss')
+            return self._load(filepath, entity_type, signature, entry)
+
+    def _load(self, filepath, entity_type, signature, previous):
+        with open(filepath, 'rb') as f:
+            content = f.read()
+        digest = hashlib.sha256(content).hexdigest()
+
+        # Touched but unchanged (e.g. checkout) - keep the parsed queries
+        if previous and previous['sha256'] == digest:
+            previous['signature'] = signature
+            self.stats['hits'] += 1
+            return previous['queries']
+
+        queries = self.parser.parse_text(content.decode('utf-8'))
+        for query in queries:
+            self._annotate(query, entity_type)
+
+        self._entries[filepath] = {
+            'signature': signature,
+            'sha256': digest,
+            'entity_type': entity_type,
+            'queries': queries
+        }
+
+        if previous:
+            self.stats['reloads'] += 1
+            print(f"↻ Reloaded {len(queries)} queries from: {filepath}")
+        else:
+            self.stats['parses'] += 1
+            print(f"Loaded {len(queries)} queries from: {filepath}")
+
+        return queries
+
+    def _annotate(self, query, entity_type):
+        """Attach declared parameters and registry metadata"""
+        query['parameters'] = sorted(self.parser.extract_parameters(query['query']))
+
+        registry = config.QUERY_REGISTRY.get(entity_type, {})
+        registered = registry.get('queries', {}).get(query['name'], {})
+        query['entity_id_col'] = registered.get(
+            'entity_id_col', registry.get('entity_id_col')
+        )
+        query['type'] = registered.get('type', 'unregistered')
+
+    # ============================================================
+    # HOT RELOAD
+    # ============================================================
+
+    def reload_if_changed(self):
+        """Re-parse any catalogued file that changed on disk; returns reloaded paths"""
+        reloaded = []
+        for filepath, entry in list(self._entries.items()):
+            try:
+                before = entry['sha256']
+                self.get_queries(filepath, entry['entity_type'])
+                if self._entries[filepath]['sha256'] != before:
+                    reloaded.append(filepath)
+            except FileNotFoundError:
+                with self._lock:
+                    self._entries.pop(filepath, None)
+        return reloaded
+
+    def invalidate(self, filepath=None):
+        """Drop one cached file (or all) so the next access re-parses"""
+        with self._lock:
+            if filepath:
+                self._entries.pop(filepath, None)
+            else:
+                self._entries.clear()
+
+
+_catalog = None
+
+
+def get_catalog():
+    """Process-wide shared catalog"""
+    global _catalog
+    if _catalog is None:
+        _catalog = QueryCatalog()
+    return _catalog
@@ -2,20 +2,20 @@
 Query Executor: Runs SQL queries from combined files and saves raw results
 """
 
-import psycopg2
-import psycopg2.extras
 import json
 import os
 import argparse
 from datetime import datetime
 from pathlib import Path
 import config
-from query_parser import QueryParser
+from query_catalog import get_catalog
+import row_convert
 
 class QueryExecutor:
     def __init__(self, db_config=None):
         self.db_config = db_config or config.DB_CONFIG
-        self.parser = QueryParser()
+        self.catalog = get_catalog()
+        self.discovery = None
         
         # Ensure data directories exist
         os.makedirs(config.RAW_DATA_DIR, exist_ok=True)
@@ -23,52 +23,22 @@ class QueryExecutor:
     
     def get_connection(self):
         """Create database connection"""
+        import psycopg2
         return psycopg2.connect(**self.db_config)
     
     def get_entity_ids(self, entity_type):
-        """Get all IDs for a given entity type - ONLY ACTIVE ONES"""
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        
-        # Get date range from default params
-        params = config.DEFAULT_PARAMS[entity_type]
-        start_date = params['start_date']
-        end_date = params['end_date']
-        
-        if entity_type == 'buyer':
-            query = f"""
-            SELECT DISTINCT pd.buyer_org_id 
-            FROM po_details pd
-            JOIN po_items pi ON pd.id = pi.po_id
-            WHERE pd.buyer_org_id IS NOT NULL
-              AND pi.updated_date BETWEEN '{start_date}' AND '{end_date}'
-            ORDER BY pd.buyer_org_id
-            """
-        else:  # seller
-            query = f"""
-            SELECT DISTINCT pd.seller_org_id 
-            FROM po_details pd
-            JOIN po_items pi ON pd.id = pi.po_id
-            WHERE pd.seller_org_id IS NOT NULL
-              AND pi.created_date BETWEEN '{start_date}' AND '{end_date}'
-            ORDER BY pd.seller_org_id
-            """
-        
-        cursor.execute(query)
-        ids = [row[0] for row in cursor.fetchall()]
-        
-        cursor.close()
-        conn.close()
-        
-        return ids
+        """Get all IDs for a given entity type - ONLY ACTIVE ONES (default period, cached)"""
+        if self.discovery is None:
+            from entity_discovery import EntityDiscovery
+            self.discovery = EntityDiscovery(db_config=self.db_config)
+        return self.discovery.active_entity_ids(entity_type, config.default_params(entity_type))
     
     def load_queries_from_file(self, entity_type):
         """Load and parse all queries from combined SQL file"""
         query_file = config.QUERY_FILES[entity_type]
         query_path = os.path.join(config.QUERIES_DIR, entity_type, query_file)
         
-        print(f"Loading queries from: {query_path}")
-        queries = self.parser.parse_file(query_path)
+        queries = self.catalog.get_queries(query_path, entity_type)
         print(f"Found {len(queries)} queries: {[q['name'] for q in queries]}")
         
         return queries
@@ -76,27 +46,15 @@ class QueryExecutor:
     def execute_query(self, query, params):
         """Execute query with parameters and return results"""
         conn = self.get_connection()
-        cursor = conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor)
+        cursor = conn.cursor()
         
         try:
             cursor.execute(query, params)
             results = cursor.fetchall()
             
-            # Convert to list of dicts and handle Decimal/datetime serialization
-            results_list = []
-            for row in results:
-                row_dict = dict(row)
-                # Convert any non-serializable types
-                for key, value in row_dict.items():
-                    if hasattr(value, 'isoformat'):
-                        row_dict[key] = value.isoformat()
-                    elif isinstance(value, (int, float, str, bool, type(None))):
-                        pass  # Already serializable
-                    else:
-                        row_dict[key] = str(value)
-                results_list.append(row_dict)
-            
-            return results_list
+            # Per-column conversion of Decimal/datetime (see row_convert.py)
+            columns, rows = row_convert.convert_rows(cursor.description, results)
+            return row_convert.rows_to_dicts(columns, rows)
         except Exception as e:
             print(f"Error executing query: {e}")
             raise
@@ -107,7 +65,7 @@ class QueryExecutor:
     def execute_all_queries_for_entity(self, entity_type, entity_id, params=None):
         """Execute all queries for a specific entity and return combined results"""
         if params is None:
-            params = config.DEFAULT_PARAMS[entity_type].copy()
+            params = config.default_params(entity_type)
         
         results = {
             'entity_type': entity_type,
@@ -213,7 +171,7 @@ def main():
     args = parser.parse_args()
     
     # Build parameters
-    params = config.DEFAULT_PARAMS[args.entity].copy()
+    params = config.default_params(args.entity)
     if args.start_date:
         params['start_date'] = args.start_date
     if args.end_date:
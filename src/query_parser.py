@@ -4,6 +4,11 @@ Query Parser: Extract and label individual queries from multi-query SQL files
 
 import re
 
+# Compiled once at import - parse_text runs these on every line
+NAME_PATTERN = re.compile(r'--\s*@name:\s*(.+)', re.IGNORECASE)
+DESCRIPTION_PATTERN = re.compile(r'--\s*@description:\s*(.+)', re.IGNORECASE)
+PARAMETER_PATTERN = re.compile(r'%\(([^)]+)\)')
+
 class QueryParser:
     def __init__(self):
         self.query_separator = ';'
@@ -16,6 +21,10 @@ class QueryParser:
         with open(filepath, 'r') as f:
             content = f.read()
         
+        return self.parse_text(content)
+    
+    def parse_text(self, content):
+        """Parse multi-query SQL text (see parse_file)"""
         queries = []
         current_query = []
         current_name = None
@@ -24,17 +33,18 @@ class QueryParser:
         for line in content.split('\n'):
             stripped = line.strip()
             
-            # Check for query name marker (-- @name: query_name)
-            name_match = re.match(r'--\s*@name:\s*(.+)', stripped, re.IGNORECASE)
-            if name_match:
-                current_name = name_match.group(1).strip()
-                continue
-            
-            # Check for query description (-- @description: text)
-            desc_match = re.match(r'--\s*@description:\s*(.+)', stripped, re.IGNORECASE)
-            if desc_match:
-                current_description = desc_match.group(1).strip()
-                continue
+            if stripped.startswith('--'):
+                # Check for query name marker (-- @name: query_name)
+                name_match = NAME_PATTERN.match(stripped)
+                if name_match:
+                    current_name = name_match.group(1).strip()
+                    continue
+                
+                # Check for query description (-- @description: text)
+                desc_match = DESCRIPTION_PATTERN.match(stripped)
+                if desc_match:
+                    current_description = desc_match.group(1).strip()
+                    continue
             
             # Collect query lines
             current_query.append(line)
@@ -65,5 +75,5 @@ class QueryParser:
     def extract_parameters(self, query):
         """Extract parameter placeholders from query"""
         # Find all %(param_name)s patterns
-        params = re.findall(r'%\(([^)]+)\)', query)
-        return list(set(params))  # Remove duplicates
\ No newline at end of file
+        params = PARAMETER_PATTERN.findall(query)
+        return list(set(params))  # Remove duplicates
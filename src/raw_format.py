@@ -0,0 +1,168 @@
+"""
+Raw Format: Compact column-oriented encoding for dashboard raw data
+
+Layout (format 'columnar-v1'):
+    {
+      "format": "columnar-v1",
+      "entity_type": ..., "entity_id": ..., "entity_id_col": "vendor_id",
+      "execution_timestamp": ..., "parameters": {...},
+      "queries": {
+        "<name>": {
+          "description": ...,
+          "result_count": 12,
+          "columns": {"month": ["2025-01", ...], "total_sales": [125353971.89, ...]}
+        }
+      }
+    }
+
+The entity ID column is constant within a file, so it is stored once at the
+top level instead of per row. Numerics stay numeric (no stringified Decimals).
+
+Multi-window documents (run_all --windows) have empty top-level "queries",
+"parameters" of the longest window plus "windows": [30, 90, ...], and
+"windows": {"30": {"parameters": {...}, "queries": {...}}, ...} with each
+window's queries in the layout above.
+"""
+
+import gzip
+import json
+from datetime import date, datetime
+from decimal import Decimal
+import config
+import metrics
+
+RAW_FORMAT_VERSION = 'columnar-v1'
+
+COMPACT_SEPARATORS = (',', ':')
+
+
+def to_serializable(value):
+    """JSON-native representation of a DB value, keeping numerics numeric"""
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, (date, datetime)) or hasattr(value, 'isoformat'):
+        return value.isoformat()
+    return str(value)
+
+
+def encode_rows(rows, drop_columns=()):
+    """List of row dicts -> {column: [values]} (column names stored once)"""
+    if not rows:
+        return {}
+    names = [name for name in rows[0].keys() if name not in drop_columns]
+    return {name: [row.get(name) for row in rows] for name in names}
+
+
+def decode_columns(columns, entity_id_col=None, entity_id=None):
+    """{column: [values]} -> list of row dicts (re-adding the entity ID column)"""
+    if not columns:
+        return []
+    names = list(columns.keys())
+    rows = [dict(zip(names, values)) for values in zip(*columns.values())]
+    if entity_id_col:
+        for row in rows:
+            row[entity_id_col] = entity_id
+    return rows
+
+
+def encode_dashboard(results, entity_id_col):
+    """Row-oriented execute_for_entity results -> columnar document"""
+    encoded = {
+        'format': RAW_FORMAT_VERSION,
+        'entity_type': results['entity_type'],
+        'entity_id': results['entity_id'],
+        'entity_id_col': entity_id_col,
+        'execution_timestamp': results['execution_timestamp'],
+        'parameters': results['parameters'],
+        'queries': {}
+    }
+
+    for name, query in results['queries'].items():
+        block = {
+            'description': query.get('description'),
+            'result_count': query.get('result_count', len(query.get('data', []))),
+            'columns': encode_rows(query.get('data', []), drop_columns=(entity_id_col,))
+        }
+        if 'error' in query:
+            block['error'] = query['error']
+        encoded['queries'][name] = block
+
+    return encoded
+
+
+def encode_windows(results, entity_id_col):
+    """execute_windows results of one entity -> columnar multi-window document"""
+    encoded = encode_dashboard({**results, 'queries': {}}, entity_id_col)
+    encoded['windows'] = {}
+    for days, window in results['windows'].items():
+        block = encode_dashboard({**results, **window}, entity_id_col)
+        encoded['windows'][str(days)] = {'parameters': block['parameters'], 'queries': block['queries']}
+    return encoded
+
+
+def query_rows(document, query_name):
+    """Rows for one query of a loaded (columnar) document"""
+    block = document['queries'].get(query_name) or {}
+    return decode_columns(
+        block.get('columns'),
+        document.get('entity_id_col'),
+        document.get('entity_id')
+    )
+
+
+def raw_extension(compress=None):
+    if compress is None:
+        compress = config.RAW_DATA_FORMAT['compress']
+    return '.json.gz' if compress else '.json'
+
+
+def period_tag(parameters):
+    """
+    Filename tag of a run's period by window length, not dates, so rolling
+    runs on different days share it: '90d', or '30-90-365d' for multi-window
+    """
+    windows = parameters.get('windows')
+    if windows:
+        return '-'.join(str(days) for days in sorted(windows)) + 'd'
+    start, end = parameters.get('start_date'), parameters.get('end_date')
+    if not (start and end):
+        return None
+    days = (date.fromisoformat(str(end)[:10]) - date.fromisoformat(str(start)[:10])).days
+    return f"{days}d"
+
+
+def save_dashboard(document, filepath):
+    """Write compact JSON, gzipped when the path ends in .gz"""
+    with metrics.timer('file_io_seconds', op='write_raw'):
+        payload = json.dumps(document, separators=COMPACT_SEPARATORS).encode('utf-8')
+        if filepath.endswith('.gz'):
+            with gzip.open(filepath, 'wb', compresslevel=config.RAW_DATA_FORMAT['compress_level']) as f:
+                f.write(payload)
+        else:
+            with open(filepath, 'wb') as f:
+                f.write(payload)
+    metrics.inc('file_io_bytes_total', len(payload), op='write_raw')
+    return filepath
+
+
+def load_dashboard(filepath):
+    """
+    Load any dashboard raw file (columnar or legacy row-oriented,
+    plain or gzipped) and return it in columnar form
+    """
+    opener = gzip.open if str(filepath).endswith('.gz') else open
+    with metrics.timer('file_io_seconds', op='read_raw'):
+        with opener(filepath, 'rb') as f:
+            payload = f.read()
+        document = json.loads(payload)
+    metrics.inc('file_io_bytes_total', len(payload), op='read_raw')
+
+    if document.get('format') == RAW_FORMAT_VERSION:
+        return document
+
+    # Legacy row-oriented file (stringified decimals are left as-is)
+    entity_type = document['entity_type']
+    id_col = config.QUERY_REGISTRY[entity_type]['entity_id_col']
+    return encode_dashboard(document, id_col)
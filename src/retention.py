@@ -0,0 +1,214 @@
+"""
+Retention: Keep the latest N dashboard snapshots per (entity, period)
+and pack older raw/processed files into compressed monthly archives
+
+The period is the window length (see raw_format.period_tag), not the
+dates: rolling runs end on a new day every night, and keeping N per date
+range would never archive anything. The tag is read from the filename;
+only files written before it was added are opened.
+"""
+
+import argparse
+import gzip
+import json
+import os
+import re
+import time
+import zipfile
+from collections import defaultdict
+from datetime import datetime
+import config
+import raw_format
+
+# buyer_91_dashboard_20260217_163228_90d.json(.gz) / buyer_91_insights_20260217_163259_30-90-365d.json
+# (no period tag on files written before it was added)
+FILENAME_PATTERN = re.compile(
+    r'^(?P<entity_type>buyer|seller)_(?P<entity_id>\d+)_(?P<kind>dashboard|insights)_'
+    r'(?P<timestamp>\d{8}_\d{6})(?:_(?P<period>\d+(?:-\d+)*d))?\.json(?:\.gz)?$'
+)
+
+KIND_DIRS = {
+    'raw': config.DASHBOARD_RAW_DIR,
+    'processed': config.DASHBOARD_PROCESSED_DIR
+}
+
+
+class RetentionManager:
+    def __init__(self, keep_latest=None, archive_dir=None, dry_run=False):
+        self.keep_latest = config.RETENTION_CONFIG['keep_latest'] if keep_latest is None else keep_latest
+        self.archive_dir = archive_dir or config.RETENTION_CONFIG['archive_dir']
+        self.dry_run = dry_run
+
+        if self.keep_latest < 1:
+            raise ValueError("keep_latest must be at least 1")
+
+    # ============================================================
+    # SCAN
+    # ============================================================
+
+    def scan(self, kind):
+        """Group snapshot files by entity: {(entity_type, entity_id): [(timestamp, period, path)]}"""
+        groups = defaultdict(list)
+        directory = KIND_DIRS[kind]
+
+        if not os.path.isdir(directory):
+            return groups
+
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                match = FILENAME_PATTERN.match(entry.name)
+                if not match:
+                    continue
+                key = (match.group('entity_type'), int(match.group('entity_id')))
+                groups[key].append((match.group('timestamp'), match.group('period'), entry.path))
+
+        return groups
+
+    def read_period(self, path):
+        """Period tag of an untagged (older) snapshot, from its parameters"""
+        opener = gzip.open if path.endswith('.gz') else open
+        try:
+            with opener(path, 'rb') as f:
+                data = json.loads(f.read())
+        except (OSError, ValueError):
+            return None
+
+        return raw_format.period_tag(data.get('parameters') or data.get('dashboard_period') or {})
+
+    def select_expired(self, kind):
+        """Files beyond the latest N per (entity, period)"""
+        expired = []
+
+        for (entity_type, entity_id), files in self.scan(kind).items():
+            # Entities with few snapshots can't have anything to prune
+            if len(files) <= self.keep_latest:
+                continue
+
+            by_period = defaultdict(list)
+            for timestamp, period, path in files:
+                by_period[period or self.read_period(path)].append((timestamp, path))
+
+            for snapshots in by_period.values():
+                snapshots.sort(reverse=True)
+                expired.extend(
+                    (entity_type, timestamp, path)
+                    for timestamp, path in snapshots[self.keep_latest:]
+                )
+
+        return expired
+
+    # ============================================================
+    # ARCHIVE
+    # ============================================================
+
+    def archive_path(self, kind, entity_type, timestamp):
+        """One zip per kind / entity type / month, e.g. archive/raw/buyer_202602.zip"""
+        return os.path.join(self.archive_dir, kind, f"{entity_type}_{timestamp[:6]}.zip")
+
+    def archive_files(self, kind, expired):
+        """Append expired files to their monthly archive, then delete them"""
+        by_archive = defaultdict(list)
+        for entity_type, timestamp, path in expired:
+            by_archive[self.archive_path(kind, entity_type, timestamp)].append(path)
+
+        archived = 0
+        for archive, paths in by_archive.items():
+            if self.dry_run:
+                print(f"  [dry-run] {len(paths)} file(s) -> {archive}")
+                archived += len(paths)
+                continue
+
+            os.makedirs(os.path.dirname(archive), exist_ok=True)
+            with zipfile.ZipFile(archive, 'a') as zf:
+                existing = set(zf.namelist())
+                for path in paths:
+                    name = os.path.basename(path)
+                    if name not in existing:
+                        # Raw snapshots are usually gzipped already
+                        compression = zipfile.ZIP_STORED if name.endswith('.gz') else zipfile.ZIP_DEFLATED
+                        zf.write(path, arcname=name, compress_type=compression)
+
+            # Only remove originals once the archive is closed cleanly
+            for path in paths:
+                os.remove(path)
+            archived += len(paths)
+
+            print(f"  ✓ {len(paths)} file(s) -> {archive}")
+
+        return archived
+
+    # ============================================================
+    # RUN
+    # ============================================================
+
+    def run(self, kinds=None):
+        """Apply retention to raw and/or processed directories"""
+        kinds = kinds or ['raw', 'processed']
+        results = {}
+
+        print(f"\n{'='*60}")
+        print(f"RETENTION{' (DRY RUN)' if self.dry_run else ''}")
+        print(f"{'='*60}")
+        print(f"Keep latest: {self.keep_latest} per (entity, period)")
+        print(f"Archive dir: {self.archive_dir}")
+
+        for kind in kinds:
+            expired = self.select_expired(kind)
+            print(f"\n{kind}: {len(expired)} file(s) to archive")
+            results[kind] = self.archive_files(kind, expired) if expired else 0
+
+        print(f"{'='*60}\n")
+        return results
+
+    def run_scheduled(self, interval_hours=None, kinds=None):
+        """Run retention forever at a fixed interval"""
+        interval_hours = interval_hours or config.RETENTION_CONFIG['schedule_interval_hours']
+
+        while True:
+            started = datetime.now()
+            try:
+                self.run(kinds)
+            except Exception as e:
+                print(f"✗ Retention run failed: {e}")
+            print(f"Next run in {interval_hours}h (last started {started.strftime('%Y-%m-%d %H:%M:%S')})")
+            time.sleep(interval_hours * 3600)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Prune and archive old dashboard raw/processed snapshots',
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  # Preview what would be archived
+  python src/retention.py --dry-run
+
+  # Keep the latest 5 snapshots per entity/period, raw files only
+  python src/retention.py --keep 5 --kind raw
+
+  # Run every 24h (or use cron with the default one-shot mode)
+  python src/retention.py --schedule --interval-hours 24
+        """
+    )
+    parser.add_argument('--keep', type=int, help='Snapshots to keep per (entity, period). Default from config.')
+    parser.add_argument('--kind', choices=['raw', 'processed', 'all'], default='all',
+                       help='Which directory to prune')
+    parser.add_argument('--archive-dir', help='Archive directory. Default from config.')
+    parser.add_argument('--dry-run', action='store_true', help='Show what would be archived')
+    parser.add_argument('--schedule', action='store_true', help='Keep running at a fixed interval')
+    parser.add_argument('--interval-hours', type=float, help='Interval for --schedule. Default from config.')
+    args = parser.parse_args()
+    if args.keep is not None and args.keep < 1:
+        parser.error("--keep must be at least 1")
+
+    kinds = ['raw', 'processed'] if args.kind == 'all' else [args.kind]
+    manager = RetentionManager(args.keep, args.archive_dir, args.dry_run)
+
+    if args.schedule:
+        manager.run_scheduled(args.interval_hours, kinds)
+    else:
+        manager.run(kinds)
+
+
+if __name__ == '__main__':
+    main()
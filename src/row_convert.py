@@ -0,0 +1,115 @@
+"""
+Row Convert: Shared conversion of PostgreSQL query results
+
+Converters are resolved once per column from cursor.description type OIDs,
+so per-row work is limited to the columns that actually need converting
+(NUMERIC -> float, dates/timestamps -> ISO strings). Integer, float, text,
+bool and json columns are passed through untouched. Results are tuples or
+column arrays; dicts are only built where a caller needs them.
+"""
+
+from raw_format import to_serializable
+import metrics
+
+# PostgreSQL type OIDs (pg_type.oid)
+BOOL_OID = 16
+INT8_OID, INT2_OID, INT4_OID, OID_OID = 20, 21, 23, 26
+TEXT_OID, BPCHAR_OID, VARCHAR_OID, NAME_OID = 25, 1042, 1043, 19
+FLOAT4_OID, FLOAT8_OID = 700, 701
+JSON_OID, JSONB_OID = 114, 3802
+NUMERIC_OID = 1700
+DATE_OID, TIME_OID, TIMESTAMP_OID, TIMESTAMPTZ_OID, TIMETZ_OID = 1082, 1083, 1114, 1184, 1266
+INTERVAL_OID = 1186
+
+# Already JSON-native as returned by psycopg2 - no per-cell work
+PASSTHROUGH_OIDS = {
+    BOOL_OID, INT8_OID, INT2_OID, INT4_OID, OID_OID,
+    TEXT_OID, BPCHAR_OID, VARCHAR_OID, NAME_OID,
+    FLOAT4_OID, FLOAT8_OID, JSON_OID, JSONB_OID
+}
+
+
+def _isoformat(value):
+    return value.isoformat()
+
+
+CONVERTERS = {
+    NUMERIC_OID: float,
+    DATE_OID: _isoformat,
+    TIME_OID: _isoformat,
+    TIMETZ_OID: _isoformat,
+    TIMESTAMP_OID: _isoformat,
+    TIMESTAMPTZ_OID: _isoformat,
+    INTERVAL_OID: str
+}
+
+
+def column_names(description):
+    return [desc[0] for desc in description]
+
+
+def column_converters(description):
+    """One converter per column (None = pass through), resolved from type OIDs"""
+    converters = []
+    for desc in description:
+        type_code = desc[1]
+        if type_code in PASSTHROUGH_OIDS:
+            converters.append(None)
+        else:
+            # Unknown types fall back to the generic (per-value) conversion
+            converters.append(CONVERTERS.get(type_code, to_serializable))
+    return converters
+
+
+def convert_rows(description, rows):
+    """
+    Raw cursor rows -> (column names, list of tuples)
+    Only columns with a converter are touched
+    """
+    columns = column_names(description)
+    active = [(i, f) for i, f in enumerate(column_converters(description)) if f is not None]
+
+    with metrics.timer('row_conversion_seconds'):
+        if not active:
+            return columns, [tuple(row) for row in rows]
+
+        converted = []
+        for row in rows:
+            values = list(row)
+            for i, convert in active:
+                value = values[i]
+                if value is not None:
+                    values[i] = convert(value)
+            converted.append(tuple(values))
+
+    return columns, converted
+
+
+def convert_columns(description, rows):
+    """Raw cursor rows -> {column: [values]} (column-oriented, one pass per column)"""
+    columns = column_names(description)
+    converters = column_converters(description)
+
+    if not rows:
+        return {name: [] for name in columns}
+
+    arrays = {}
+    for name, convert, values in zip(columns, converters, zip(*rows)):
+        if convert is None:
+            arrays[name] = list(values)
+        else:
+            arrays[name] = [convert(v) if v is not None else None for v in values]
+    return arrays
+
+
+def filter_rows(description, rows, column, value):
+    """Keep raw rows where column == value (before any conversion)"""
+    names = column_names(description)
+    if column not in names:
+        return []
+    index = names.index(column)
+    return [row for row in rows if row[index] == value]
+
+
+def rows_to_dicts(columns, rows):
+    return [dict(zip(columns, row)) for row in rows]
@@ -8,20 +8,47 @@ import argparse
 import sys
 from datetime import datetime, timedelta
 from pathlib import Path
-from dashboard_executor import DashboardExecutor
-from insights_generator import BenchmarkingInsightsGenerator
 import config
+import metrics
 
 class DashboardPipeline:
     def __init__(self):
-        self.executor = DashboardExecutor()
-        self.generator = BenchmarkingInsightsGenerator()
+        # Components are created on first use so --help and argument errors stay fast
+        self._executor = None
+        self._generator = None
+        self._screener = None
+        self.reset_stats()
+    
+    def reset_stats(self):
         self.stats = {
             'queries_executed': 0,
             'insights_generated': 0,
+            'screened_out': None,
+            'reused_snapshots': None,
             'errors': []
         }
     
+    @property
+    def executor(self):
+        if self._executor is None:
+            from dashboard_executor import DashboardExecutor
+            self._executor = DashboardExecutor()
+        return self._executor
+
+    @property
+    def generator(self):
+        if self._generator is None:
+            from insights_generator import BenchmarkingInsightsGenerator
+            self._generator = BenchmarkingInsightsGenerator()
+        return self._generator
+
+    @property
+    def screener(self):
+        if self._screener is None:
+            from change_screening import ChangeScreener
+            self._screener = ChangeScreener(self.executor, self.generator.store)
+        return self._screener
+
     def print_header(self, text):
         """Print formatted header"""
         print(f"\n{'='*70}")
@@ -50,7 +77,7 @@ class DashboardPipeline:
             return False
         
         try:
-            conn = duckdb.connect(db_path)
+            conn = duckdb.connect(db_path, read_only=True)
             id_col = config.ENTITY_ID_COLUMNS[entity_type]
             count = conn.execute(
                 "SELECT COUNT(*) FROM entities WHERE entity_type = ?",
@@ -105,9 +132,28 @@ class DashboardPipeline:
             self.stats['errors'].append(('insights', entity_id, str(e)))
             return None
     
-    def run_for_all_entities(self, entity_type, params=None, limit=None):
+    def screen_entities(self, entity_type, params, limit=None):
+        """Active entities whose overview metrics changed enough to need new insights"""
+        self.print_section("STEP 0: Screening For Changes")
+        
+        entity_ids = self.executor.get_active_entity_ids(entity_type, params)
+        if limit:
+            entity_ids = entity_ids[:limit]
+        
+        screening = self.screener.screen(entity_type, params, entity_ids)
+        self.screener.print_summary(entity_type, screening)
+        self.stats['screened_out'] = len(screening['skipped'])
+        
+        return screening
+    
+    def run_for_all_entities(self, entity_type, params=None, limit=None, screen=None, delta=None):
         """Run complete pipeline for all active entities"""
         
+        if params is None:
+            params = config.default_params(entity_type)
+        if screen is None:
+            screen = config.SCREENING_CONFIG['enabled']
+        
         # Verify total data exists
         if not self.verify_total_data_exists(entity_type):
             sys.exit(1)
@@ -117,12 +163,28 @@ class DashboardPipeline:
         if limit:
             print(f"Limit: {limit} entities")
         
+        # Step 0: Skip entities whose metrics haven't moved (they keep cached insights)
+        screening = None
+        entity_ids = None
+        if screen:
+            try:
+                screening = self.screen_entities(entity_type, params, limit)
+                entity_ids = screening['queued']
+                if not entity_ids:
+                    print(f"No {entity_type}s changed enough to regenerate insights.")
+                    return []
+            except Exception as e:
+                print(f"⚠ Screening failed, processing all active entities: {e}")
+                screening = None
+        
         # Step 1: Execute dashboard queries for all entities
         self.print_section("STEP 1: Executing Dashboard Queries")
         
         try:
-            dashboard_files = self.executor.process_all_entities(entity_type, params, limit)
-            self.stats['queries_executed'] = len(dashboard_files)
+            dashboard_files = self.executor.process_all_entities(entity_type, params, limit, entity_ids, delta)
+            reused = self.executor.delta.last_plan['reused']
+            self.stats['queries_executed'] = len(dashboard_files) - reused
+            self.stats['reused_snapshots'] = reused
             
             if not dashboard_files:
                 print(f"No dashboard files created. Exiting.")
@@ -135,19 +197,71 @@ class DashboardPipeline:
         self.print_section("STEP 2: Generating Benchmarked Insights")
         
         insight_files = []
+        generated_ids = []
         
-        for i, dashboard_file in enumerate(dashboard_files, 1):
+        for i, (entity_id, dashboard_file) in enumerate(dashboard_files.items(), 1):
             print(f"\nProcessing {i}/{len(dashboard_files)}: {Path(dashboard_file).name}")
             
             try:
-                insights_file = self.generator.generate_insights(dashboard_file)
-                insight_files.append(insights_file)
+                insight_files.append(self.generator.generate_insights(dashboard_file))
                 self.stats['insights_generated'] += 1
+                generated_ids.append(entity_id)
             except Exception as e:
                 print(f"✗ Error generating insights: {e}")
                 self.stats['errors'].append(('insights', dashboard_file, str(e)))
                 continue
         
+        # Metrics at this run become the baseline for the next screening
+        if screening:
+            recorded = self.screener.record_baselines(entity_type, generated_ids, screening['overview'])
+            print(f"\n✓ Recorded screening baselines for {recorded} {entity_type}s")
+        
+        return insight_files
+    
+    def run_multi_window(self, entity_type, window_params, entity_id=None, limit=None):
+        """
+        One raw document with every window and one LLM call per entity
+        (entity_id, or all entities active in the longest window)
+        """
+        if not self.verify_total_data_exists(entity_type):
+            return []
+        
+        lengths = ', '.join(str(days) for days in window_params)
+        self.print_header(f"Multi-Window Pipeline: {entity_type.upper()} ({lengths}-day windows)")
+        
+        # Step 1: Dashboard data of all windows
+        self.print_section("STEP 1: Executing Dashboard Queries")
+        
+        if entity_id is not None:
+            entity_ids = [entity_id]
+        else:
+            entity_ids = self.executor.get_active_entity_ids(entity_type, window_params[max(window_params)])
+            if limit:
+                entity_ids = entity_ids[:limit]
+            print(f"Found {len(entity_ids)} active {entity_type}s to process")
+        
+        try:
+            dashboard_files = self.executor.process_entities_windows(entity_type, entity_ids, window_params)
+            self.stats['queries_executed'] = len(dashboard_files)
+        except Exception as e:
+            print(f"✗ Error executing dashboard queries: {e}")
+            self.stats['errors'].append(('query', entity_id or entity_type, str(e)))
+            return []
+        
+        # Step 2: One window-comparative prompt per entity
+        self.print_section("STEP 2: Generating Window-Comparative Insights")
+        
+        insight_files = []
+        for i, dashboard_file in enumerate(dashboard_files, 1):
+            print(f"\nProcessing {i}/{len(dashboard_files)}: {Path(dashboard_file).name}")
+            
+            try:
+                insight_files.append(self.generator.generate_insights(dashboard_file))
+                self.stats['insights_generated'] += 1
+            except Exception as e:
+                print(f"✗ Error generating insights: {e}")
+                self.stats['errors'].append(('insights', dashboard_file, str(e)))
+        
         return insight_files
     
     def print_summary(self, start_time):
@@ -164,9 +278,24 @@ class DashboardPipeline:
         
         print(f"Dashboard Queries Executed:  {self.stats['queries_executed']}")
         print(f"Insights Generated:          {self.stats['insights_generated']}")
+        if self.stats['screened_out'] is not None:
+            print(f"Unchanged (cached insights): {self.stats['screened_out']}")
+        if self.stats['reused_snapshots'] is not None:
+            print(f"Reused Raw Snapshots:        {self.stats['reused_snapshots']}")
         print(f"Errors:                      {len(self.stats['errors'])}")
+        
+        if self._executor is not None:
+            pg_stats = self._executor.runner.stats_summary()
+            print(f"Prepared Statements:         {pg_stats['prepares']} prepared, "
+                  f"{pg_stats['prepared_hits']} reused "
+                  f"({pg_stats['prepared_hit_rate']:.1%} hit rate)")
         print()
         
+        if metrics.registry.summary_rows():
+            self.print_section("STAGE TIMINGS")
+            metrics.registry.print_summary()
+            print()
+        
         if self.stats['errors']:
             print("Errors:")
             for error_type, entity, message in self.stats['errors'][:5]:
@@ -183,6 +312,42 @@ class DashboardPipeline:
         print(f"\n{'='*70}\n")
 
 
+def build_params(entity_type, days=None, start_date=None, end_date=None, top_n=None):
+    """Dashboard query parameters from config.default_params() and CLI-style overrides"""
+    params = config.default_params(entity_type)
+    
+    # --days takes precedence over the default period
+    if days:
+        params['start_date'] = (datetime.now() - timedelta(days=days)).strftime('%Y-%m-%d')
+        params['end_date'] = datetime.now().strftime('%Y-%m-%d')
+        print(f"\nUsing --days={days}: {params['start_date']} to {params['end_date']}\n")
+    
+    # Explicit dates override --days
+    if start_date:
+        params['start_date'] = start_date
+    if end_date:
+        params['end_date'] = end_date
+    if top_n:
+        params['top_n'] = top_n
+    
+    return params
+
+
+def build_window_params(entity_type, windows, end_date=None, top_n=None):
+    """{days: params} of rolling windows that all end on end_date (default today)"""
+    end = datetime.strptime(end_date, '%Y-%m-%d') if end_date else datetime.now()
+    
+    window_params = {}
+    for days in sorted(set(windows)):
+        params = build_params(entity_type, top_n=top_n)
+        params['start_date'] = (end - timedelta(days=days)).strftime('%Y-%m-%d')
+        params['end_date'] = end.strftime('%Y-%m-%d')
+        window_params[days] = params
+    
+    print(f"\nUsing --windows={','.join(map(str, window_params))} ending {end.strftime('%Y-%m-%d')}\n")
+    return window_params
+
+
 def main():
     parser = argparse.ArgumentParser(
         description='Run dashboard pipeline: execute queries + generate insights',
@@ -208,6 +373,13 @@ Examples:
   
   # All buyers (limited)
   python src/run_all.py --entity buyer --all --limit 10
+  
+  # All sellers, regenerating even unchanged ones
+  python src/run_all.py --entity seller --all --no-screen
+  
+  # 30/90/365-day views compared in one insights run (default windows from config)
+  python src/run_all.py --entity buyer --id 5098 --windows
+  python src/run_all.py --entity buyer --all --windows 30 90 180 365
 
 What this does:
   1. Executes dashboard_specific queries for the entity/entities
@@ -253,6 +425,14 @@ What this does NOT do:
         help='Number of days back from today (e.g., 30, 90, 180, 365)'
     )
     
+    parser.add_argument(
+        '--windows',
+        type=int,
+        nargs='*',
+        help=f"Several window lengths in days compared in one insights run "
+             f"(no values: {config.MULTI_WINDOW_CONFIG['windows']}); use --end-date to move them"
+    )
+    
     parser.add_argument(
         '--start-date',
         help='Start date for dashboard period (YYYY-MM-DD)'
@@ -269,7 +449,26 @@ What this does NOT do:
         help='Number of top items in rankings'
     )
     
+    parser.add_argument(
+        '--full-refresh',
+        action='store_true',
+        help='With --all: re-query every entity instead of reusing unchanged raw snapshots'
+    )
+    
+    parser.add_argument(
+        '--entity-source',
+        choices=['postgres', 'duckdb'],
+        help='With --all: find active entities in Postgres or the last DuckDB sync (default from config)'
+    )
+    
+    parser.add_argument(
+        '--no-screen',
+        action='store_true',
+        help='With --all: skip change screening and regenerate insights for every active entity'
+    )
+    
     args = parser.parse_args()
+    metrics.enable_structured_log()
     
     # Validate arguments
     if not args.id and not args.all:
@@ -282,31 +481,33 @@ What this does NOT do:
         parser.print_help()
         sys.exit(1)
     
-    # Build parameters
-    params = config.DEFAULT_PARAMS[args.entity].copy()
-    
-    # Handle --days argument (takes precedence over default)
-    if args.days:
-        params['start_date'] = (datetime.now() - timedelta(days=args.days)).strftime('%Y-%m-%d')
-        params['end_date'] = datetime.now().strftime('%Y-%m-%d')
-        print(f"\nUsing --days={args.days}: {params['start_date']} to {params['end_date']}\n")
+    if args.windows is not None and (args.days or args.start_date):
+        print("Error: --windows sets the periods itself (only --end-date can be combined with it)")
+        sys.exit(1)
     
-    # Handle explicit dates (override --days)
-    if args.start_date:
-        params['start_date'] = args.start_date
-    if args.end_date:
-        params['end_date'] = args.end_date
-    if args.top_n:
-        params['top_n'] = args.top_n
+    if args.entity_source:
+        config.ENTITY_DISCOVERY['source'] = args.entity_source
     
     # Run pipeline
     start_time = datetime.now()
     pipeline = DashboardPipeline()
     
+    if args.windows is not None:
+        window_params = build_window_params(
+            args.entity, args.windows or config.MULTI_WINDOW_CONFIG['windows'], args.end_date, args.top_n
+        )
+        pipeline.run_multi_window(args.entity, window_params, args.id, args.limit)
+        pipeline.print_summary(start_time)
+        return
+    
+    params = build_params(args.entity, args.days, args.start_date, args.end_date, args.top_n)
+    
     if args.id:
         pipeline.run_for_single_entity(args.entity, args.id, params)
     elif args.all:
-        pipeline.run_for_all_entities(args.entity, params, args.limit)
+        pipeline.run_for_all_entities(args.entity, params, args.limit,
+                                      screen=False if args.no_screen else None,
+                                      delta=False if args.full_refresh else None)
     
     pipeline.print_summary(start_time)
 
@@ -8,46 +8,192 @@ Replaces populate_total_data.py
 import duckdb
 import psycopg2
 import os
+import shutil
 import sys
 import json
 import logging
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from datetime import datetime
-from decimal import Decimal
 from pathlib import Path
 
 sys.path.insert(0, str(Path(__file__).parent))
 import config
-from query_parser import QueryParser
+from query_catalog import get_catalog
+import row_convert
+import entity_profiles
+import entity_snapshot
+import parquet_export
+import metrics
 
-os.makedirs(os.path.dirname(config.SYNC_CONFIG['log_path']), exist_ok=True)
-
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler(config.SYNC_CONFIG['log_path']),
-        logging.StreamHandler()
-    ]
-)
 logger = logging.getLogger(__name__)
 
 
+def setup_logging():
+    """File + console logging for the sync CLI (not done on import)"""
+    os.makedirs(os.path.dirname(config.SYNC_CONFIG['log_path']), exist_ok=True)
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(levelname)s - %(message)s',
+        handlers=[
+            logging.FileHandler(config.SYNC_CONFIG['log_path']),
+            logging.StreamHandler()
+        ]
+    )
+    metrics.enable_structured_log()
+
+SHARD_SQL = "SELECT * FROM ({query}) AS shard WHERE {id_col} BETWEEN %(shard_low)s AND %(shard_high)s"
+
+
+def shard_query(query, id_col):
+    """
+    Wrap a total query so it only returns one entity-ID range. The range
+    filters the result, not the CTEs underneath, so each shard may still
+    scan the query's full date range: measure before raising 'shards'.
+    """
+    return SHARD_SQL.format(query=query, id_col=id_col)
+
+
+def shard_ranges(entity_ids, shards):
+    """Split sorted entity IDs into up to N contiguous (low, high) ranges of similar size"""
+    ids = sorted(set(entity_ids))
+    shards = max(1, min(shards, len(ids)))
+    size, extra = divmod(len(ids), shards)
+
+    ranges = []
+    start = 0
+    for i in range(shards):
+        end = start + size + (1 if i < extra else 0)
+        ranges.append((ids[start], ids[end - 1]))
+        start = end
+    return ranges
+
+
+def run_query_task(task):
+    """
+    Worker process: run one (entity type, query, shard) against PostgreSQL
+    Returns the task key with converted columns/rows, or the error
+    """
+    started = time.perf_counter()
+    result = {
+        'entity_type': task['entity_type'],
+        'name': task['name'],
+        'shard': task.get('shard'),
+        'columns': [],
+        'rows': [],
+        'error': None
+    }
+
+    conn = psycopg2.connect(**task['db_config'])
+    try:
+        cursor = conn.cursor()
+        cursor.execute(task['query'], task['params'])
+        result['columns'], result['rows'] = row_convert.convert_rows(
+            cursor.description, cursor.fetchall()
+        )
+        cursor.close()
+    except Exception as e:
+        result['error'] = str(e)
+    finally:
+        conn.close()
+
+    result['duration_s'] = time.perf_counter() - started
+    return result
+
+
 class DuckDBSync:
     def __init__(self):
         os.makedirs(config.ANALYTICS_DIR, exist_ok=True)
-        self.duck_path = config.ANALYTICS_DB_PATH
-        self.parser = QueryParser()
+        self.live_path = config.ANALYTICS_DB_PATH
+        self.staging_path = config.ANALYTICS_STAGING_PATH
+        self.duck_path = self.live_path      # Where writes go (staging during a sync)
+        self.catalog = get_catalog()
     
     # ============================================================
     # CONNECTIONS
     # ============================================================
     
-    def get_duck_conn(self):
-        return duckdb.connect(self.duck_path)
+    def get_duck_conn(self, read_only=False):
+        return duckdb.connect(self.duck_path, read_only=read_only)
     
     def get_pg_conn(self):
         return psycopg2.connect(**config.DB_CONFIG)
     
+    # ============================================================
+    # BLUE/GREEN STAGING
+    # Readers keep using the live file while sync builds a copy;
+    # the finished copy replaces it with one atomic rename.
+    # ============================================================
+    
+    def _remove_db_file(self, path):
+        for candidate in (path, path + '.wal'):
+            if os.path.exists(candidate):
+                os.remove(candidate)
+    
+    def prepare_staging(self):
+        """Start a staging copy of the live DB and point writes at it"""
+        self._remove_db_file(self.staging_path)
+        
+        if os.path.exists(self.live_path):
+            # Copy keeps the other entity type and sync history when syncing one type
+            shutil.copyfile(self.live_path, self.staging_path)
+            if os.path.exists(self.live_path + '.wal'):
+                # A leftover WAL goes with it and is folded into the copy -
+                # the live file is never opened for writing (readers hold it)
+                shutil.copyfile(self.live_path + '.wal', self.staging_path + '.wal')
+                conn = duckdb.connect(self.staging_path)
+                conn.execute("CHECKPOINT")
+                conn.close()
+        
+        self.duck_path = self.staging_path
+        logger.info(f"Building into staging: {self.staging_path}")
+    
+    def publish_staging(self):
+        """Checkpoint the staging DB and atomically swap it in as the live DB"""
+        conn = duckdb.connect(self.staging_path)
+        conn.execute("CHECKPOINT")
+        conn.close()
+        
+        # The live file's leftover WAL (already folded into staging) must not
+        # be replayed onto the new file. Dropping it first leaves readers that
+        # open in between the old file's last checkpoint - older, but consistent
+        if os.path.exists(self.live_path + '.wal'):
+            os.remove(self.live_path + '.wal')
+        
+        # Open readers keep the old file until they reconnect; new ones see the new snapshot
+        os.replace(self.staging_path, self.live_path)
+        self.duck_path = self.live_path
+        logger.info(f"✓ Swapped staging into live: {self.live_path}")
+    
+    def discard_staging(self):
+        self._remove_db_file(self.staging_path)
+        self.duck_path = self.live_path
+    
+    def build_snapshot(self):
+        """Memory-mapped reader snapshot of the staging DB (see entity_snapshot.py); None if off or failed"""
+        if not config.ENTITY_SNAPSHOT_CONFIG['enabled']:
+            return None
+        try:
+            conn = duckdb.connect(self.staging_path)
+            conn.execute("CHECKPOINT")
+            conn.close()
+            with metrics.timer('snapshot_write_seconds'):
+                return entity_snapshot.build(self.staging_path)
+        except Exception as e:
+            # An old snapshot must not outlive its sync - readers use DuckDB until the next one
+            logger.error(f"✗ Entity snapshot failed, readers will use DuckDB: {e}")
+            entity_snapshot.deactivate()
+            return None
+    
+    def export_parquet(self, entity_types):
+        """Partitioned Parquet export of the live DB (see parquet_export.py); a failure doesn't fail the sync"""
+        try:
+            summary = parquet_export.ParquetExporter(self.live_path).export(entity_types)
+            logger.info(f"✓ Parquet export: {summary or 'nothing new'}")
+        except Exception as e:
+            logger.error(f"✗ Parquet export failed, the next export retries: {e}")
+    
     # ============================================================
     # SCHEMA - stores query results just like SQLite did
     # ============================================================
@@ -78,6 +224,17 @@ class DuckDBSync:
         )
         """)
         
+        # Compact per-entity benchmark profiles (see entity_profiles.py)
+        conn.execute("""
+        CREATE TABLE IF NOT EXISTS entity_profiles (
+            entity_id       INTEGER,
+            entity_type     VARCHAR,
+            profile         VARCHAR,    -- JSON string of the profile
+            computed_at     VARCHAR,
+            PRIMARY KEY (entity_id, entity_type)
+        )
+        """)
+        
         # Sync log
         conn.execute("""
         CREATE TABLE IF NOT EXISTS sync_log (
@@ -97,27 +254,21 @@ class DuckDBSync:
     # EXECUTE QUERIES (same as populate_total_data.py did)
     # ============================================================
     
-    def execute_pg_query(self, query, params):
-        """Execute query against PostgreSQL - same as before"""
+    def execute_pg_query(self, query, params, name='total'):
+        """
+        Execute query against PostgreSQL (timed under its query name)
+        Returns {'columns': [...], 'rows': [tuples]} (see row_convert.py)
+        """
         conn = self.get_pg_conn()
         cursor = conn.cursor()
         
         try:
-            cursor.execute(query, params)
-            results = cursor.fetchall()
-            columns = [desc[0] for desc in cursor.description]
-            
-            results_dicts = []
-            for row in results:
-                row_dict = dict(zip(columns, row))
-                for key, value in row_dict.items():
-                    if isinstance(value, Decimal):
-                        row_dict[key] = float(value)
-                    elif hasattr(value, 'isoformat'):
-                        row_dict[key] = value.isoformat()
-                results_dicts.append(row_dict) or results_dicts
-            
-            return results_dicts
+            with metrics.timer('pg_query_seconds', query=name):
+                cursor.execute(query, params)
+                results = cursor.fetchall()
+            metrics.inc('pg_query_rows_total', len(results), query=name)
+            columns, rows = row_convert.convert_rows(cursor.description, results)
+            return {'columns': columns, 'rows': rows}
         
         finally:
             cursor.close()
@@ -128,16 +279,8 @@ class DuckDBSync:
         Load SQL file and execute all queries against PostgreSQL
         Same logic as populate_total_data.py
         """
-        # Load the same SQL files you already have!
-        query_file = config.TOTAL_QUERY_FILES[entity_type]
-        filepath = os.path.join(
-            config.TOTAL_QUERIES_DIR,
-            entity_type,
-            query_file
-        )
-        
-        logger.info(f"Loading queries from: {filepath}")
-        queries = self.parser.parse_file(filepath)
+        # Load the same SQL files you already have (parsed once via the catalog)
+        queries = self.catalog.total_queries(entity_type)
         logger.info(f"Found {len(queries)} queries: {[q['name'] for q in queries]}")
         
         all_results = {}
@@ -148,15 +291,137 @@ class DuckDBSync:
             
             logger.info(f"Executing {name}...")
             try:
-                results = self.execute_pg_query(sql, params)
+                results = self.execute_pg_query(sql, params, name)
                 all_results[name] = results
-                logger.info(f"  ✓ {len(results)} rows")
+                logger.info(f"  ✓ {len(results['rows'])} rows")
             except Exception as e:
                 logger.error(f"  ✗ Error: {e}")
-                all_results[name] = []
+                all_results[name] = {'columns': [], 'rows': []}
         
         return all_results
     
+    # ============================================================
+    # PARALLEL / SHARDED EXECUTION
+    # ============================================================
+    
+    def make_task(self, entity_type, query, params, shard=None):
+        task = {
+            'entity_type': entity_type,
+            'name': query['name'],
+            'query': query['query'],
+            'params': dict(params),
+            'db_config': config.DB_CONFIG,
+            'shard': None
+        }
+        if shard:
+            index, total, (low, high) = shard
+            task['query'] = shard_query(query['query'], query['entity_id_col'])
+            task['params'].update({'shard_low': low, 'shard_high': high})
+            task['shard'] = (index, total)
+        return task
+    
+    def execute_parallel(self, entity_types, workers=None, shards=None):
+        """
+        Run the total queries of several entity types in worker processes
+        
+        Overview queries go first; once a type's entity IDs are known its
+        other queries are queued, split into ID-range shards if it is large.
+        Returns {entity_type: {query_name: {'columns', 'rows'}}}
+        """
+        sync_config = config.SYNC_CONFIG
+        workers = sync_config.get('workers', 1) if workers is None else workers
+        shards = sync_config.get('shards', 1) if shards is None else shards
+        
+        queries = {etype: self.catalog.total_queries(etype) for etype in entity_types}
+        params = {etype: config.total_data_params(etype) for etype in entity_types}
+        
+        parts = {etype: {} for etype in entity_types}     # name -> list of shard results
+        expected = {etype: {} for etype in entity_types}  # name -> shard count
+        
+        logger.info(f"Running queries for {entity_types} on {workers} worker process(es), up to {shards} shard(s)")
+        
+        # Spawned, not forked: the pipeline service calls sync from a multi-threaded server
+        with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn')) as pool:
+            pending = set()
+            
+            def submit(task):
+                pending.add(pool.submit(run_query_task, task))
+            
+            # Phase 1: overview queries (they define the entity set)
+            for etype in entity_types:
+                overview_key = config.QUERY_REGISTRY[etype]['overview_query']
+                for query in queries[etype]:
+                    if query['name'] == overview_key:
+                        expected[etype][query['name']] = 1
+                        submit(self.make_task(etype, query, params[etype]))
+            
+            while pending:
+                future = next(as_completed(pending))
+                pending.discard(future)
+                result = future.result()
+                etype, name = result['entity_type'], result['name']
+                parts[etype].setdefault(name, []).append(result)
+                
+                shard_label = f" [shard {result['shard'][0] + 1}/{result['shard'][1]}]" if result['shard'] else ""
+                metrics.observe('pg_query_seconds', result['duration_s'], query=name)
+                metrics.inc('pg_query_rows_total', len(result['rows']), query=name)
+                if result['error']:
+                    logger.error(f"  ✗ {etype}.{name}{shard_label}: {result['error']}")
+                else:
+                    logger.info(f"  ✓ {etype}.{name}{shard_label}: {len(result['rows'])} rows in {result['duration_s']:.2f}s")
+                
+                # Phase 2: once the overview is in, queue the rest of this type
+                if name == config.QUERY_REGISTRY[etype]['overview_query']:
+                    for task in self.plan_tasks(etype, queries[etype], params[etype], result, shards):
+                        expected[etype][task['name']] = task['shard'][1] if task['shard'] else 1
+                        submit(task)
+        
+        return {
+            etype: {
+                name: self.merge_shards(parts[etype].get(name, []), expected[etype][name])
+                for name in expected[etype]
+            }
+            for etype in entity_types
+        }
+    
+    def plan_tasks(self, entity_type, queries, params, overview_result, shards):
+        """Tasks for the non-overview queries, sharded by entity-ID range when worthwhile"""
+        registry = config.QUERY_REGISTRY[entity_type]
+        id_col = registry['entity_id_col']
+        
+        entity_ids = []
+        if id_col in overview_result['columns']:
+            index = overview_result['columns'].index(id_col)
+            entity_ids = [row[index] for row in overview_result['rows'] if row[index] is not None]
+        
+        ranges = []
+        if shards > 1 and len(entity_ids) >= config.SYNC_CONFIG.get('shard_min_entities', 0):
+            ranges = shard_ranges(entity_ids, shards)
+        
+        tasks = []
+        for query in queries:
+            if query['name'] == registry['overview_query']:
+                continue
+            if len(ranges) > 1 and query['entity_id_col']:
+                tasks.extend(
+                    self.make_task(entity_type, query, params, (i, len(ranges), bounds))
+                    for i, bounds in enumerate(ranges)
+                )
+            else:
+                tasks.append(self.make_task(entity_type, query, params))
+        return tasks
+    
+    def merge_shards(self, results, expected):
+        """Concatenate shard results in shard order; any failed or missing shard fails the query"""
+        if len(results) != expected or any(r['error'] for r in results):
+            return {'columns': [], 'rows': []}
+        
+        results = sorted(results, key=lambda r: r['shard'][0] if r['shard'] else 0)
+        rows = []
+        for result in results:
+            rows.extend(result['rows'])
+        return {'columns': results[0]['columns'], 'rows': rows}
+    
     # ============================================================
     # ORGANIZE BY ENTITY (same as populate_total_data.py did)
     # ============================================================
@@ -168,10 +433,11 @@ class DuckDBSync:
         overview_key = registry['overview_query']       # from config, not hardcoded
         id_col = registry['entity_id_col']              # from config, not hardcoded
         
-        overview_data = all_results.get(overview_key, [])
+        overview = all_results.get(overview_key, {'columns': [], 'rows': []})
+        overview_rows = row_convert.rows_to_dicts(overview['columns'], overview['rows'])
         
-        entity_rows = [row for row in overview_data if row.get(id_col) is not None]
-        summary_rows = [row for row in overview_data if row.get(id_col) is None]
+        entity_rows = [row for row in overview_rows if row.get(id_col) is not None]
+        summary_rows = [row for row in overview_rows if row.get(id_col) is None]
         
         if summary_rows:
             logger.info(f"Found {len(summary_rows)} summary/total row(s)")
@@ -179,16 +445,20 @@ class DuckDBSync:
         entity_ids = [row[id_col] for row in entity_rows]
         logger.info(f"Found {len(entity_ids)} {entity_type} entities")
         
-        # This loop handles ANY number of queries automatically!
-        entities = {}
-        for entity_id in entity_ids:
-            entity_data = {}
-            for query_name, results in all_results.items():
-                entity_data[query_name] = [
-                    row for row in results
-                    if row.get(id_col) == entity_id
-                ]
-            entities[entity_id] = entity_data
+        # One pass per query: bucket tuples by entity ID, build dicts only for kept rows
+        entities = {entity_id: {} for entity_id in entity_ids}
+        for query_name, results in all_results.items():
+            columns = results['columns']
+            buckets = {}
+            if id_col in columns:
+                index = columns.index(id_col)
+                for row in results['rows']:
+                    buckets.setdefault(row[index], []).append(row)
+            
+            for entity_id, entity_data in entities.items():
+                entity_data[query_name] = row_convert.rows_to_dicts(
+                    columns, buckets.get(entity_id, [])
+                )
         
         self._summary_rows = {
             entity_type: {
@@ -217,30 +487,65 @@ class DuckDBSync:
         
         logger.info(f"Saving {len(entities)} {entity_type} entities to DuckDB...")
         
-        # Delete existing data for this entity type
-        conn.execute(
-            "DELETE FROM entities WHERE entity_type = ?",
-            [entity_type]
-        )
+        rows = [
+            [entity_id, entity_type, json.dumps(queries_data), now, now]
+            for entity_id, queries_data in entities.items()
+        ]
         
-        # Insert all entities
-        for entity_id, queries_data in entities.items():
-            conn.execute("""
-            INSERT INTO entities (entity_id, entity_type, queries_data, created_at, updated_at)
-            VALUES (?, ?, ?, ?, ?)
-            """, [
-                entity_id,
-                entity_type,
-                json.dumps(queries_data),
-                now,
-                now
-            ])
+        # Replace this entity type in one transaction (staging DB - no readers)
+        try:
+            conn.execute("BEGIN TRANSACTION")
+            conn.execute(
+                "DELETE FROM entities WHERE entity_type = ?",
+                [entity_type]
+            )
+            if rows:
+                conn.executemany("""
+                INSERT INTO entities (entity_id, entity_type, queries_data, created_at, updated_at)
+                VALUES (?, ?, ?, ?, ?)
+                """, rows)
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        finally:
+            conn.close()
         
-        conn.close()
         logger.info(f"✓ Saved {len(entities)} entities to DuckDB")
         
 
 
+    def save_profiles_to_duckdb(self, entity_type, entities):
+        """Build and save the per-entity benchmark profiles"""
+        profiles = entity_profiles.build_profiles(entity_type, entities)
+        now = datetime.now().isoformat()
+        
+        rows = [
+            [entity_id, entity_type, json.dumps(profile), now]
+            for entity_id, profile in profiles.items()
+        ]
+        
+        conn = self.get_duck_conn()
+        try:
+            conn.execute("BEGIN TRANSACTION")
+            conn.execute(
+                "DELETE FROM entity_profiles WHERE entity_type = ?",
+                [entity_type]
+            )
+            if rows:
+                conn.executemany("""
+                INSERT INTO entity_profiles (entity_id, entity_type, profile, computed_at)
+                VALUES (?, ?, ?, ?)
+                """, rows)
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        finally:
+            conn.close()
+        
+        logger.info(f"✓ Saved {len(profiles)} {entity_type} profiles")
+    
     def save_aggregates_to_duckdb(self, entity_type, entities):
         """
         Calculate aggregates - uses summary rows if available,
@@ -364,19 +669,72 @@ class DuckDBSync:
     # MAIN SYNC (replaces populate_total_data.py main function)
     # ============================================================
     
-    def sync(self, entity_type=None):
+    def sync(self, entity_type=None, workers=None, shards=None, export_parquet=None):
         """
         Main sync - runs total queries and stores in DuckDB
         Replaces populate_total_data.py entirely
+        
+        With workers > 1 queries run in parallel worker processes (see
+        execute_parallel); the default (SYNC_CONFIG workers = 1) is the
+        original sequential path. All DuckDB writes happen here, in this
+        process - DuckDB allows a single writer - and go to a staging
+        copy that is swapped in only when done.
+        
+        export_parquet (default PARQUET_EXPORT_CONFIG enabled) then
+        exports the synced types and new insights to Parquet.
         """
         start_time = datetime.now()
         entity_types = [entity_type] if entity_type else ['buyer', 'seller']
+        workers = config.SYNC_CONFIG.get('workers', 1) if workers is None else workers
+        if export_parquet is None:
+            export_parquet = config.PARQUET_EXPORT_CONFIG['enabled']
         
         logger.info("=" * 60)
         logger.info("DUCKDB SYNC STARTED")
         logger.info(f"Time: {start_time.strftime('%Y-%m-%d %H:%M:%S')}")
         logger.info("=" * 60)
         
+        # Step 1: Run total queries against PostgreSQL
+        fetched = {}
+        if workers > 1:
+            try:
+                fetched = self.execute_parallel(entity_types, workers, shards)
+            except Exception as e:
+                logger.error(f"✗ Parallel query execution failed, falling back to sequential: {e}")
+        
+        self.prepare_staging()
+        
+        try:
+            results = self.sync_into_staging(entity_types, fetched, start_time)
+            
+            if any(results.values()):
+                snapshot_dir = self.build_snapshot()
+                self.publish_staging()
+                if snapshot_dir:
+                    entity_snapshot.activate(snapshot_dir)
+                    logger.info(f"✓ Entity snapshot active: {snapshot_dir}")
+                if export_parquet:
+                    self.export_parquet([etype for etype, count in results.items() if count])
+            else:
+                logger.error("✗ No entity type synced - keeping the previous snapshot")
+                self.discard_staging()
+        except BaseException:
+            self.discard_staging()
+            raise
+        
+        duration = (datetime.now() - start_time).total_seconds()
+        
+        logger.info("\n" + "=" * 60)
+        logger.info("SYNC COMPLETE")
+        logger.info(f"Duration: {duration:.2f}s")
+        for etype, count in results.items():
+            logger.info(f"  ✓ {etype}s: {count} entities")
+        logger.info("=" * 60)
+        
+        return results
+    
+    def sync_into_staging(self, entity_types, fetched, start_time):
+        """Steps 2-4 for each entity type, written to the staging DB"""
         self.initialize_schema()
         
         results = {}
@@ -387,20 +745,24 @@ class DuckDBSync:
             logger.info(f"{'='*60}")
             
             try:
-                # Use same params as before
-                params = config.TOTAL_DATA_PARAMS[etype]
-                
-                # Step 1: Run total queries against PostgreSQL
-                all_results = self.load_and_execute_queries(etype, params)
+                all_results = fetched.get(etype)
+                if all_results is None:
+                    # Use same params as before
+                    params = config.total_data_params(etype)
+                    all_results = self.load_and_execute_queries(etype, params)
                 
                 # Step 2: Organize by entity
                 entities = self.organize_by_entity(etype, all_results)
                 
-                # Step 3: Save to DuckDB
-                self.save_entities_to_duckdb(etype, entities)
-                
-                # Step 4: Calculate and save aggregates
-                self.save_aggregates_to_duckdb(etype, entities)
+                with metrics.timer('duckdb_write_seconds', entity_type=etype):
+                    # Step 3: Save to DuckDB
+                    self.save_entities_to_duckdb(etype, entities)
+                    
+                    # Step 4: Calculate and save aggregates
+                    self.save_aggregates_to_duckdb(etype, entities)
+                    
+                    # Step 5: Materialize per-entity benchmark profiles
+                    self.save_profiles_to_duckdb(etype, entities)
                 
                 results[etype] = len(entities)
                 
@@ -420,15 +782,6 @@ class DuckDBSync:
                 logger.error(f"✗ Failed for {etype}: {e}")
                 results[etype] = 0
         
-        duration = (datetime.now() - start_time).total_seconds()
-        
-        logger.info("\n" + "=" * 60)
-        logger.info("SYNC COMPLETE")
-        logger.info(f"Duration: {duration:.2f}s")
-        for etype, count in results.items():
-            logger.info(f"  ✓ {etype}s: {count} entities")
-        logger.info("=" * 60)
-        
         return results
     
     # ============================================================
@@ -436,7 +789,7 @@ class DuckDBSync:
     # ============================================================
     
     def health_check(self):
-        conn = self.get_duck_conn()
+        conn = self.get_duck_conn(read_only=True)
         
         buyer_count = conn.execute(
             "SELECT COUNT(*) FROM entities WHERE entity_type = 'buyer'"
@@ -475,15 +828,22 @@ def main():
     parser = argparse.ArgumentParser()
     parser.add_argument('--entity', choices=['buyer', 'seller'])
     parser.add_argument('--health-check', action='store_true')
+    parser.add_argument('--workers', type=int, help='Query worker processes (1 = sequential). Default from config.')
+    parser.add_argument('--shards', type=int, help='Entity-ID range shards per large query. Default from config.')
+    parser.add_argument('--export-parquet', action='store_true', default=None,
+                        help='Export entities / aggregates / insights to partitioned Parquet after the sync. '
+                             'Always on if PARQUET_EXPORT_CONFIG is enabled.')
     args = parser.parse_args()
     
+    setup_logging()
     syncer = DuckDBSync()
     
     if args.health_check:
         syncer.health_check()
         return
     
-    syncer.sync(entity_type=args.entity)
+    syncer.sync(entity_type=args.entity, workers=args.workers, shards=args.shards,
+                export_parquet=args.export_parquet)
     syncer.health_check()
 
 
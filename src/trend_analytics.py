@@ -0,0 +1,202 @@
+"""
+Trend Analytics: Vectorized trend statistics over time-series query results
+
+Series from monthly_trends / sales_time_series are aligned into one
+entities x periods matrix, then growth, linear trend, coefficient of
+variation and anomaly flags are computed for every entity in one NumPy
+pass. Works for a single entity or a whole entity type at sync time.
+
+Each entity only spans its own first..last period: platform periods before
+it started or after it stopped are NaN, not zero, so young or stopped
+entities get the same results in a batch as on their own.
+"""
+
+import warnings
+import numpy as np
+import config
+
+
+# ============================================================
+# MATRIX
+# ============================================================
+
+def series_matrix(entities, query_name, period_col, value_col, fill_missing=0.0):
+    """
+    Align one query's series for many entities
+    Returns (entity_ids, sorted periods, float matrix entities x periods)
+    Gaps inside an entity's own first..last range get fill_missing; periods
+    outside it are NaN
+    """
+    entity_ids = list(entities.keys())
+    periods = sorted({
+        row[period_col]
+        for data in entities.values()
+        for row in data.get(query_name, [])
+        if row.get(period_col) is not None
+    })
+    position = {period: i for i, period in enumerate(periods)}
+
+    matrix = np.full((len(entity_ids), len(periods)), np.nan)
+    for row_index, entity_id in enumerate(entity_ids):
+        rows = [row for row in entities[entity_id].get(query_name, []) if row.get(period_col) is not None]
+        if not rows:
+            continue
+        indices = [position[row[period_col]] for row in rows]
+        matrix[row_index, min(indices):max(indices) + 1] = fill_missing
+        for index, row in zip(indices, rows):
+            value = row.get(value_col)
+            matrix[row_index, index] = np.nan if value is None else value
+
+    return entity_ids, periods, matrix
+
+
+# ============================================================
+# STATISTICS (all entities at once)
+# ============================================================
+
+def _pct_change(current, previous):
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return np.where(previous > 0, (current - previous) / previous * 100, np.nan)
+
+
+def compute_trends(matrix, window=None, anomaly_z=None):
+    """
+    Per-row trend statistics for an entities x periods matrix (NaN = no value)
+    Latest / rolling growth use each row's own last valid period
+    Returns a dict of arrays, one entry per row
+    """
+    window = window or config.TREND_CONFIG['rolling_window']
+    anomaly_z = anomaly_z or config.TREND_CONFIG['anomaly_z']
+    rows, periods = matrix.shape
+
+    valid = ~np.isnan(matrix)
+    filled = np.where(valid, matrix, 0.0)
+    counts = valid.sum(axis=1)
+
+    # Each row's own first / last valid period
+    has_values = counts > 0
+    row_index = np.arange(rows)
+    first = np.argmax(valid, axis=1) if periods else np.zeros(rows, dtype=int)
+    last = periods - 1 - np.argmax(valid[:, ::-1], axis=1) if periods else np.zeros(rows, dtype=int)
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        mean = filled.sum(axis=1) / counts
+        std = np.sqrt((np.where(valid, matrix - mean[:, None], 0.0) ** 2).sum(axis=1) / counts)
+
+        # Least-squares slope over the valid points of each row
+        x = np.arange(periods, dtype=float)
+        x_mean = (valid * x).sum(axis=1) / counts
+        dx = np.where(valid, x - x_mean[:, None], 0.0)
+        slope = (dx * (filled - mean[:, None])).sum(axis=1) / (dx ** 2).sum(axis=1)
+
+        cv = np.where(mean > 0, std / mean, np.nan)
+        slope_pct = np.where(mean != 0, slope / np.abs(mean) * 100, np.nan)
+
+    # Period-over-period growth for the latest period, and last `window` vs the `window` before
+    latest_growth = np.full(rows, np.nan)
+    rolling_growth = np.full(rows, np.nan)
+    latest_value = np.full(rows, np.nan)
+    if periods:
+        latest_value = np.where(has_values, matrix[row_index, last], np.nan)
+        previous = matrix[row_index, np.maximum(last - 1, 0)]
+        latest_growth = np.where(has_values & (last > first), _pct_change(latest_value, previous), np.nan)
+
+        # Window sums from cumulative sums, ending at each row's last period
+        cumulative = np.concatenate([np.zeros((rows, 1)), np.cumsum(filled, axis=1)], axis=1)
+        end = last + 1
+        recent = cumulative[row_index, end] - cumulative[row_index, np.maximum(end - window, 0)]
+        prior = (cumulative[row_index, np.maximum(end - window, 0)]
+                 - cumulative[row_index, np.maximum(end - 2 * window, 0)])
+        rolling_growth = np.where(has_values & (last - first + 1 >= 2 * window),
+                                  _pct_change(recent, prior), np.nan)
+
+    # Robust z-score (median / MAD), falling back to the standard z-score when MAD is 0
+    observed = np.where(valid, matrix, np.nan)
+    with warnings.catch_warnings(), np.errstate(invalid='ignore', divide='ignore'):
+        warnings.simplefilter('ignore', RuntimeWarning)    # all-NaN rows
+        median = np.nanmedian(observed, axis=1)
+        mad = np.nanmedian(np.abs(observed - median[:, None]), axis=1)
+        scale = np.where(mad > 0, 1.4826 * mad, std)
+        center = np.where(mad > 0, median, mean)
+        z = np.where(valid & (scale[:, None] > 0), (matrix - center[:, None]) / scale[:, None], 0.0)
+    anomalies = np.abs(z) > anomaly_z
+
+    return {
+        'periods': counts,
+        'first_index': first,
+        'last_index': last,
+        'mean': mean,
+        'latest_value': latest_value,
+        'latest_growth_pct': latest_growth,
+        'rolling_growth_pct': rolling_growth,
+        'slope_per_period': slope,
+        'slope_pct_of_mean': slope_pct,
+        'cv': cv,
+        'z': z,
+        'anomalies': anomalies
+    }
+
+
+def _number(value, digits=2):
+    if value is None or np.isnan(value):
+        return None
+    return round(float(value), digits)
+
+
+# ============================================================
+# PUBLIC API
+# ============================================================
+
+def analyze_batch(entity_type, entities):
+    """{entity_id: {query_name: trend stats}} for every configured series"""
+    series_config = config.TREND_CONFIG['series'].get(entity_type, {})
+    window = config.TREND_CONFIG['rolling_window']
+    results = {entity_id: {} for entity_id in entities}
+
+    for query_name, spec in series_config.items():
+        entity_ids, periods, matrix = series_matrix(
+            entities, query_name, spec['period'], spec['value'], spec.get('fill_missing', 0.0)
+        )
+        if not periods:
+            continue
+
+        stats = compute_trends(matrix, window)
+
+        for row, entity_id in enumerate(entity_ids):
+            if not entities[entity_id].get(query_name):
+                continue
+            flagged = np.nonzero(stats['anomalies'][row])[0]
+            first, last = stats['first_index'][row], stats['last_index'][row]
+            results[entity_id][query_name] = {
+                'value_column': spec['value'],
+                'periods': int(stats['periods'][row]),
+                'first_period': periods[first],
+                'latest_period': periods[last],
+                'latest_value': _number(stats['latest_value'][row]),
+                'latest_growth_pct': _number(stats['latest_growth_pct'][row]),
+                f'rolling_{window}_period_growth_pct': _number(stats['rolling_growth_pct'][row]),
+                'slope_per_period': _number(stats['slope_per_period'][row]),
+                'slope_pct_of_mean': _number(stats['slope_pct_of_mean'][row]),
+                'coefficient_of_variation': _number(stats['cv'][row], 3),
+                'anomalies': [
+                    {
+                        'period': periods[i],
+                        'value': _number(matrix[row, i]),
+                        'z_score': _number(stats['z'][row, i])
+                    }
+                    for i in flagged
+                ],
+                'latest_is_anomaly': bool(stats['anomalies'][row, last])
+            }
+
+    return results
+
+
+def analyze_entity(entity_type, entity_data):
+    """
+    Trend stats for a single entity's history ({query_name: rows})
+    Same as its analyze_batch entry, except that a period missing inside the
+    entity's own range (one other entities have) is fill_missing in a batch
+    and simply absent here
+    """
+    return analyze_batch(entity_type, {'entity': entity_data})['entity']
@@ -0,0 +1,130 @@
+"""
+HyperLogLog error bound (documented in src/hll.py), merge == union and the
+linear-counting switch. Seeds are fixed, so results are deterministic; the
+limits carry ~3 sampling standard errors of margin over the documented
+figures so a seed or trial-count change doesn't flip them.
+
+    python -m pytest -q tests
+"""
+
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'src'))
+import hll
+
+P = 12
+M = 1 << P
+SIGMA = hll.standard_error(P)
+TRIALS = 200
+SWITCH = int(hll.LINEAR_COUNTING_LIMIT * M)      # ~12288 distinct values at p=12
+
+# Documented RMS: ~1.0x sigma, ~1.25x near the switch. The RMS of 200
+# trials has ~5% relative sampling error; 3 of those on top of each
+SIGMA_MARGIN = 1 + 3 / np.sqrt(2 * TRIALS)
+RMS_LIMIT = 1.0 * SIGMA_MARGIN
+SWITCH_RMS_LIMIT = 1.25 * SIGMA_MARGIN
+# Documented: <= 1% of estimates beyond 3 sigma; binomial margin over all trials
+CARDINALITIES = [1000, 5000, 20000, 100000]
+SWITCH_CARDINALITIES = [10000, 12000, 12500, 13000]
+TOTAL = TRIALS * (len(CARDINALITIES) + len(SWITCH_CARDINALITIES))
+TAIL_LIMIT = 0.01 + 3 * np.sqrt(0.01 * 0.99 / TOTAL)
+
+
+def relative_errors(n, trials=TRIALS):
+    rng = np.random.default_rng(n)
+    return np.array([hll.count(rng.integers(0, 2 ** 62, size=n), P) / n - 1 for _ in range(trials)])
+
+
+@pytest.fixture(scope='module')
+def errors():
+    return {n: relative_errors(n) for n in CARDINALITIES + SWITCH_CARDINALITIES}
+
+
+@pytest.mark.parametrize('n', CARDINALITIES)
+def test_rms_within_standard_error(errors, n):
+    rms = np.sqrt((errors[n] ** 2).mean())
+    assert rms <= RMS_LIMIT * SIGMA, f"n={n}: RMS {rms:.4%} > {RMS_LIMIT:.2f}x {SIGMA:.4%}"
+
+
+@pytest.mark.parametrize('n', SWITCH_CARDINALITIES)
+def test_rms_near_linear_counting_switch(errors, n):
+    rms = np.sqrt((errors[n] ** 2).mean())
+    assert rms <= SWITCH_RMS_LIMIT * SIGMA, f"n={n}: RMS {rms:.4%} > {SWITCH_RMS_LIMIT:.2f}x {SIGMA:.4%}"
+
+
+def test_tail_beyond_three_sigma(errors):
+    tail = sum(int((np.abs(e) > 3 * SIGMA).sum()) for e in errors.values()) / TOTAL
+    assert tail <= TAIL_LIMIT
+
+
+@pytest.mark.parametrize('n', CARDINALITIES)
+def test_no_bias(errors, n):
+    # Mean of 200 trials has sigma / sqrt(200) sampling error. Just above the
+    # switch the raw estimate runs ~0.5 sigma high (counted in its RMS bound)
+    assert abs(errors[n].mean()) <= 3 * SIGMA / np.sqrt(TRIALS)
+
+
+def test_small_sets_exact_or_close():
+    # Linear counting: near-exact until values share registers, then within a few percent
+    for n, tolerance in ((1, 0.01), (10, 0.05), (100, 5)):
+        assert abs(hll.count(np.arange(n), P) - n) <= tolerance, n
+
+
+def test_merge_equals_union():
+    rng = np.random.default_rng(1)
+    daily = [rng.integers(0, 5000, size=rng.integers(50, 500)) for _ in range(30)]
+    merged = np.maximum.reduce([hll.dense(*hll.registers(values, P), P) for values in daily])
+    union = hll.dense(*hll.registers(np.concatenate(daily), P), P)
+    assert (merged == union).all()
+
+    # Merging is idempotent and order-independent
+    assert (np.maximum(merged, union) == union).all()
+    assert (np.maximum.reduce([hll.dense(*hll.registers(v, P), P) for v in daily[::-1]]) == union).all()
+
+
+def test_linear_counting_switch():
+    # linear = m * ln(m / zeros) crosses 3m at zeros = m * e^-3
+    edge = M * np.exp(-hll.LINEAR_COUNTING_LIMIT)
+    harmonic = 1000.0
+    below = M - np.floor(edge + 1)    # More zeros: linear estimate just under 3m
+    above = M - np.floor(edge)        # Fewer zeros: just over 3m
+
+    zeros_below = M - below
+    assert hll.estimate(below, harmonic, P) == pytest.approx(M * np.log(M / zeros_below))
+
+    alpha = 0.7213 / (1 + 1.079 / M)
+    assert hll.estimate(above, harmonic, P) == pytest.approx(alpha * M * M / (harmonic + M - above))
+
+    # Full sketch: no zeros left, always the raw estimate
+    assert hll.estimate(M, harmonic, P) == pytest.approx(alpha * M * M / harmonic)
+
+
+def test_switch_is_continuous():
+    # Sketches on either side of the switch estimate within the error bound
+    rng = np.random.default_rng(3)
+    values = rng.integers(0, 2 ** 62, size=SWITCH + 2000)
+    for n in range(SWITCH - 1000, SWITCH + 1001, 250):
+        assert abs(hll.count(values[:n], P) / n - 1) <= 4 * SIGMA, n
+
+
+def test_vectorized_estimate_matches_count():
+    rng = np.random.default_rng(4)
+    sets = [rng.integers(0, 2 ** 62, size=n) for n in (500, 12000, 50000)]
+    summaries = []
+    for values in sets:
+        merged = hll.dense(*hll.registers(values, P), P)
+        filled = merged[merged > 0]
+        summaries.append((len(filled), np.ldexp(1.0, -filled.astype(int)).sum()))
+    nonzero, harmonic = zip(*summaries)
+    assert np.allclose(hll.estimate(nonzero, harmonic, P), [hll.count(v, P) for v in sets])
+
+
+def test_precision_range():
+    with pytest.raises(ValueError):
+        hll.registers([1, 2, 3], hll.MIN_PRECISION - 1)
+    with pytest.raises(ValueError):
+        hll.registers([1, 2, 3], hll.MAX_PRECISION + 1)